@@ -1,11 +1,16 @@
 import streamlit as st
 
+from utils.prewarm import start_prewarm
+
 st.set_page_config(
     page_title="Analyse Steam – 2014 à 2024",
     page_icon="🎮",
     layout="centered"
 )
 
+# préchauffage des caches partagés, une fois par processus (utils/prewarm.py)
+start_prewarm()
+
 # ---------------------------------------------------------
 # STYLE SIMPLE (VERSION DE BASE)
 # ---------------------------------------------------------
@@ -0,0 +1,81 @@
+"""
+Débit du filtre NSFW : boucle ligne à ligne d'origine vs regex compilée.
+
+Usage : python -m benchmarks.bench_nsfw [--rows 1000000] [--legacy-rows 50000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.cleaning import NSFW_PATTERNS, nsfw_mask
+
+WORDS = [
+    "dark", "quest", "legend", "space", "city", "tycoon", "zombie", "survival",
+    "battle", "royale", "racing", "simulator", "kingdom", "puzzle", "island",
+    "hunter", "shadow", "dragon", "farm", "story", "cumulus", "essex", "adult",
+    "hentai", "nude", "Remastered", "Deluxe Edition", "VR", "2", "III",
+]
+GENRES = [
+    "Action", "Adventure", "Indie", "RPG", "Strategy", "Simulation", "Casual",
+    "Free to Play", "Sports", "Racing", "Sexual Content", "Nudity",
+]
+
+
+def synthetic_games(n, seed=0):
+    """Noms et chaînes de genres aléatoires (quelques-uns contiennent des motifs)."""
+    rng = np.random.default_rng(seed)
+    words = np.array(WORDS, dtype=object)
+    parts = [words[rng.integers(0, len(words), n)] for _ in range(3)]
+    names = parts[0] + " " + parts[1] + " " + parts[2]
+
+    genres = np.array(GENRES, dtype=object)
+    g1, g2 = genres[rng.integers(0, len(genres), n)], genres[rng.integers(0, len(genres), n)]
+    genre_strings = "['" + g1 + "', '" + g2 + "']"
+
+    return pd.DataFrame({
+        "Name": pd.array(names, dtype=pd.StringDtype("pyarrow")),
+        "Genres": pd.array(genre_strings, dtype=pd.StringDtype("pyarrow")),
+    })
+
+
+def legacy_mask(df):
+    """Version d'origine de la page 06 (apply ligne à ligne)."""
+    def is_nsfw(row):
+        txt = (str(row["Name"]) + " " + str(row["Genres"])).lower()
+        return any(k in txt for k in NSFW_PATTERNS)
+    return df.apply(is_nsfw, axis=1)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=50_000,
+                        help="lignes pour la version d'origine (plus lente)")
+    args = parser.parse_args()
+
+    df = synthetic_games(args.rows)
+
+    fast, t_fast = timed(nsfw_mask, df["Name"], df["Genres"])
+    sample = df.iloc[:args.legacy_rows]
+    slow, t_slow = timed(legacy_mask, sample)
+
+    assert (fast.iloc[:len(sample)].to_numpy() == slow.to_numpy()).all(), "résultats différents"
+
+    print(f"regex compilée : {args.rows:>10,} lignes en {t_fast:7.3f}s "
+          f"→ {args.rows / t_fast:>12,.0f} lignes/s ({fast.mean():.1%} NSFW)")
+    print(f"apply d'origine: {len(sample):>10,} lignes en {t_slow:7.3f}s "
+          f"→ {len(sample) / t_slow:>12,.0f} lignes/s")
+    print(f"gain           : x{(args.rows / t_fast) / (len(sample) / t_slow):.1f}")
+
+
+if __name__ == "__main__":
+    main()
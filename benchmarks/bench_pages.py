@@ -0,0 +1,264 @@
+"""
+Benchmark des pages 02–06 et de leurs fonctions de calcul, à plusieurs échelles.
+
+Pour chaque taille de dataset (synthétique, schéma games_clean) :
+- préparation : conversion CSV → Feather, groupes de titres (utils/titles.py)
+- fonctions de calcul appelées directement (index des genres, cube,
+  table des genres de la page 04, nettoyage, similarité et recherche par
+  nom de la page 06)
+- chaque page exécutée sans navigateur par AppTest, dans un processus neuf :
+  premier affichage (à froid), reruns (médiane), pic de RSS, taille des caches
+
+Les résultats sont écrits en JSON pour comparer deux exécutions.
+
+Usage : python -m benchmarks.bench_pages [--scales 10000,100000,1000000]
+                                         [--reruns 5] [--out bench_pages.json]
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = sorted(glob.glob(os.path.join(REPO, "pages", "0[2-6]_*.py")))
+
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000]
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+# =========================================================
+# PROCESSUS DE MESURE (LANCÉS DANS LE DOSSIER DU DATASET)
+# =========================================================
+
+def cache_bytes():
+    """Octets occupés par les caches Streamlit et le cache de figures."""
+    from streamlit.runtime.caching import get_data_cache_stats_provider
+    from utils.charts import figure_cache
+
+    total = figure_cache.n_bytes
+    for family in get_data_cache_stats_provider().get_stats().values():
+        total += sum(stat.byte_length for stat in family)
+    return total
+
+
+def measure_page(page, reruns):
+    import logging
+    logging.disable(logging.WARNING)
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(page, default_timeout=1800)
+    _, cold = timed(at.run)
+    errors = [e.value for e in at.exception if "Could not find page" not in e.value]
+
+    times = []
+    for _ in range(reruns):
+        _, t = timed(at.run)
+        times.append(t)
+
+    return {
+        "page": os.path.basename(page),
+        "cold_s": cold,
+        "rerun_s": statistics.median(times) if times else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "cache_bytes": cache_bytes(),
+        "errors": errors,
+    }
+
+
+def measure_compute():
+    import numpy as np
+
+    from utils.cube import build_cube
+    from utils.genres import build_genre_index
+    from utils.leaderboard import build_leaderboard
+    from utils.load_data import read_games
+    from utils.recommend import clean_for_recommendation, recommend_games
+    from utils.search import build_name_index
+
+    out = {}
+    df, out["read_games_s"] = timed(read_games)
+    index, out["build_genre_index_s"] = timed(build_genre_index, df["Genres"])
+    cube, out["build_cube_s"] = timed(build_cube, df, index)
+    _, out["genre_table_s"] = timed(cube.genre_table, 2014, 2024)
+    (clean, bits), out["load_cleaned_data_s"] = timed(clean_for_recommendation, df)
+
+    rng = np.random.default_rng(0)
+    names = clean["Name"].to_numpy()[rng.integers(0, len(clean), 20)]
+    start = time.perf_counter()
+    for name in names:
+        recommend_games(clean, bits, name)
+    out["recommend_games_s"] = (time.perf_counter() - start) / len(names)
+
+    # recherche de la page 06 : chaque préfixe tapé d'un nom, plus une faute de frappe
+    name_index, out["build_name_index_s"] = timed(build_name_index, clean)
+    queries = [name[:i] for name in names for i in range(1, min(len(name), 12) + 1)]
+    queries += [name[:4] + "x" + name[5:10] for name in names]
+    latencies = []
+    for query in queries:
+        _, seconds = timed(name_index.search, query)
+        latencies.append(seconds)
+    out["search_median_s"] = float(np.median(latencies))
+    out["search_max_s"] = max(latencies)
+
+    # classements de la page 03 : « top 20 de l'année en Strategy par ratio »
+    leaderboard, out["build_leaderboard_s"] = timed(build_leaderboard, df, index)
+    start = time.perf_counter()
+    for year in range(2014, 2025):
+        leaderboard.top("ratio", 20, year, "Strategy")
+    out["leaderboard_top_s"] = (time.perf_counter() - start) / 11
+
+    out["peak_rss_mb"] = peak_rss_mb()
+    return out
+
+
+# =========================================================
+# ORCHESTRATION
+# =========================================================
+
+def run_worker(workdir, args):
+    """Lance une mesure dans un processus neuf ; retourne son résultat JSON."""
+    env = dict(os.environ, PYTHONPATH=REPO, STEAM_PREWARM="0")   # mesures à froid
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_pages", *args],
+        cwd=workdir, env=env, capture_output=True, text=True,
+    )
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        return {"error": proc.stderr.strip().splitlines()[-1:] or ["échec"]}
+    return json.loads(lines[-1])
+
+
+def prepare_dataset(workdir, rows, seed):
+    """Dossier de travail avec data/games_clean.csv synthétique et ses copies Feather."""
+    from benchmarks.synthetic import write_synthetic_csv
+    from utils.load_data import (
+        PATH_GAMES_CLEAN,
+        PATH_GAMES_COLUMNAR,
+        PATH_PERIOD_COLUMNAR,
+        build_columnar_copy,
+    )
+
+    os.makedirs(os.path.join(workdir, "data"))
+    csv_path = os.path.join(workdir, PATH_GAMES_CLEAN)
+    write_synthetic_csv(csv_path, rows, seed)
+
+    _, seconds = timed(
+        build_columnar_copy,
+        csv_path,
+        os.path.join(workdir, PATH_GAMES_COLUMNAR),
+        os.path.join(workdir, PATH_PERIOD_COLUMNAR),
+    )
+    # étape hors ligne d'un déploiement : groupes de titres en double (page 03)
+    _, title_seconds = timed(
+        subprocess.run, [sys.executable, "-m", "utils.titles"],
+        cwd=workdir, env=dict(os.environ, PYTHONPATH=REPO), capture_output=True, check=True,
+    )
+    return {
+        "csv_bytes": os.path.getsize(csv_path),
+        "build_columnar_s": seconds,
+        "build_title_groups_s": title_seconds,
+    }
+
+
+def run_benchmarks(scales, reruns, seed=0, verbose=True):
+    results = []
+    for rows in scales:
+        workdir = tempfile.mkdtemp(prefix=f"steam_bench_{rows}_")
+        try:
+            entry = {"rows": rows, **prepare_dataset(workdir, rows, seed)}
+            entry["compute"] = run_worker(workdir, ["--worker", "compute"])
+            entry["pages"] = [
+                run_worker(workdir, ["--worker", "page", "--page", page, "--reruns", str(reruns)])
+                for page in PAGES
+            ]
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        results.append(entry)
+        if verbose:
+            print_scale(entry)
+    return results
+
+
+def print_scale(entry):
+    print(
+        f"\n{entry['rows']:,} lignes — Feather {entry['build_columnar_s']:.2f}s, "
+        f"groupes de titres {entry['build_title_groups_s']:.2f}s"
+    )
+    for name, value in entry["compute"].items():
+        print(f"  {name:<24} {value:.4f}" if isinstance(value, float) else f"  {name:<24} {value}")
+    print(f"  {'page':<36} {'froid':>8} {'rerun':>8} {'RSS Mo':>8} {'cache Ko':>9}")
+    for page in entry["pages"]:
+        if "error" in page:
+            print(f"  échec : {page['error']}")
+            continue
+        print(
+            f"  {page['page']:<36} {page['cold_s']:>7.2f}s {page['rerun_s']:>7.3f}s "
+            f"{page['peak_rss_mb']:>8.0f} {page['cache_bytes'] / 1024:>9.0f}"
+            + ("  ERREURS" if page["errors"] else "")
+        )
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)),
+                        help="tailles de dataset, séparées par des virgules")
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_pages.json", help="fichier JSON de résultats")
+    parser.add_argument("--worker", choices=["page", "compute"], help=argparse.SUPPRESS)
+    parser.add_argument("--page", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker == "page":
+        print(json.dumps(measure_page(args.page, args.reruns)))
+        return
+    if args.worker == "compute":
+        print(json.dumps(measure_compute()))
+        return
+
+    scales = [int(s) for s in args.scales.split(",") if s]
+    results = run_benchmarks(scales, args.reruns, args.seed)
+
+    with open(args.out, "w") as f:
+        json.dump({
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "reruns": args.reruns,
+            "results": results,
+        }, f, indent=2)
+    print(f"\nRésultats écrits dans {args.out}")
+
+
+if __name__ == "__main__":
+    main()
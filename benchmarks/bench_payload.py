@@ -0,0 +1,68 @@
+"""
+Octets envoyés au navigateur par graphique : JSON Plotly brut vs encodage compact.
+
+Les figures reprennent les appels des pages sur le dataset local (ou son
+extrait --rows), avant toute réduction (LOD, cube) pour mesurer l'encodage seul.
+
+Usage : python -m benchmarks.bench_payload [--rows N] [--json sortie.json]
+"""
+
+import argparse
+import json
+
+import numpy as np
+import plotly.express as px
+
+from utils.charts import compact_figure, payload_bytes
+from utils.load_data import read_games
+
+
+def page_figures(df):
+    """Figures représentatives des pages 02, 03 et 05 (construction d'origine)."""
+    popular = df.sort_values("Total_reviews", ascending=False).drop_duplicates("Name")
+    quality = np.where(df["Ratio_Positive"] >= 0.8, "Très positif (≥ 80 %)", "Mitigé ou négatif (< 80 %)")
+
+    return {
+        "02/distribution_prix": px.histogram(df, x="Price", nbins=60, template="plotly_dark"),
+        "03/top20": px.bar(popular.head(20)[::-1], x="Total_reviews", y="Name",
+                           orientation="h", text="Total_reviews", color="Total_reviews"),
+        "03/scatter_2d": px.scatter(popular.head(5000), x="Total_reviews", y="Ratio_Positive",
+                                    color="Release_year", size="Total_reviews",
+                                    hover_name="Name", log_x=True),
+        "03/scatter_3d": px.scatter_3d(popular.head(5000), x="Total_reviews", y="Ratio_Positive",
+                                       z="Release_year", color="Release_year",
+                                       hover_name="Name", size="Total_reviews"),
+        "05/popularite_qualite": px.scatter(df, x="Total_reviews", y="Ratio_Positive",
+                                            hover_name=quality, opacity=0.5),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=None, help="limiter le dataset à N lignes")
+    parser.add_argument("--json", default=None, help="écrire les mesures dans ce fichier")
+    args = parser.parse_args()
+
+    df = read_games()
+    if args.rows:
+        df = df.head(args.rows)
+
+    results = []
+    for chart_id, fig in page_figures(df).items():
+        before = payload_bytes(fig)
+        # 03/scatter_2d : figure à sélection sur la page, traces non redécoupées
+        after = payload_bytes(compact_figure(fig, split_texts=chart_id != "03/scatter_2d"))
+        results.append({"chart": chart_id, "bytes_before": before, "bytes_after": after})
+        print(f"{chart_id:<24} {before:>12,} o → {after:>12,} o  ({after / before:6.1%})")
+
+    total_before = sum(r["bytes_before"] for r in results)
+    total_after = sum(r["bytes_after"] for r in results)
+    print(f"{'total':<24} {total_before:>12,} o → {total_after:>12,} o  ({total_after / total_before:6.1%})")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"rows": len(df), "charts": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
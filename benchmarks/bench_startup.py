@@ -0,0 +1,195 @@
+"""
+Démarrage à froid : imports et premier affichage de chaque page, comparés au budget.
+
+Chaque script (app.py, puis les pages 01–06) est exécuté par AppTest dans un
+processus neuf lancé avec `python -X importtime`, sur un dataset synthétique
+déjà converti en Feather (caches Streamlit et cache de figures vides) :
+- imports : somme des temps propres des modules importés pendant le rerun
+- premier affichage : durée totale du premier rerun
+- modules lourds chargés par le rerun (pandas, numpy, pyarrow, plotly.express…)
+
+BUDGET DE DÉMARRAGE (dataset de référence : 100 000 jeux)
+- app.py : aucun module de données ni de graphique, premier affichage < 0,5 s
+- 01 (accueil) : ni plotly.express ni chargement du dataset, < 1,5 s
+  (pandas / pyarrow restent nécessaires : Streamlit en a besoin pour afficher un tableau)
+- 02 à 05 : premier affichage < 4 s, dont imports < 2 s
+- 06 : premier affichage < 6 s, dont imports < 2 s
+Tout dépassement fait sortir le script en erreur (code 1).
+
+Usage : python -m benchmarks.bench_startup [--rows 100000] [--json sortie.json]
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_pages import REPO, prepare_dataset, timed
+
+SCRIPTS = [os.path.join(REPO, "app.py")] + sorted(glob.glob(os.path.join(REPO, "pages", "0[1-6]_*.py")))
+
+HEAVY_MODULES = [
+    "pandas", "numpy", "pyarrow", "plotly.express", "requests", "utils.load_data",
+]
+
+# préfixe du script → (premier affichage max (s), imports max (s), modules interdits)
+STARTUP_BUDGET = {
+    "app": (0.5, 0.3, ["pandas", "numpy", "pyarrow", "plotly.express", "requests", "utils.load_data"]),
+    "01": (1.5, 1.0, ["plotly.express", "utils.load_data"]),
+    "02": (4.0, 2.0, []),
+    "03": (4.0, 2.0, []),
+    "04": (4.0, 2.0, []),
+    "05": (4.0, 2.0, []),
+    "06": (6.0, 2.0, []),
+}
+
+MARKER = "--- bench_startup: rerun ---"
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+# =========================================================
+# PROCESSUS DE MESURE
+# =========================================================
+
+def measure_script(script):
+    """Premier rerun du script ; les imports qu'il déclenche suivent MARKER sur stderr."""
+    import logging
+    logging.disable(logging.WARNING)
+    from streamlit.testing.v1 import AppTest
+
+    before = set(sys.modules)
+    print(MARKER, file=sys.stderr, flush=True)
+
+    at = AppTest.from_file(script, default_timeout=600)
+    _, seconds = timed(at.run)
+    errors = [e.value for e in at.exception if "Could not find page" not in e.value]
+
+    return {
+        "first_run_s": seconds,
+        "heavy_modules": [m for m in HEAVY_MODULES if m in sys.modules and m not in before],
+        "errors": errors,
+    }
+
+
+def parse_importtime(stderr):
+    """(temps d'import total en s, imports de premier niveau les plus coûteux) après MARKER."""
+    _, _, tail = stderr.partition(MARKER)
+    total_us, top = 0, []
+    for line in tail.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        total_us += int(self_us)
+        if len(indent) <= 1:
+            top.append((int(cumulative_us) / 1e6, name))
+    top.sort(reverse=True)
+    return total_us / 1e6, [{"module": name, "s": s} for s, name in top[:5]]
+
+
+# =========================================================
+# ORCHESTRATION
+# =========================================================
+
+def run_script(workdir, script):
+    env = dict(os.environ, PYTHONPATH=REPO, STEAM_PREWARM="0")   # mesures à froid
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "benchmarks.bench_startup",
+         "--worker", "--script", script],
+        cwd=workdir, env=env, capture_output=True, text=True,
+    )
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        return {"error": proc.stderr.strip().splitlines()[-1:] or ["échec"]}
+
+    result = json.loads(lines[-1])
+    result["imports_s"], result["top_imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def budget_for(script):
+    name = os.path.basename(script)
+    return STARTUP_BUDGET.get(name.split("_", 1)[0].removesuffix(".py"))
+
+
+def check_budget(script, result):
+    """Liste des dépassements (vide si le budget est tenu)."""
+    budget = budget_for(script)
+    if budget is None or "error" in result:
+        return [] if budget is None else ["échec de l'exécution"]
+
+    max_first_run, max_imports, forbidden = budget
+    problems = []
+    if result["first_run_s"] > max_first_run:
+        problems.append(f"premier affichage {result['first_run_s']:.2f}s > {max_first_run}s")
+    if result["imports_s"] > max_imports:
+        problems.append(f"imports {result['imports_s']:.2f}s > {max_imports}s")
+    loaded = sorted(set(forbidden) & set(result["heavy_modules"]))
+    if loaded:
+        problems.append("modules interdits : " + ", ".join(loaded))
+    if result["errors"]:
+        problems.append("exception dans la page")
+    return problems
+
+
+def run_startup(rows, seed=0):
+    workdir = tempfile.mkdtemp(prefix="steam_startup_")
+    try:
+        prepare_dataset(workdir, rows, seed)
+        results = []
+        for script in SCRIPTS:
+            result = {"script": os.path.basename(script), **run_script(workdir, script)}
+            result["over_budget"] = check_budget(script, result)
+            results.append(result)
+            print_result(result)
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def print_result(result):
+    if "error" in result:
+        print(f"{result['script']:<36} échec : {result['error']}")
+        return
+    status = "OK" if not result["over_budget"] else "HORS BUDGET : " + " ; ".join(result["over_budget"])
+    print(
+        f"{result['script']:<36} {result['first_run_s']:>6.2f}s  imports {result['imports_s']:>5.2f}s  "
+        f"[{', '.join(result['heavy_modules']) or '-'}]  {status}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="écrire les mesures dans ce fichier")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--script", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure_script(args.script)))
+        return
+
+    results = run_startup(args.rows, args.seed)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "rows": args.rows,
+                "budget": STARTUP_BUDGET,
+                "results": results,
+            }, f, indent=2)
+
+    if any(r.get("over_budget") or "error" in r for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
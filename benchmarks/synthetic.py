@@ -0,0 +1,332 @@
+"""
+Jeu de données synthétique au schéma de games_clean, à n'importe quelle échelle.
+
+Distributions proches du vrai catalogue Steam :
+- avis en loi de puissance (Pareto à partir de 50 avis, comme après l'ETL),
+  ratio positif plus élevé pour les jeux populaires
+- sorties en croissance exponentielle jusqu'à 2024
+- studios en loi de puissance (quelques gros éditeurs, une longue traîne)
+- jeux gratuits regroupés : certains éditeurs free-to-play, genre « Free to Play »
+- listes multi-genres au format liste Python ("['Action', 'Indie']")
+- titres en double (rééditions) et quasi-doublons du même studio (casse, ™,
+  « (Classic) », « Remastered », « Definitive Edition »)
+- quelques titres NSFW et faux positifs (« Essex », « Cumulus »…) pour les filtres
+
+Le fichier est produit par blocs de BLOCK_ROWS lignes : chaque bloc a son
+propre générateur (graine, numéro de bloc), il est donc calculé dans
+n'importe quel processus et le résultat ne dépend que de (n, seed). Les blocs
+sont mis en CSV dans un pool de processus et écrits dans l'ordre, avec un
+nombre de blocs en vol borné : la mémoire ne dépend pas de n (10M lignes ok).
+
+Usage : python -m benchmarks.synthetic 10000000 data/games_clean.csv
+                                       [--seed 0] [--workers 8]
+"""
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.genres import normalize_genre
+
+BLOCK_ROWS = 100_000
+
+COLUMNS = [
+    "AppID", "Name", "Release_date", "Release_year", "Developer", "Publisher",
+    "Positive", "Negative", "Genres", "Price", "DLC_count",
+    "Total_reviews", "Ratio_Positive", "Genres_list",
+]
+
+# =========================================================
+# VOCABULAIRE
+# =========================================================
+
+# genre → probabilité d'apparaître dans la liste d'un jeu
+GENRES = {
+    "Action": 0.40, "Adventure": 0.37, "Casual": 0.38, "Indie": 0.65,
+    "Massively Multiplayer": 0.03, "RPG": 0.17, "Racing": 0.04,
+    "Simulation": 0.20, "Sports": 0.04, "Strategy": 0.18,
+    "Early Access": 0.10, "Free to Play": 0.04, "Violent": 0.03, "Gore": 0.02,
+    "Education": 0.005, "Utilities": 0.005, "Sexual Content": 0.003, "Nudity": 0.003,
+}
+
+SYLLABLES = [
+    "ka", "ra", "to", "mi", "zen", "dor", "vel", "lum", "nox", "tar",
+    "quel", "sha", "bri", "gor", "fen", "ael", "mor", "thi", "xan", "vor",
+    "li", "pa", "rho", "sil", "ven", "dra", "kor", "mys", "ul", "ein",
+]
+ADJECTIVES = [
+    "Dark", "Lost", "Eternal", "Super", "Tiny", "Last", "Hidden", "Broken",
+    "Neon", "Wild", "Silent", "Infinite", "Ancient", "Crimson", "Little",
+    "Deep", "Iron", "Cosmic", "Frozen", "Secret",
+]
+NOUNS = [
+    "Quest", "Legend", "Kingdom", "Island", "Hunter", "Shadow", "Dragon",
+    "Farm", "Story", "Empire", "Rogue", "Tycoon", "Survival", "Racing",
+    "Battle", "Dungeon", "Odyssey", "Colony", "Defense", "Simulator", "Tales",
+    "Runner", "Arena", "Chronicles", "Frontier", "Escape", "Garden", "Station",
+    "Knights", "Heist",
+]
+SUFFIXES = [
+    "", "", "", "", "", "", " 2", " II", " 3", ": Remastered",
+    " Deluxe Edition", " VR", ": Definitive Edition", " Online", " Zero",
+]
+STUDIO_SUFFIXES = [
+    "Games", "Studios", "Interactive", "Entertainment", "Software", "Team",
+    "Labs", "Works",
+]
+NSFW_WORDS = ["Hentai", "Nude", "Adult", "Sexy", "Erotic", "Naked", "Stripper", "Fetish"]
+# noms anodins qui contiennent un motif (« sex », « cum »…)
+FALSE_POSITIVE_WORDS = ["Essex", "Middlesex", "Cumulus", "Cucumber", "Scumbag", "Adulthood"]
+NEAR_DUPLICATE_FORMS = ["upper", "lower", "tm", "classic", "spaces", "remastered", "definitive"]
+
+# points de prix Steam (hors gratuit) et leur fréquence
+PRICE_POINTS = np.array([0.99, 1.99, 2.99, 4.99, 6.99, 9.99, 12.99, 14.99,
+                         19.99, 24.99, 29.99, 39.99, 49.99, 59.99, 69.99])
+PRICE_WEIGHTS = np.array([8, 7, 6, 14, 5, 13, 4, 9, 8, 4, 4, 2, 1, 1, 0.3])
+
+# parts de lignes particulières
+DUPLICATE_SHARE = 0.03
+NEAR_DUPLICATE_SHARE = 0.01
+NSFW_SHARE = 0.01
+FALSE_POSITIVE_SHARE = 0.003
+F2P_PUBLISHER_SHARE = 0.08
+
+MIN_REVIEWS = 50
+MAX_REVIEWS = 9_000_000
+
+
+@lru_cache(maxsize=1)
+def invented_words():
+    """Mots inventés (2 ou 3 syllabes), identiques dans tous les processus."""
+    s = np.array(SYLLABLES, dtype=object)
+    two = (s[:, None] + s[None, :]).ravel()
+    three = (two[:, None] + s[None, :]).ravel()
+    return np.array([w.capitalize() for w in np.concatenate([two, three])], dtype=object)
+
+
+def studio_names(ids):
+    """Nom de studio déterministe pour chaque identifiant."""
+    words = invented_words()
+    suffixes = np.array(STUDIO_SUFFIXES, dtype=object)
+    return words[ids % len(words)] + " " + suffixes[(ids // len(words)) % len(suffixes)]
+
+
+def release_year_weights():
+    """Années 1997–2025 : croissance exponentielle, 2025 incomplète."""
+    years = np.arange(1997, 2026)
+    weights = np.exp(0.22 * (np.minimum(years, 2024) - 2024))
+    weights[years == 2025] *= 0.6
+    return years, weights / weights.sum()
+
+
+# =========================================================
+# UN BLOC
+# =========================================================
+
+def _names(rng, n):
+    """Titres : quatre gabarits combinés au vocabulaire (les collisions sont rares)."""
+    pick = lambda pool, size=n: np.array(pool, dtype=object)[rng.integers(0, len(pool), size)]
+    words = invented_words()
+    invented, other = words[rng.integers(0, len(words), (2, n))]
+    adj, noun, suffix = pick(ADJECTIVES), pick(NOUNS), pick(SUFFIXES)
+
+    templates = [
+        adj + " " + noun + ": " + invented,
+        invented + " " + noun + suffix,
+        invented + " " + other + suffix,
+        "The " + noun + " of " + invented + suffix,
+    ]
+    choice = rng.choice(len(templates), n, p=[0.2, 0.45, 0.2, 0.15])
+    names = np.choose(choice, templates)
+
+    # titres NSFW et faux positifs du filtre
+    special = rng.random(n)
+    nsfw = special < NSFW_SHARE
+    names[nsfw] = pick(NSFW_WORDS, nsfw.sum()) + " " + noun[nsfw]
+    false_positive = (special >= NSFW_SHARE) & (special < NSFW_SHARE + FALSE_POSITIVE_SHARE)
+    names[false_positive] = pick(FALSE_POSITIVE_WORDS, false_positive.sum()) + " " + noun[false_positive]
+    return names, nsfw
+
+
+def _duplicate_titles(rng, names):
+    """
+    Rééditions (même titre) et quasi-doublons d'un titre antérieur du bloc.
+    Retourne (names, source, near) : quasi-doublon i → ligne source[i].
+    """
+    n = len(names)
+    draw = rng.random(n)
+    source = (rng.random(n) * np.arange(n)).astype(np.int64)   # ligne antérieure
+
+    exact = (draw < DUPLICATE_SHARE) & (np.arange(n) > 0)
+    names[exact] = names[source[exact]]
+
+    near = (draw >= DUPLICATE_SHARE) & (draw < DUPLICATE_SHARE + NEAR_DUPLICATE_SHARE)
+    near &= np.arange(n) > 0
+    forms = rng.integers(0, len(NEAR_DUPLICATE_FORMS), n)
+    for i in np.flatnonzero(near):
+        base = names[source[i]]
+        form = NEAR_DUPLICATE_FORMS[forms[i]]
+        names[i] = {
+            "upper": base.upper(),
+            "lower": base.lower(),
+            "tm": base + "™",
+            "classic": base + " (Classic)",
+            "spaces": base.replace(" ", "  ", 1),
+            "remastered": base + " Remastered",
+            "definitive": base + ": Definitive Edition",
+        }[form]
+    return names, source, near
+
+
+def _genre_lists(rng, n, free, nsfw):
+    """(Genres, Genres_list) : chaque jeu tire ses genres indépendamment, au moins un."""
+    names = list(GENRES)
+    probs = np.array(list(GENRES.values()))
+    bits = rng.random((n, len(names))) < probs
+
+    f2p, sexual = names.index("Free to Play"), names.index("Sexual Content")
+    bits[:, f2p] |= free & (rng.random(n) < 0.85)
+    bits[:, sexual] |= nsfw & (rng.random(n) < 0.5)
+
+    empty = ~bits.any(axis=1)
+    bits[empty, rng.choice(len(names), empty.sum(), p=probs / probs.sum())] = True
+
+    masks = bits @ (1 << np.arange(len(names), dtype=np.int64))
+    uniques, inverse = np.unique(masks, return_inverse=True)
+    raw, canonical = [], []
+    for mask in uniques:
+        listed = [g for j, g in enumerate(names) if mask >> j & 1]
+        raw.append(str(listed))
+        canonical.append(str([normalize_genre(g) for g in listed]))
+    return np.array(raw, dtype=object)[inverse], np.array(canonical, dtype=object)[inverse]
+
+
+def synthetic_block(block, n, seed=0, block_rows=BLOCK_ROWS):
+    """Lignes [block * block_rows, …) d'un dataset de n jeux (dépend de seed et block seulement)."""
+    start = block * block_rows
+    size = max(0, min(block_rows, n - start))
+    rng = np.random.default_rng([seed, block])
+
+    # studios : rang en loi de puissance sur un vivier proportionnel à n
+    # (quelques gros studios, longue traîne) ; 65 % des jeux auto-édités
+    n_studios = max(50, n // 4)
+    developer_ids = (n_studios * rng.random(size) ** 2.5).astype(np.int64)
+    publisher_ids = np.where(
+        rng.random(size) < 0.65, developer_ids, (n_studios * rng.random(size) ** 4).astype(np.int64)
+    )
+    developers = studio_names(developer_ids)
+    developers[rng.random(size) < 0.003] = ""
+
+    years_axis, year_weights = release_year_weights()
+    years = rng.choice(years_axis, size, p=year_weights)
+    days = rng.integers(0, 365, size)
+    dates = years.astype(str).astype("datetime64[D]") + days
+
+    # avis : Pareto (queue lourde), ratio positif corrélé à la popularité
+    total = np.minimum(MIN_REVIEWS * (1 + rng.pareto(0.9, size)), MAX_REVIEWS).astype(np.int64)
+    ratio = rng.beta(3.5 + 0.6 * np.log10(total), 1.3)
+    positive = np.rint(total * ratio).astype(np.int64)
+    negative = total - positive
+
+    # gratuits : regroupés chez les éditeurs free-to-play, plus fréquents après 2015
+    f2p_publisher = (publisher_ids * 2654435761 % 1000) < F2P_PUBLISHER_SHARE * 1000
+    p_free = np.where(f2p_publisher, 0.6, np.where(years >= 2015, 0.09, 0.04))
+    free = rng.random(size) < p_free
+
+    # payants : jeux populaires un peu plus chers
+    price_idx = rng.choice(len(PRICE_POINTS), size, p=PRICE_WEIGHTS / PRICE_WEIGHTS.sum())
+    price_idx = np.minimum(price_idx + 2 * (total > 10_000), len(PRICE_POINTS) - 1)
+    prices = np.where(free, 0.0, PRICE_POINTS[price_idx])
+
+    # DLC : beaucoup de zéros, davantage pour les jeux populaires
+    dlc = rng.poisson(0.15 * np.log10(total) ** 2) * (rng.random(size) < 0.4)
+
+    names, nsfw = _names(rng, size)
+    names, source, near = _duplicate_titles(rng, names)
+    # quasi-doublons : rééditions du même studio (les homonymes exacts restent
+    # des collisions entre studios)
+    developers[near] = developers[source[near]]
+    genres, genres_list = _genre_lists(rng, size, free, nsfw)
+
+    df = pd.DataFrame({
+        "AppID": (start + np.arange(size, dtype=np.int64)) * 10 + 10,
+        "Name": names,
+        "Release_date": np.datetime_as_string(dates, unit="D"),
+        "Release_year": years,
+        "Developer": developers,
+        "Publisher": studio_names(publisher_ids),
+        "Positive": positive,
+        "Negative": negative,
+        "Genres": genres,
+        "Price": prices,
+        "DLC_count": dlc,
+    })
+    df["Total_reviews"] = df["Positive"] + df["Negative"]
+    df["Ratio_Positive"] = df["Positive"] / df["Total_reviews"].replace(0, 1)
+    df["Genres_list"] = genres_list
+    df.index = pd.RangeIndex(start, start + size)
+    return df[COLUMNS]
+
+
+def n_blocks(n, block_rows=BLOCK_ROWS):
+    return -(-n // block_rows)
+
+
+def synthetic_games_clean(n, seed=0, block_rows=BLOCK_ROWS):
+    """DataFrame de n jeux en mémoire (mêmes lignes que write_synthetic_csv)."""
+    blocks = [synthetic_block(b, n, seed, block_rows) for b in range(n_blocks(n, block_rows))]
+    return pd.concat(blocks) if blocks else synthetic_block(0, 0, seed, block_rows)
+
+
+# =========================================================
+# ÉCRITURE EN FLUX
+# =========================================================
+
+def _block_csv(block, n, seed, block_rows):
+    """Bloc au format CSV (en-tête pour le premier bloc seulement)."""
+    df = synthetic_block(block, n, seed, block_rows)
+    return df.to_csv(index=False, header=block == 0)
+
+
+def write_synthetic_csv(path, n, seed=0, workers=None, block_rows=BLOCK_ROWS):
+    """Écrit n jeux dans `path` (écriture atomique) ; blocs calculés en parallèle, écrits dans l'ordre."""
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    with open(tmp_path, "w", encoding="utf-8", newline="") as out, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for block in range(max(1, n_blocks(n, block_rows))):
+            pending.append(pool.submit(_block_csv, block, n, seed, block_rows))
+            while len(pending) >= max_in_flight:
+                out.write(pending.popleft().result())
+        while pending:
+            out.write(pending.popleft().result())
+
+    os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    write_synthetic_csv(args.output, args.rows, args.seed, args.workers)
+    size_mb = os.path.getsize(args.output) / 1e6
+    print(f"{args.rows:,} jeux → {args.output} ({size_mb:,.0f} Mo) en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
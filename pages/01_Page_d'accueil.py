@@ -1,7 +1,10 @@
+import csv
+
 import streamlit as st
 import pandas as pd
-import requests
-from io import BytesIO
+
+from utils.fetch import prefetch_csv_heads
+from utils.trace import end_page, span, start_page
 
 # --------------------------------------
 # Configuration générale
@@ -11,6 +14,7 @@ st.set_page_config(
     page_icon="🎮",
     layout="wide"
 )
+start_page("01_accueil")
 
 # --------------------------------------
 # CSS
@@ -67,27 +71,21 @@ PATH_GAMES_CLEAN = "data/games_clean.csv"
 # FONCTIONS DE CHARGEMENT
 # =========================================================
 
-def load_partial_csv_github(url, nrows=20):
-    """
-    Lecture légère depuis GitHub Release (limite 3 Mo).
-    """
-    try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        chunk = response.raw.read(3_000_000)  # max 3 Mo
-        return pd.read_csv(BytesIO(chunk), nrows=nrows)
-    except Exception as e:
-        raise RuntimeError(f"Erreur GitHub : {e}")
-
-
 def preview_local_csv(path, nrows=20):
     """Lecture rapide d’un CSV local."""
     return pd.read_csv(path, nrows=nrows)
 
 
-@st.cache_data
-def preview_dataset_github(url):
-    return load_partial_csv_github(url)
+def csv_columns(path):
+    """Noms de colonnes d’un CSV (ligne d’en-tête seulement, sans parser de lignes)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f))
+
+
+# aperçus GitHub lancés en arrière-plan dès l'ouverture de la page (en parallèle,
+# requêtes Range + cache disque) : les boutons ne bloquent plus le script
+with span("load/prefetch_github"):
+    github_previews = prefetch_csv_heads([URL_GAMES_RAW, URL_GAMES_FIXED])
 
 
 # =========================================================
@@ -175,18 +173,22 @@ Ce dernier fichier est celui utilisé dans toute l'application.
 # =========================================================
 def display_preview_from_github(url, title):
     try:
-        df = preview_dataset_github(url)
+        with st.spinner("Chargement de l’aperçu…"), span("load/github_preview"):
+            df = github_previews[url].result()
         st.write(f"### {title}")
-        st.dataframe(df, use_container_width=True)
+        with span("render/preview"):
+            st.dataframe(df, use_container_width=True)
     except Exception as e:
         st.error(f"Erreur : {e}")
 
 
 def display_preview_local(path, title):
     try:
-        df = preview_local_csv(path)
+        with span("load/local_preview"):
+            df = preview_local_csv(path)
         st.write(f"### {title}")
-        st.dataframe(df, use_container_width=True)
+        with span("render/preview"):
+            st.dataframe(df, use_container_width=True)
     except Exception as e:
         st.error(f"Erreur : {e}")
 
@@ -214,7 +216,7 @@ st.markdown("<hr>", unsafe_allow_html=True)
 # =========================================================
 st.markdown("<div class='section-title'>Structure du dataset final</div>", unsafe_allow_html=True)
 
-cols = preview_local_csv(PATH_GAMES_CLEAN).columns.tolist()
+cols = csv_columns(PATH_GAMES_CLEAN)
 
 with st.expander("Liste des colonnes"):
     st.write(cols)
@@ -346,3 +348,5 @@ st.markdown("---")
 # =========================================================
 
 st.page_link("pages/02_Marché_global.py", label="Page suivante : Marché global  ▶")
+
+end_page()
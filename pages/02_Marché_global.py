@@ -1,13 +1,16 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import requests
-from io import BytesIO
+
+from utils.charts import cached_figure
+from utils.cube import describe_distribution
+from utils.filters import filter_sidebar
+from utils.load_data import dataset_version, load_bitmap_index, load_filtered_cube, load_selection
+from utils.trace import end_page, span, start_page
 
 # =========================================================
 # CONFIGURATION
 # =========================================================
 st.set_page_config(page_title="Marché global — Steam 2014–2024", page_icon="📈", layout="wide")
+start_page("02_marche_global")
 
 # ---------------------------------------------------------
 # CSS
@@ -42,22 +45,25 @@ h1 {
 # CHARGEMENT DU FICHIER LOCAL
 # =========================================================
 
-PATH_GAMES_CLEAN = "data/games_clean.csv"
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv(PATH_GAMES_CLEAN)
+# filtres globaux (barre latérale) : sélection bitmap mémorisée par signature
+with span("load/filters"):
+    filters = filter_sidebar(load_bitmap_index())
+    year_min, year_max = filters.year_min, filters.year_max
 
-    # Sécurité
-    if "Total_reviews" not in df.columns:
-        df["Total_reviews"] = df["Positive"] + df["Negative"]
+if not load_selection(filters):
+    st.warning("Aucun jeu ne correspond aux filtres.")
+    end_page()
+    st.stop()
 
-    if "Ratio_Positive" not in df.columns:
-        df["Ratio_Positive"] = df["Positive"] / df["Total_reviews"].replace(0, 1)
+# agrégats pré-calculés (année × genre × tranche de prix) : pas de groupby par
+# rerun ; cube des jeux retenus si les filtres vont au-delà des années
+with span("load/cube"):
+    cube = load_filtered_cube(filters)
+    version = dataset_version()
 
-    return df[df["Release_year"].between(2014, 2024)]
-
-df = load_data()
+with span("transform/year_stats"):
+    year_stats = cube.by_year(year_min, year_max)
+    price_values, price_counts = cube.price_distribution(year_min, year_max)
 
 
 # =========================================================
@@ -81,9 +87,9 @@ st.markdown("<hr>", unsafe_allow_html=True)
 # =========================================================
 st.markdown("<div class='section-title'>Statistiques principales du marché</div>", unsafe_allow_html=True)
 
-total_games = df.shape[0]
-total_reviews = df["Total_reviews"].sum()
-free_pct = (df["Price"] == 0).mean() * 100
+total_games = int(year_stats["nb_jeux"].sum())
+total_reviews = int(year_stats["total_reviews"].sum())
+free_pct = year_stats["nb_gratuits"].sum() / max(total_games, 1) * 100
 
 colA, colB, colC = st.columns(3)
 
@@ -91,7 +97,7 @@ with colA:
     st.markdown(f"""
         <div class="card">
             <h3 style="color:#4A90E2;">{total_games:,}</h3>
-            <p>Jeux publiés (2014–2024)</p>
+            <p>Jeux publiés ({year_min}–{year_max})</p>
         </div>
     """, unsafe_allow_html=True)
 
@@ -119,30 +125,38 @@ st.markdown("<hr>", unsafe_allow_html=True)
 # =========================================================
 st.markdown("<div class='section-title'>Évolution des sorties annuelles</div>", unsafe_allow_html=True)
 
-count_year = df.groupby("Release_year")["AppID"].count().reset_index()
+count_year = year_stats[year_stats["nb_jeux"] > 0].rename(columns={"nb_jeux": "AppID"})
 
-fig1 = px.line(
-    count_year,
-    x="Release_year",
-    y="AppID",
-    markers=True,
-    template="plotly_dark",
-    color_discrete_sequence=["#4A90E2"],
-)
+def build_fig1():
+    import plotly.express as px
 
-fig1.update_layout(
-    yaxis_title="Nombre de jeux publiés",
-    xaxis_title="Année",
-    height=450,
-)
+    fig = px.line(
+        count_year,
+        x="Release_year",
+        y="AppID",
+        markers=True,
+        template="plotly_dark",
+        color_discrete_sequence=["#4A90E2"],
+    )
+
+    fig.update_layout(
+        yaxis_title="Nombre de jeux publiés",
+        xaxis_title="Année",
+        height=450,
+    )
+    return fig
 
-st.plotly_chart(fig1, use_container_width=True)
+
+fig1 = cached_figure(version, "02/sorties_annuelles", build_fig1, filters=filters)
+
+with span("render/sorties_annuelles"):
+    st.plotly_chart(fig1, use_container_width=True)
 
 delta = count_year["AppID"].iloc[-1] - count_year["AppID"].iloc[0]
 pct = (delta / count_year["AppID"].iloc[0]) * 100
 
 st.info(
-    f"Entre 2014 et 2024, le nombre de sorties augmente de **{pct:.1f}%**, "
+    f"Entre {count_year['Release_year'].iloc[0]} et {count_year['Release_year'].iloc[-1]}, le nombre de sorties augmente de **{pct:.1f}%**, "
     f"passant de **{count_year['AppID'].iloc[0]:,}** à **{count_year['AppID'].iloc[-1]:,}** jeux."
 )
 
@@ -157,23 +171,35 @@ st.markdown("<div class='section-title'>Distribution des prix</div>", unsafe_all
 col1, col2 = st.columns([2, 1])
 
 with col1:
-    fig2 = px.histogram(
-        df,
-        x="Price",
-        nbins=60,
-        template="plotly_dark",
-        color_discrete_sequence=["#4A90E2"],
-    )
-    fig2.update_layout(
-        height=450,
-        xaxis_title="Prix (€)",
-        yaxis_title="Nombre de jeux",
-    )
-    st.plotly_chart(fig2, use_container_width=True)
+    def build_fig2():
+        import plotly.express as px
+
+        fig = px.histogram(
+            x=price_values,
+            y=price_counts,
+            histfunc="sum",
+            nbins=60,
+            labels={"x": "Price", "y": "count"},
+            template="plotly_dark",
+            color_discrete_sequence=["#4A90E2"],
+        )
+        fig.update_layout(
+            height=450,
+            xaxis_title="Prix (€)",
+            yaxis_title="Nombre de jeux",
+        )
+        return fig
+
+    fig2 = cached_figure(version, "02/distribution_prix", build_fig2, filters=filters)
+    with span("render/distribution_prix"):
+        st.plotly_chart(fig2, use_container_width=True)
 
 with col2:
     st.markdown("### Statistiques")
-    st.write(df["Price"].describe().to_frame("Valeur"))
+    with span("transform/describe_prix"):
+        price_stats = describe_distribution(price_values, price_counts).to_frame("Valeur")
+    with span("render/describe_prix"):
+        st.write(price_stats)
 
 st.warning(f"Les jeux gratuits représentent **{free_pct:.1f}%** du marché.")
 
@@ -185,26 +211,36 @@ st.markdown("<hr>", unsafe_allow_html=True)
 # =========================================================
 st.markdown("<div class='section-title'>Évolution du prix médian</div>", unsafe_allow_html=True)
 
-median_price = df.groupby("Release_year")["Price"].median().reset_index()
+with span("transform/prix_median"):
+    median_price = cube.median_price_by_year(year_min, year_max)
+    median_price = median_price[year_stats["nb_jeux"].to_numpy() > 0]
 
-fig3 = px.line(
-    median_price,
-    x="Release_year",
-    y="Price",
-    markers=True,
-    template="plotly_dark",
-    color_discrete_sequence=["#F5A623"],
-)
+def build_fig3():
+    import plotly.express as px
 
-fig3.update_layout(
-    height=450,
-    yaxis_title="Prix médian (€)",
-    xaxis_title="Année",
-)
+    fig = px.line(
+        median_price,
+        x="Release_year",
+        y="Price",
+        markers=True,
+        template="plotly_dark",
+        color_discrete_sequence=["#F5A623"],
+    )
+
+    fig.update_layout(
+        height=450,
+        yaxis_title="Prix médian (€)",
+        xaxis_title="Année",
+    )
+    return fig
 
-st.plotly_chart(fig3, use_container_width=True)
 
-st.info(f"Le prix médian moyen entre 2014 et 2024 est de **{median_price['Price'].mean():.2f}€**.")
+fig3 = cached_figure(version, "02/prix_median", build_fig3, filters=filters)
+
+with span("render/prix_median"):
+    st.plotly_chart(fig3, use_container_width=True)
+
+st.info(f"Le prix médian moyen entre {year_min} et {year_max} est de **{median_price['Price'].mean():.2f}€**.")
 
 st.markdown("<hr>", unsafe_allow_html=True)
 
@@ -254,3 +290,5 @@ with col1:
 
 with col2:
     st.page_link("pages/03_Jeux_populaires.py", label="Page suivante : Jeux populaire ▶")
+
+end_page()
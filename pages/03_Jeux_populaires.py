@@ -3,13 +3,32 @@
 # =========================================================
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+from utils.charts import (
+    GRID_2D,
+    GRID_3D,
+    cached_figure,
+    full_window,
+    lod_figure_2d,
+    lod_figure_3d,
+    lod_scatter_data,
+    zoom_window,
+)
+from utils.filters import Filters, filter_sidebar
+from utils.leaderboard import METRICS, review_score
+from utils.load_data import (
+    dataset_version,
+    load_bitmap_index,
+    load_leaderboard,
+    load_selection,
+)
+from utils.trace import end_page, span, start_page
 
 # ---------------------------------------------------------
 # CONFIGURATION
 # ---------------------------------------------------------
 st.set_page_config(page_title="Jeux populaires", page_icon="🔥", layout="wide")
+start_page("03_jeux_populaires")
 
 # style visuel harmonisé
 st.markdown("""
@@ -50,67 +69,109 @@ st.markdown("<hr>", unsafe_allow_html=True)
 # CHARGEMENT DU FICHIER LOCAL
 # =========================================================
 
-PATH_GAMES_CLEAN = "data/games_clean.csv"
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv(PATH_GAMES_CLEAN)
+# rééditions, éditions et homonymes regroupés hors ligne (utils/titles.py) :
+# un jeu par game_group_id, le plus commenté, classé par année et par genre
+# (utils/leaderboard.py)
+with span("load/leaderboard"):
+    leaderboard = load_leaderboard()
+    version = dataset_version()
 
-    # Sécurité
-    if "Total_reviews" not in df.columns:
-        df["Total_reviews"] = df["Positive"] + df["Negative"]
+# filtres globaux (barre latérale) : sélection bitmap mémorisée par signature
+with span("load/filters"):
+    filters = filter_sidebar(load_bitmap_index())
+    selection = load_selection(filters)
 
-    if "Ratio_Positive" not in df.columns:
-        df["Ratio_Positive"] = df["Positive"] / df["Total_reviews"].replace(0, 1)
 
-    return df[df["Release_year"].between(2014, 2024)]
-
-df = load_data()
-
-# ---------------------------------------------------------
-# FIX DES DOUBLONS RAINBOW / GTA / ETC.
-# ---------------------------------------------------------
+@st.cache_resource(show_spinner=False, max_entries=16)
+@span("transform/popular_games")
+def popular_games(version, filters):
+    # pré-filtre bitmap (>= 10 000 avis) puis seuil exact sur les seuls jeux retenus
+    candidates = load_selection(filters._replace(min_reviews=max(filters.min_reviews, 10_000)))
+    games = leaderboard.frame.iloc[leaderboard.rows_in(candidates)]
+    return games[games["Total_reviews"] >= 20000]
 
-df_unique = (
-    df.sort_values("Total_reviews", ascending=False)
-      .drop_duplicates(subset=["Name"], keep="first")
-)
 
-df_filtered = df_unique[df_unique["Total_reviews"] >= 20000]
+df_filtered = popular_games(version, filters)
 
 # ---------------------------------------------------------
 # TOP 20 — JEU POPULAIRES
 # ---------------------------------------------------------
 st.markdown("<div class='section-title' style='color:#ffffff;'>Top 20 – Jeux les plus populaires</div>", unsafe_allow_html=True)
 
-top20 = df_unique.sort_values("Total_reviews", ascending=False).head(20)
-
-fig1 = px.bar(
-    top20[::-1],
-    x="Total_reviews",
-    y="Name",
-    orientation="h",
-    text="Total_reviews",
-    color="Total_reviews",
-    color_continuous_scale="Agsunset",
-    height=700
-)
+col_metric, col_year, col_genre = st.columns(3)
+
+with col_metric:
+    metric = st.selectbox("Classer par", list(METRICS), format_func=METRICS.get)
+
+with col_year:
+    # classement sur le catalogue complet : années limitées au curseur
+    years = [int(y) for y in leaderboard.years if filters.year_min <= y <= filters.year_max]
+    year = st.selectbox("Année de sortie", [None] + years[::-1],
+                        format_func=lambda y: f"{filters.year_min}–{filters.year_max}" if y is None else str(y))
+
+with col_genre:
+    genre = st.selectbox("Genre", [None] + leaderboard.genres.tolist(),
+                         format_func=lambda g: "Tous les genres" if g is None else g)
+
+# fusion de quelques listes courtes pré-triées, pas de tri de la table ;
+# autres filtres : classement global parcouru jusqu'à 20 jeux retenus
+with span("transform/top20"):
+    if filters.years_only():
+        lo, hi = (year, year) if year is not None else (filters.year_min, filters.year_max)
+        top20 = leaderboard.top_games(metric, 20, (max(lo, filters.year_min), min(hi, filters.year_max)), genre)
+    else:
+        page_filters = Filters(year or filters.year_min, year or filters.year_max, genres=(genre,) if genre else ())
+        top20 = leaderboard.top_selected_games(metric, 20, selection & load_selection(page_filters))
+    top20 = top20.assign(Score=review_score(top20["Ratio_Positive"], top20["Total_reviews"]))
+
+column = {"total_reviews": "Total_reviews", "ratio": "Ratio_Positive", "score": "Score"}[metric]
+
+def build_fig1():
+    import plotly.express as px
+
+    fig = px.bar(
+        top20[::-1],
+        x=column,
+        y="Name",
+        orientation="h",
+        text=column,
+        color=column,
+        color_continuous_scale="Agsunset",
+        height=700
+    )
+
+    fig.update_traces(
+        texttemplate='%{text:,}' if metric == "total_reviews" else '%{text:.1%}',
+        textposition="outside",
+    )
+    fig.update_layout(
+        xaxis_title=METRICS[metric],
+        yaxis_title="",
+        coloraxis_showscale=False,
+        template="plotly_white",
+        margin=dict(l=20, r=20, t=20, b=20),
+    )
+    return fig
 
-fig1.update_traces(texttemplate='%{text:,}', textposition="outside")
-fig1.update_layout(
-    xaxis_title="Nombre total d'avis",
-    yaxis_title="",
-    coloraxis_showscale=False,
-    template="plotly_white",
-    margin=dict(l=20, r=20, t=20, b=20),
-)
 
-st.plotly_chart(fig1, use_container_width=True)
+if top20.empty:
+    st.warning("Aucun jeu pour cette année et ce genre.")
+else:
+    fig1 = cached_figure(version, "03/top20", build_fig1, metric=metric, year=year, genre=genre, filters=filters)
 
-best_game = top20.iloc[0]["Name"]
-best_reviews = int(top20.iloc[0]["Total_reviews"])
+    with span("render/top20"):
+        st.plotly_chart(fig1, use_container_width=True)
 
-st.info(f"Jeu le plus populaire : **{best_game}** avec **{best_reviews:,} avis**.")
+best = (
+    leaderboard.top_games("total_reviews", 1, (filters.year_min, filters.year_max))
+    if filters.years_only()
+    else leaderboard.top_selected_games("total_reviews", 1, selection)
+)
+
+if not best.empty:
+    best_game = best.iloc[0]["Name"]
+    best_reviews = int(best.iloc[0]["Total_reviews"])
+    st.info(f"Jeu le plus populaire : **{best_game}** avec **{best_reviews:,} avis**.")
 
 st.markdown("<hr>", unsafe_allow_html=True)
 
@@ -122,62 +183,127 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+@st.cache_data(max_entries=64)
+@span("transform/lod_view")
+def lod_view(version, filters, window, by_year=False):
+    # une entrée par niveau de zoom : revenir sur une vue déjà vue est immédiat
+    grid = GRID_3D if by_year else GRID_2D
+    return lod_scatter_data(df_filtered, window, grid=grid, by_year=by_year)
+
+
+# fenêtre de zoom courante (log10(avis) × ratio), None = vue complète ;
+# oubliée quand les filtres changent (autres jeux, autre vue complète)
+if st.session_state.get("lod_filters") != filters:
+    st.session_state.pop("lod_window", None)
+    st.session_state["lod_filters"] = filters
+window = st.session_state.get("lod_window") or full_window(df_filtered)
+
+if st.session_state.get("lod_window") and st.button("Réinitialiser le zoom"):
+    del st.session_state["lod_window"]
+    st.rerun()
+
 tab1, tab2 = st.tabs(["Vue 2D", "Vue 3D"])
 
 # -------- 2D SCATTER --------
 with tab1:
     st.markdown("### Scatter 2D — Popularité vs Qualité")
 
-    fig2d = px.scatter(
-        df_filtered,
-        x="Total_reviews",
-        y="Ratio_Positive",
-        color="Release_year",
-        size="Total_reviews",
-        hover_name="Name",
-        log_x=True,
-        size_max=40,
-        color_continuous_scale="Viridis",
-        opacity=0.75,
-        height=600,
-    )
-
-    fig2d.update_layout(
-        xaxis_title="Nombre total d'avis (log)",
-        yaxis_title="Ratio d'avis positifs",
-        template="plotly_white",
-    )
-
-    st.plotly_chart(fig2d, use_container_width=True)
+    points, tiles = lod_view(version, filters, window)
+
+    def build_fig2d():
+        if tiles is None:
+            import plotly.express as px
+
+            fig = px.scatter(
+                points,
+                x="Total_reviews",
+                y="Ratio_Positive",
+                color="Release_year",
+                size="Total_reviews",
+                hover_name="Name",
+                log_x=True,
+                size_max=40,
+                color_continuous_scale="Viridis",
+                opacity=0.75,
+                height=600,
+            )
+        else:
+            fig = lod_figure_2d(points, tiles, height=600)
+
+        fig.update_layout(
+            xaxis_title="Nombre total d'avis (log)",
+            yaxis_title="Ratio d'avis positifs",
+            template="plotly_white",
+        )
+        return fig
+
+    if tiles is not None:
+        # trop de jeux : tuiles de densité + jeux les plus populaires nommés
+        st.caption(
+            f"{int(tiles['nb_jeux'].sum()):,} jeux regroupés en {len(tiles)} tuiles. "
+            "Sélectionnez une zone (boîte ou lasso) pour zoomer."
+        )
+
+    # on_select ci-dessous : numéros de trace et de point à conserver
+    fig2d = cached_figure(version, "03/scatter_2d", build_fig2d, selectable=True, window=window, filters=filters)
+
+    if tiles is None:
+        with span("render/scatter_2d"):
+            st.plotly_chart(fig2d, use_container_width=True)
+    else:
+        # clé liée à la fenêtre : la sélection qui a servi au zoom ne se réapplique pas
+        with span("render/scatter_2d"):
+            event = st.plotly_chart(
+                fig2d,
+                use_container_width=True,
+                on_select="rerun",
+                selection_mode=("box", "lasso"),
+                key=f"lod_2d_{window}",
+            )
+        new_window = zoom_window(event.selection.points, window)
+        if new_window:
+            st.session_state["lod_window"] = new_window
+            st.rerun()
 
 # -------- 3D SCATTER --------
 with tab2:
     st.markdown("### Scatter 3D — Popularité × Qualité × Année")
 
-    fig3d = px.scatter_3d(
-        df_filtered,
-        x="Total_reviews",
-        y="Ratio_Positive",
-        z="Release_year",
-        color="Release_year",
-        hover_name="Name",
-        size="Total_reviews",
-        size_max=35,
-        opacity=0.75,
-        color_continuous_scale="Plasma",
-        height=650,
-    )
-
-    fig3d.update_layout(
-        scene=dict(
-            xaxis_title="Popularité (reviews)",
-            yaxis_title="Qualité (ratio positif)",
-            zaxis_title="Année",
-        ),
-        template="plotly_dark",
-    )
-
-    st.plotly_chart(fig3d, use_container_width=True)
+    def build_fig3d():
+        points3d, tiles3d = lod_view(version, filters, window, by_year=True)
+        if tiles3d is None:
+            import plotly.express as px
+
+            fig = px.scatter_3d(
+                points3d,
+                x="Total_reviews",
+                y="Ratio_Positive",
+                z="Release_year",
+                color="Release_year",
+                hover_name="Name",
+                size="Total_reviews",
+                size_max=35,
+                opacity=0.75,
+                color_continuous_scale="Plasma",
+                height=650,
+            )
+        else:
+            fig = lod_figure_3d(points3d, tiles3d, height=650)
+
+        fig.update_layout(
+            scene=dict(
+                xaxis_title="Popularité (reviews)",
+                yaxis_title="Qualité (ratio positif)",
+                zaxis_title="Année",
+            ),
+            template="plotly_dark",
+        )
+        return fig
+
+    fig3d = cached_figure(version, "03/scatter_3d", build_fig3d, window=window, filters=filters)
+
+    with span("render/scatter_3d"):
+        st.plotly_chart(fig3d, use_container_width=True)
 
 # ---------------------------------------------------------
 # SYNTHÈSE
@@ -237,3 +363,5 @@ with col1:
 
 with col2:
     st.page_link("pages/04_Genres_et_stratégies.py", label="Page suivante : Genres & Stratégies ▶")
+
+end_page()
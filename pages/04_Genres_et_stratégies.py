@@ -1,7 +1,10 @@
-import re
-import pandas as pd
 import streamlit as st
-import plotly.express as px
+
+from utils.charts import cached_figure
+from utils.filters import filter_sidebar
+from utils.leaderboard import top_rows
+from utils.load_data import dataset_version, load_bitmap_index, load_genre_rankings, load_genre_table
+from utils.trace import end_page, span, start_page
 
 # =========================================================
 # CONFIG STREAMLIT
@@ -11,6 +14,7 @@ st.set_page_config(
     page_icon="📊",
     layout="wide"
 )
+start_page("04_genres")
 
 # ---------------------------------------------------------
 # TITRE
@@ -29,111 +33,29 @@ st.markdown("---")
 # CHARGEMENT DU FICHIER LOCAL
 # =========================================================
 
-PATH_GAMES_CLEAN = "data/games_clean.csv"
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv(PATH_GAMES_CLEAN)
-
-    # Sécurité
-    if "Total_reviews" not in df.columns:
-        df["Total_reviews"] = df["Positive"] + df["Negative"]
-
-    if "Ratio_Positive" not in df.columns:
-        df["Ratio_Positive"] = df["Positive"] / df["Total_reviews"].replace(0, 1)
+# filtres globaux (barre latérale) : sélection bitmap mémorisée par signature
+with span("load/filters"):
+    filters = filter_sidebar(load_bitmap_index())
 
-    return df[df["Release_year"].between(2014, 2024)]
+# statistiques par genre tirées du cube, indépendantes du seuil : une entrée
+# par (version du dataset, filtres), préchauffée au démarrage — voir load_genre_table()
+with span("load/genre_table"):
+    genre_final = load_genre_table(filters)
+    # genres déjà classés par métrique : le seuil ne fait que masquer
+    genre_rankings = load_genre_rankings(filters)
 
-df = load_data()
 # =========================================================
 # 2. PRÉPARATION DES GENRES
 # =========================================================
-def safe_parse_genres(x):
-    if isinstance(x, list):
-        return x
-    if not isinstance(x, str) or x.strip() == "":
-        return []
-    s = x.strip()
-
-    if s.startswith("[") and s.endswith("]"):
-        items = re.findall(r"'(.*?)'|\"(.*?)\"", s)
-        cleaned = [a or b for (a, b) in items if (a or b)]
-        if cleaned:
-            return cleaned
-
-    tokens = re.split(r"[,;/|]", s)
-    return [t.strip() for t in tokens if t.strip()]
-
-def normalize_genre(g):
-    if not isinstance(g, str):
-        return None
-    s = g.strip()
-    if s == "":
-        return None
-
-    low = s.lower()
-
-    if "free to play" in low or "free-to-play" in low or "f2p" in low:
-        return "free to play"
-
-    if low in {"rpg", "mmorpg"}:
-        return low.upper()
-
-    return s.title()
-
-@st.cache_data
-def compute_genre_table(min_nb_jeux_for_display: int = 1):
-    df_g = df.copy()
-
-    df_g["Genres_list"] = df_g["Genres"].apply(safe_parse_genres)
-    df_g = df_g.explode("Genres_list")
-    df_g["Genres_list"] = df_g["Genres_list"].apply(normalize_genre)
-
-    df_g = df_g[df_g["Genres_list"].notna() & (df_g["Genres_list"] != "")]
-
-    genre_stats = df_g.groupby("Genres_list").agg(
-        nb_jeux=("AppID", "count"),
-        total_reviews=("Total_reviews", "sum"),
-        total_pos=("Positive", "sum"),
-        total_neg=("Negative", "sum"),
-        ratio_moyen=("Ratio_Positive", "mean"),
-    ).reset_index()
-
-    genre_year = df_g.groupby(
-        ["Release_year", "Genres_list"]
-    ).size().reset_index(name="count")
-
-    genre_year = genre_year[
-        genre_year["Release_year"].between(2014, 2024)
-    ]
-
-    pivot_growth = genre_year.pivot(
-        index="Genres_list", columns="Release_year", values="count"
-    ).fillna(0)
-
-    for y in [2014, 2024]:
-        if y not in pivot_growth.columns:
-            pivot_growth[y] = 0
-
-    pivot_growth["croissance"] = pivot_growth[2024] - pivot_growth[2014]
-
-    genre_final = genre_stats.merge(
-        pivot_growth[["croissance"]],
-        left_on="Genres_list",
-        right_index=True,
-        how="left"
-    ).fillna(0)
-
-    max_reviews = genre_final["total_reviews"].max() or 1
-    genre_final["taille"] = (
-        genre_final["total_reviews"] / max_reviews * 3000 + 200
-    )
 
-    genre_filtered = genre_final[
-        genre_final["nb_jeux"] >= min_nb_jeux_for_display
-    ].copy()
+def genre_mask(genre_final, min_nb_jeux_for_display: int = 1):
+    # seul traitement qui dépend du slider : un simple masque sur ~30 lignes
+    return (genre_final["nb_jeux"] >= min_nb_jeux_for_display).to_numpy()
+
 
-    return genre_final, genre_filtered
+def ranked_genres(metric, mask, k=10):
+    # premiers genres du classement précalculé qui passent le masque
+    return genre_final.iloc[top_rows(genre_rankings[metric], mask, k)]
 
 
 # =========================================================
@@ -150,10 +72,14 @@ min_nb_jeux = st.slider(
     step=100,
 )
 
-genre_final, genre_filtered = compute_genre_table(min_nb_jeux)
+with span("transform/filter_genres"):
+    kept = genre_mask(genre_final, min_nb_jeux)
+    genre_filtered = genre_final[kept].copy()
+    high_volume = kept & (genre_final["total_reviews"] >= 1_000_000).to_numpy()
 
 if genre_filtered.empty:
     st.error("Aucun genre ne respecte ce seuil.")
+    end_page()
     st.stop()
 
 genre_filtered["ratio_moyen_pct"] = (genre_filtered["ratio_moyen"] * 100).round(1)
@@ -168,16 +94,17 @@ st.markdown("---")
 
 col_a, col_b, col_c = st.columns(3)
 
-g_pop = genre_filtered.sort_values("total_reviews", ascending=False).iloc[0]
+top_pop = ranked_genres("total_reviews", kept)
+top_quality = ranked_genres("ratio_moyen", high_volume)
+top_growth = ranked_genres("croissance", kept)
 
-g_quality_df = genre_filtered[genre_filtered["total_reviews"] >= 1_000_000]
+g_pop = top_pop.iloc[0]
 g_quality = (
-    g_quality_df.sort_values("ratio_moyen", ascending=False).iloc[0]
-    if not g_quality_df.empty
-    else genre_filtered.sort_values("ratio_moyen", ascending=False).iloc[0]
+    top_quality.iloc[0]
+    if not top_quality.empty
+    else ranked_genres("ratio_moyen", kept, k=1).iloc[0]
 )
-
-g_growth = genre_filtered.sort_values("croissance", ascending=False).iloc[0]
+g_growth = top_growth.iloc[0]
 
 with col_a:
     st.metric("Genre le plus populaire", g_pop["Genres_list"],
@@ -214,7 +141,8 @@ def categorize(row):
         return "Stable & fiable"
     return "Risque"
 
-genre_filtered["categorie"] = genre_filtered.apply(categorize, axis=1)
+with span("transform/categories"):
+    genre_filtered["categorie"] = genre_filtered.apply(categorize, axis=1)
 
 color_map = {
     "Winner": "#2ecc71",
@@ -226,45 +154,58 @@ color_map = {
 with tab2d:
     st.subheader("Matrice stratégique — Croissance × Qualité")
 
-    fig_scatter = px.scatter(
-        genre_filtered,
-        x="croissance",
-        y="ratio_moyen",
-        size="total_reviews",
-        color="categorie",
-        color_discrete_map=color_map,
-        hover_name="Genres_list",
-        hover_data={
-            "nb_jeux": True,
-            "total_reviews": True,
-            "ratio_moyen_pct": True,
-        },
-        size_max=60,
-        template="plotly_dark",
-    )
-
-    fig_scatter.add_vline(x=med_croissance, line_dash="dash", line_color="white")
-    fig_scatter.add_hline(y=med_ratio, line_dash="dash", line_color="white")
-
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    def build_matrix():
+        import plotly.express as px
+
+        fig = px.scatter(
+            genre_filtered,
+            x="croissance",
+            y="ratio_moyen",
+            size="total_reviews",
+            color="categorie",
+            color_discrete_map=color_map,
+            hover_name="Genres_list",
+            hover_data={
+                "nb_jeux": True,
+                "total_reviews": True,
+                "ratio_moyen_pct": True,
+            },
+            size_max=60,
+            template="plotly_dark",
+        )
+
+        fig.add_vline(x=med_croissance, line_dash="dash", line_color="white")
+        fig.add_hline(y=med_ratio, line_dash="dash", line_color="white")
+        return fig
+
+    fig_scatter = cached_figure(dataset_version(), "04/matrice", build_matrix, min_nb_jeux=min_nb_jeux, filters=filters)
+
+    with span("render/matrice"):
+        st.plotly_chart(fig_scatter, use_container_width=True)
 
 with tab3d:
     st.subheader("Vue 3D — Croissance × Qualité × Nombre de jeux")
 
-    fig3d = px.scatter_3d(
-        genre_filtered,
-        x="croissance",
-        y="ratio_moyen",
-        z="nb_jeux",
-        color="categorie",
-        color_discrete_map=color_map,
-        hover_name="Genres_list",
-        size="total_reviews",
-        size_max=50,
-        template="plotly_dark",
-    )
+    def build_3d():
+        import plotly.express as px
+
+        return px.scatter_3d(
+            genre_filtered,
+            x="croissance",
+            y="ratio_moyen",
+            z="nb_jeux",
+            color="categorie",
+            color_discrete_map=color_map,
+            hover_name="Genres_list",
+            size="total_reviews",
+            size_max=50,
+            template="plotly_dark",
+        )
 
-    st.plotly_chart(fig3d, use_container_width=True)
+    fig3d = cached_figure(dataset_version(), "04/vue_3d", build_3d, min_nb_jeux=min_nb_jeux, filters=filters)
+
+    with span("render/vue_3d"):
+        st.plotly_chart(fig3d, use_container_width=True)
 
 st.markdown("---")
 
@@ -279,54 +220,67 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Top 10 — Genres les plus populaires")
-    top_pop = genre_filtered.sort_values("total_reviews", ascending=False).head(10)
 
-    fig_pop = px.bar(
-        top_pop[::-1],
-        x="total_reviews",
-        y="Genres_list",
-        orientation="h",
-        template="plotly_dark",
-        color="total_reviews",
-        color_continuous_scale="Tealgrn",
-    )
+    def build_top_pop():
+        import plotly.express as px
+
+        return px.bar(
+            top_pop[::-1],
+            x="total_reviews",
+            y="Genres_list",
+            orientation="h",
+            template="plotly_dark",
+            color="total_reviews",
+            color_continuous_scale="Tealgrn",
+        )
 
-    st.plotly_chart(fig_pop, use_container_width=True)
+    fig_pop = cached_figure(dataset_version(), "04/top_populaires", build_top_pop, min_nb_jeux=min_nb_jeux, filters=filters)
+
+    with span("render/top_populaires"):
+        st.plotly_chart(fig_pop, use_container_width=True)
 
 with col2:
     st.subheader("Top 10 — Genres les mieux notés (volume suffisant)")
 
-    high_vol = genre_filtered[genre_filtered["total_reviews"] >= 1_000_000]
-    top_quality = high_vol.sort_values("ratio_moyen", ascending=False).head(10)
+    def build_top_quality():
+        import plotly.express as px
 
-    fig_quality = px.bar(
-        top_quality[::-1],
-        x="ratio_moyen",
-        y="Genres_list",
-        orientation="h",
-        template="plotly_dark",
-        color="ratio_moyen",
-        color_continuous_scale="Viridis",
-    )
+        return px.bar(
+            top_quality[::-1],
+            x="ratio_moyen",
+            y="Genres_list",
+            orientation="h",
+            template="plotly_dark",
+            color="ratio_moyen",
+            color_continuous_scale="Viridis",
+        )
 
-    st.plotly_chart(fig_quality, use_container_width=True)
+    fig_quality = cached_figure(dataset_version(), "04/top_qualite", build_top_quality, min_nb_jeux=min_nb_jeux, filters=filters)
+
+    with span("render/top_qualite"):
+        st.plotly_chart(fig_quality, use_container_width=True)
 
 st.markdown("---")
 
 st.subheader("Genres à plus forte croissance")
 
-top_growth = genre_filtered.sort_values("croissance", ascending=False).head(10)
+def build_growth():
+    import plotly.express as px
 
-fig_growth = px.bar(
-    top_growth,
-    x="Genres_list",
-    y="croissance",
-    template="plotly_dark",
-    color="croissance",
-    color_continuous_scale="Turbo",
-)
+    return px.bar(
+        top_growth,
+        x="Genres_list",
+        y="croissance",
+        template="plotly_dark",
+        color="croissance",
+        color_continuous_scale="Turbo",
+    )
 
-st.plotly_chart(fig_growth, use_container_width=True)
+
+fig_growth = cached_figure(dataset_version(), "04/croissance", build_growth, min_nb_jeux=min_nb_jeux, filters=filters)
+
+with span("render/croissance"):
+    st.plotly_chart(fig_growth, use_container_width=True)
 
 st.markdown("---")
 
@@ -382,3 +336,5 @@ with col1:
 
 with col2:
     st.page_link("pages/05_Synthèse_&_Conclusions.py", label="Page suivante : Synthèse & Conclusions ▶")
+
+end_page()
@@ -1,6 +1,16 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+from utils.charts import cached_figure, lod_figure_2d, lod_scatter_data
+from utils.filters import DEFAULT_FILTERS, filter_sidebar
+from utils.load_data import (
+    dataset_version,
+    load_bitmap_index,
+    load_filtered_cube,
+    load_period_games,
+    load_selected_games,
+    load_selection,
+)
+from utils.trace import end_page, span, start_page
 
 # =========================================================
 # CONFIGURATION
@@ -10,6 +20,7 @@ st.set_page_config(
     page_icon="📌",
     layout="wide"
 )
+start_page("05_synthese")
 
 # =========================================================
 # CSS — STYLE TECH / STEAM
@@ -67,21 +78,27 @@ st.markdown("---")
 # CHARGEMENT DES DONNÉES
 # =========================================================
 
-PATH = "data/games_clean.csv"
+# filtres globaux (barre latérale) : sélection bitmap mémorisée par signature
+with span("load/filters"):
+    filters = filter_sidebar(load_bitmap_index())
+    year_min, year_max = filters.year_min, filters.year_max
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv(PATH)
+if not load_selection(filters):
+    st.warning("Aucun jeu ne correspond aux filtres.")
+    end_page()
+    st.stop()
 
-    if "Total_reviews" not in df.columns:
-        df["Total_reviews"] = df["Positive"] + df["Negative"]
+with span("load/period_games"):
+    df = load_period_games() if filters == DEFAULT_FILTERS else load_selected_games(filters)
+    cube = load_filtered_cube(filters)
+    version = dataset_version()
 
-    if "Ratio_Positive" not in df.columns:
-        df["Ratio_Positive"] = df["Positive"] / df["Total_reviews"].replace(0, 1)
 
-    return df[df["Release_year"].between(2014, 2024)]
-
-df = load_data()
+@st.cache_data(max_entries=16)
+@span("transform/lod_view")
+def popularity_quality_view(version, filters):
+    # tuiles de densité + jeux les plus populaires, au lieu d'un échantillon
+    return lod_scatter_data(df)
 
 # =========================================================
 # INTRODUCTION — PROBLÉMATIQUE
@@ -135,66 +152,84 @@ Ces deux dimensions expliquent pourquoi des titres comme **GTA V**, **PUBG**,
 """, unsafe_allow_html=True)
 
 with col2:
-    fig = px.scatter(
-        df.sample(1500, random_state=42),
-        x="Total_reviews",
-        y="Ratio_Positive",
-        title="Popularité × Qualité (échantillon représentatif)",
-        opacity=0.5,
-        template="plotly_dark",
-    )
-    fig.update_layout(height=400)
-    st.plotly_chart(fig, use_container_width=True)
+    def build_popularity_quality():
+        points, tiles = popularity_quality_view(version, filters)
+        if tiles is None:
+            import plotly.express as px
+
+            fig = px.scatter(
+                points,
+                x="Total_reviews",
+                y="Ratio_Positive",
+                title="Popularité × Qualité",
+                opacity=0.5,
+                template="plotly_dark",
+            )
+        else:
+            fig = lod_figure_2d(points, tiles, log_x=False)
+            fig.update_layout(
+                title="Popularité × Qualité (densité + jeux les plus populaires)",
+                xaxis_title="Total_reviews",
+                yaxis_title="Ratio_Positive",
+                template="plotly_dark",
+            )
+        fig.update_layout(height=400)
+        return fig
+
+    fig = cached_figure(version, "05/popularite_qualite", build_popularity_quality, filters=filters)
+    with span("render/popularite_qualite"):
+        st.plotly_chart(fig, use_container_width=True)
 
 st.markdown("---")
 
 # =========================================================
-# 2. CROISSANCE DES GENRES (2014–2024)
+# 2. CROISSANCE DES GENRES (PÉRIODE FILTRÉE)
 # =========================================================
-st.markdown("<div class='section-title'>2. Croissance des genres (2014–2024)</div>", unsafe_allow_html=True)
-
-# Exploser correctement les listes de genres
-genre_rows = df.explode("Genres_list")
-
-# 🔥 FIX DÉFINITIF : supprimer genres vides / listes vides / chaînes vides
-genre_rows = genre_rows[
-    genre_rows["Genres_list"].notna()
-    & (genre_rows["Genres_list"].astype(str).str.strip() != "")
-    & (genre_rows["Genres_list"].astype(str).str.strip() != "[]")
-]
-
-# Compter jeux par genre et année
-genre_year = (
-    genre_rows.groupby(["Release_year", "Genres_list"])["AppID"]
-              .count()
-              .reset_index()
-)
-
-# Top 8 genres
-top_genres = (
-    genre_year.groupby("Genres_list")["AppID"]
-              .sum()
-              .sort_values(ascending=False)
-              .head(8)
-              .index
-)
+st.markdown(f"<div class='section-title'>2. Croissance des genres ({year_min}–{year_max})</div>", unsafe_allow_html=True)
+
+with span("transform/genre_year"):
+    # Compter jeux par genre et année (cumul du cube, sans explode)
+    genre_year = (
+        cube.genre_year_counts(year_min, year_max)
+        .stack()
+        .rename("AppID")
+        .reset_index()
+    )
+    genre_year = genre_year[genre_year["AppID"] > 0]
+
+    # Top 8 genres
+    top_genres = (
+        genre_year.groupby("Genres_list")["AppID"]
+                  .sum()
+                  .sort_values(ascending=False)
+                  .head(8)
+                  .index
+    )
 
 # Graphique final
-fig_growth = px.line(
-    genre_year[genre_year["Genres_list"].isin(top_genres)],
-    x="Release_year",
-    y="AppID",
-    color="Genres_list",
-    title="Évolution des genres dominants (2014–2024)",
-    template="plotly_dark",
-)
+def build_growth():
+    import plotly.express as px
+
+    fig_growth = px.line(
+        genre_year[genre_year["Genres_list"].isin(top_genres)],
+        x="Release_year",
+        y="AppID",
+        color="Genres_list",
+        title=f"Évolution des genres dominants ({year_min}–{year_max})",
+        template="plotly_dark",
+    )
 
-fig_growth.update_layout(
-    height=420,
-    legend_title_text="Genres",
-)
+    fig_growth.update_layout(
+        height=420,
+        legend_title_text="Genres",
+    )
+    return fig_growth
+
+
+fig_growth = cached_figure(version, "05/croissance_genres", build_growth, filters=filters)
 
-st.plotly_chart(fig_growth, use_container_width=True)
+with span("render/croissance_genres"):
+    st.plotly_chart(fig_growth, use_container_width=True)
 
 st.markdown("""
 <div class="block">
@@ -217,32 +252,36 @@ st.markdown("---")
 # =========================================================
 st.markdown("<div class='section-title'>3. Positionnement stratégique des genres</div>", unsafe_allow_html=True)
 
-genre_stats = (
-    df.explode("Genres_list")
-      .groupby("Genres_list")
-      .agg({
-          "Total_reviews": "mean",
-          "Ratio_Positive": "mean",
-          "AppID": "count"
-      })
-      .rename(columns={"AppID": "Nb_jeux"})
-      .reset_index()
-)
+with span("transform/genre_stats"):
+    genre_stats = cube.genre_table(year_min, year_max)
+    genre_stats = genre_stats.assign(
+        Total_reviews=genre_stats["total_reviews"] / genre_stats["nb_jeux"],
+        Ratio_Positive=genre_stats["ratio_moyen"],
+        Nb_jeux=genre_stats["nb_jeux"],
+    )[["Genres_list", "Total_reviews", "Ratio_Positive", "Nb_jeux"]]
 
-fig_map = px.scatter(
-    genre_stats,
-    x="Total_reviews",
-    y="Ratio_Positive",
-    size="Nb_jeux",
-    hover_name="Genres_list",
-    title="Carte stratégique : Popularité × Qualité × Volume",
-    template="plotly_dark",
-    color="Ratio_Positive",
-    color_continuous_scale="Plasma"
-)
-fig_map.update_layout(height=450)
+def build_map():
+    import plotly.express as px
+
+    fig_map = px.scatter(
+        genre_stats,
+        x="Total_reviews",
+        y="Ratio_Positive",
+        size="Nb_jeux",
+        hover_name="Genres_list",
+        title="Carte stratégique : Popularité × Qualité × Volume",
+        template="plotly_dark",
+        color="Ratio_Positive",
+        color_continuous_scale="Plasma"
+    )
+    fig_map.update_layout(height=450)
+    return fig_map
 
-st.plotly_chart(fig_map, use_container_width=True)
+
+fig_map = cached_figure(version, "05/carte_genres", build_map, filters=filters)
+
+with span("render/carte_genres"):
+    st.plotly_chart(fig_map, use_container_width=True)
 
 st.markdown("""
 <div class="block">
@@ -300,4 +339,6 @@ with col1:
     st.page_link("pages/04_Genres_et_stratégies.py", label="◀ Retour : Genres & stratégies")
 
 with col2:
-    st.page_link("pages/06_Recommandations.py", label="Page suivante : Recommandations ▶")
\ No newline at end of file
+    st.page_link("pages/06_Recommandations.py", label="Page suivante : Recommandations ▶")
+
+end_page()
@@ -1,9 +1,17 @@
-import os
-import re
-import numpy as np
-import pandas as pd
 import streamlit as st
-import plotly.express as px
+
+from utils.charts import cached_recommendation_figure
+from utils.filters import ALL_YEARS_FILTERS, filter_sidebar
+from utils.load_data import (
+    dataset_version,
+    load_bitmap_index,
+    load_cleaned_data,
+    load_name_index,
+    load_neighbour_table,
+    load_selection,
+)
+from utils.recommend import recommendations_for
+from utils.trace import end_page, span, start_page
 
 # =========================================================
 # CONFIG STREAMLIT
@@ -13,6 +21,7 @@ st.set_page_config(
     page_icon="🎮",
     layout="wide"
 )
+start_page("06_recommandations")
 
 st.markdown("""
 <div style="text-align:center; padding: 10px 0 20px 0;">
@@ -24,182 +33,72 @@ st.markdown("""
 
 st.markdown("---")
 
-DATA_DIR = "data"
-FILE = os.path.join(DATA_DIR, "games_clean.csv")
-
 # =========================================================
-# OUTILS GENRES
+# 1. CHARGEMENT + NETTOYAGE + CATÉGORIE PRINCIPALE
 # =========================================================
 
-def safe_parse_genres(x):
-    if isinstance(x, list):
-        return x
-    if not isinstance(x, str) or x.strip() == "":
-        return []
-    s = x.strip()
-
-    # cas liste python "[...]" avec quotes
-    if s.startswith("[") and s.endswith("]"):
-        items = re.findall(r"'(.*?)'|\"(.*?)\"", s)
-        return [a or b for (a, b) in items if (a or b)]
-
-    # cas séparateurs texte
-    tokens = re.split(r"[,;/|]", s)
-    return [t.strip() for t in tokens if t.strip()]
-
-
-def normalize_genre(g):
-    if not isinstance(g, str):
-        return None
-    s = g.strip()
-    if s == "":
-        return None
-    return s.title()
-
-
-# =========================================================
-# 1. CHARGEMENT + NETTOYAGE
-# =========================================================
-
-@st.cache_data
-def load_cleaned_data():
-    df = pd.read_csv(FILE)
-
-    df["Name"] = df["Name"].fillna("Unknown")
-    df["Genres"] = df["Genres"].fillna("")
-    df["Positive"] = df["Positive"].fillna(0).astype(int)
-    df["Negative"] = df["Negative"].fillna(0).astype(int)
-
-    df["Total_reviews"] = df["Positive"] + df["Negative"]
-    df["Ratio_Positive"] = df["Positive"] / df["Total_reviews"].replace(0, 1)
-
-    # parsing genres
-    df["Genres_list"] = df["Genres"].apply(safe_parse_genres)
-    df["Genres_list"] = df["Genres_list"].apply(
-        lambda lst: [normalize_genre(g) for g in lst if normalize_genre(g)]
-    )
-
-    # ---------- FILTRE NSFW FORT ----------
-    NSFW_PATTERNS = [
-        "sex", "sexual", "adult", "hentai", "nsfw", "erotic", "porn",
-        "pussy", "boob", "dick", "naked", "nude", "orgasm", "futa",
-        "fetish", "milf", "bdsm", "bondage", "deepthroat", "sperm",
-        "vagina", "cum", "penetrat", "tits", "stripper"
-    ]
-
-    def is_nsfw(row):
-        txt = (str(row["Name"]) + " " + str(row["Genres"])).lower()
-        return any(k in txt for k in NSFW_PATTERNS)
-
-    df = df[~df.apply(is_nsfw, axis=1)]
-
-    # jeux quasi inconnus → on enlève
-    df = df[df["Total_reviews"] >= 50]
-
-    # trop de genres = souvent du flood
-    df = df[df["Genres_list"].apply(lambda x: len(x) <= 6)]
-
-    # titres à rallonge bizarres
-    df = df[df["Name"].apply(lambda x: len(str(x)) < 80)]
+# catalogue nettoyé (catégorie principale incluse) partagé par les sessions,
+# préchauffé au démarrage du serveur — voir utils/load_data.py et utils/prewarm.py
+with span("load/cleaned_data"):
+    df, genre_bits = load_cleaned_data()
+st.caption(f"{len(df):,} jeux pris en compte après nettoyage.".replace(",", " "))
 
-    # titres full caps suspects
-    df = df[df["Name"].apply(lambda x: sum(c.isupper() for c in str(x)) < 20)]
+# filtres globaux (barre latérale) : ils restreignent les jeux recommandés ;
+# sans filtre modifié, tout le catalogue nettoyé (toutes années) est proposé ;
+# la plage d'années par défaut des pages de marché (2014–2024) n'est appliquée
+# que si l'utilisateur la modifie
+with span("load/filters"):
+    filters = filter_sidebar(load_bitmap_index(), all_years=True)
+    active_filters = None if filters == ALL_YEARS_FILTERS else filters
 
-    df["log_reviews"] = np.log1p(df["Total_reviews"])
 
-    return df
+@st.cache_resource(show_spinner=False, max_entries=8)
+@span("transform/recommendable")
+def recommendable(version, filters):
+    # index du catalogue nettoyé = positions dans load_games()
+    return load_selection(filters).contains(df.index.to_numpy())
 
 
-df = load_cleaned_data()
-st.caption(f"{len(df):,} jeux pris en compte après nettoyage.".replace(",", " "))
+allowed = None if active_filters is None else recommendable(dataset_version(), active_filters)
 
 
 # =========================================================
-# 2. CATÉGORISATION PRINCIPALE (VERSION AVEC OPEN WORLD)
+# 2. SÉLECTION DU JEU
 # =========================================================
 
-KNOWN_OPEN_WORLD = [
-    "gta", "grand theft auto", "red dead", "watch dogs", "saints row",
-    "sleeping dogs", "mafia", "just cause", "assassin",
-    "far cry", "spider-man", "spiderman", "batman arkham"
-]
-
-
-def infer_main_category(name, genres):
-    if not isinstance(genres, list):
-        genres = []
-    gl = [g.lower() for g in genres]
-    name_low = str(name).lower()
-
-    def contains_any(keywords):
-        return any(any(k in g for k in keywords) for g in gl)
-
-    # -------- OPEN WORLD / SANDBOX --------
-    if any(k in name_low for k in KNOWN_OPEN_WORLD) or \
-       contains_any(["open world", "sandbox", "crime"]):
-        return "Open World / Sandbox"
-
-    # Battle Royale
-    if contains_any(["battle royale"]):
-        return "Battle Royale"
-
-    # FPS
-    if contains_any(["fps", "first-person shooter", "shooter"]) and not contains_any(["battle royale"]):
-        return "FPS"
-
-    # RPG
-    if contains_any(["rpg", "jrpg", "role-playing", "action rpg"]):
-        return "RPG"
-
-    # MMO
-    if contains_any(["mmorpg", "mmo", "massively multiplayer"]):
-        return "MMO / MMORPG"
-
-    # Strategy
-    if contains_any(["strategy", "rts", "4x", "turn-based"]):
-        return "Strategy"
-
-    # Simulation
-    if contains_any(["simulation", "simulator", "city builder", "building", "tycoon"]):
-        return "Simulation"
-
-    # Sports / racing
-    if contains_any(["sports", "racing", "football", "soccer", "f1", "basketball", "tennis"]):
-        return "Sports / Racing"
-
-    # Survival / horror
-    if contains_any(["survival", "horror", "zombie"]):
-        return "Survival / Horror"
-
-    # Indie
-    if contains_any(["indie", "casual", "puzzle", "relaxing"]):
-        return "Indie / Casual"
-
-    # fallback
-    if contains_any(["action", "adventure"]):
-        return "Action / Adventure"
-
-    return "Autre"
+st.subheader("Sélection du jeu de référence")
 
+# recherche côté serveur (préfixe, trigrammes, fautes de frappe) : seules les
+# suggestions sont envoyées au navigateur, pas le catalogue entier
+with span("load/name_index"):
+    name_index = load_name_index()
 
-df["main_category"] = df.apply(
-    lambda row: infer_main_category(row["Name"], row["Genres_list"]),
-    axis=1
+query = st.text_input(
+    "Rechercher un jeu :",
+    placeholder="Début du nom, mot du titre… (accents et majuscules indifférents)",
 )
 
+with span("transform/search"):
+    suggestions = name_index.search(query)
 
-# =========================================================
-# 3. SÉLECTION DU JEU
-# =========================================================
+if not suggestions:
+    st.warning("Aucun jeu ne correspond à cette recherche.")
+    end_page()
+    st.stop()
 
-st.subheader("Sélection du jeu de référence")
+# options = AppID ; le jeu est retrouvé par l'index de hachage, sans parcours
+names_by_app_id = dict(zip(df["AppID"].iloc[suggestions].tolist(), df["Name"].iloc[suggestions]))
 
-selected_game = st.selectbox(
-    "Choisissez un jeu :",
-    sorted(df["Name"].unique())
-)
+with span("render/selectbox"):
+    selected_app_id = st.selectbox(
+        "Choisissez un jeu :",
+        list(names_by_app_id),
+        format_func=names_by_app_id.get,
+    )
 
-game_row = df[df["Name"] == selected_game].iloc[0]
+ref = name_index.position_of_app_id(selected_app_id)
+game_row = df.iloc[ref]
+selected_game = game_row["Name"]
 cat = game_row["main_category"]
 
 st.info(f"Jeu sélectionné : **{selected_game}** — catégorie détectée : **{cat}**")
@@ -208,131 +107,63 @@ st.markdown("---")
 
 
 # =========================================================
-# 4. MOTEUR DE SIMILARITÉ
+# 3. MOTEUR DE SIMILARITÉ
 # =========================================================
 
-def genre_overlap_count(target_row, ref_row):
-    g1 = set(ref_row["Genres_list"])
-    g2 = set(target_row["Genres_list"])
-    return len(g1.intersection(g2))
-
-
-def similarity_score(target_row, ref_row):
-    g1 = set(ref_row["Genres_list"])
-    g2 = set(target_row["Genres_list"])
-
-    # genres (0–50)
-    if len(g1):
-        genre_score = len(g1.intersection(g2)) / len(g1) * 50
-    else:
-        genre_score = 0
-
-    # qualité (0–30)
-    ratio_diff = abs(ref_row["Ratio_Positive"] - target_row["Ratio_Positive"])
-    qual_score = max(0, (1 - ratio_diff) * 30)
-
-    # popularité (0–20)
-    pop_diff = abs(ref_row["log_reviews"] - target_row["log_reviews"])
-    pop_score = max(0, (1 - pop_diff / 5) * 20)
+# table précalculée (python -m utils.neighbours) si elle est à jour,
+# sinon score 50/30/20 calculé sur tableaux — voir utils/recommend.py
+with span("load/neighbour_table"):
+    neighbour_table = load_neighbour_table()
 
-    return genre_score + qual_score + pop_score
-
-
-candidates = df[df["Name"] != selected_game].copy()
-same_cat = candidates[candidates["main_category"] == cat].copy()
-
-if len(same_cat) >= 20:
-    base = same_cat
-else:
-    base = candidates
-
-base["common_genres"] = base.apply(
-    lambda r: genre_overlap_count(r, game_row),
-    axis=1
-)
-
-with_common = base[base["common_genres"] >= 1]
-
-if len(with_common) >= 5:
-    work = with_common
-else:
-    work = base
-
-work["score_similarité"] = work.apply(
-    lambda r: similarity_score(r, game_row),
-    axis=1
-)
-
-top5 = work.sort_values("score_similarité", ascending=False).head(5)
+with span("transform/similarity"):
+    top5 = recommendations_for(df, genre_bits, ref, neighbour_table, k=5, allowed=allowed)
 
 if top5.empty:
     st.error("Pas assez de données pour générer des recommandations pertinentes.")
+    end_page()
     st.stop()
 
 
 # =========================================================
-# 5. AFFICHAGE DES RECOMMANDATIONS
+# 4. AFFICHAGE DES RECOMMANDATIONS
 # =========================================================
 
 st.subheader(f"Jeux recommandés pour **{selected_game}**")
 
-for _, row in top5.iterrows():
-    genres_txt = ", ".join(row["Genres_list"]) if row["Genres_list"] else "Non renseigné"
-
-    st.markdown(f"""
-    <div style="background:#2c2c2c; padding:15px; border-radius:8px; margin-bottom:10px;">
-        <h4 style="color:#9b59b6; margin-bottom:4px;">🎮 {row['Name']}</h4>
-        <p style="color:#d0d0d0; margin:0;">
-            Score de similarité : <b>{row['score_similarité']:.1f} / 100</b><br>
-            Catégorie : <b>{row['main_category']}</b><br>
-            Ratio positif : {row['Ratio_Positive']*100:.1f} %<br>
-            Avis totaux : {int(row['Total_reviews']):,} avis<br>
-            Genres : {genres_txt}
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+with span("render/cards"):
+    for _, row in top5.iterrows():
+        genres_txt = ", ".join(row["Genres_list"]) if row["Genres_list"] else "Non renseigné"
+
+        st.markdown(f"""
+        <div style="background:#2c2c2c; padding:15px; border-radius:8px; margin-bottom:10px;">
+            <h4 style="color:#9b59b6; margin-bottom:4px;">🎮 {row['Name']}</h4>
+            <p style="color:#d0d0d0; margin:0;">
+                Score de similarité : <b>{row['score_similarité']:.1f} / 100</b><br>
+                Catégorie : <b>{row['main_category']}</b><br>
+                Ratio positif : {row['Ratio_Positive']*100:.1f} %<br>
+                Avis totaux : {int(row['Total_reviews']):,} avis<br>
+                Genres : {genres_txt}
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
 
 st.markdown("---")
 
 
 # =========================================================
-# 6. VISUALISATION
+# 5. VISUALISATION
 # =========================================================
 
 st.subheader("Popularité × Qualité des jeux recommandés")
 
-fig = px.scatter(
-    top5,
-    x="Total_reviews",
-    y="Ratio_Positive",
-    size="Total_reviews",
-    color="score_similarité",
-    hover_name="Name",
-    color_continuous_scale="Plasma",
-    height=600,
-)
-
-fig.add_scatter(
-    x=[game_row["Total_reviews"]],
-    y=[game_row["Ratio_Positive"]],
-    mode="markers+text",
-    text=[selected_game],
-    textposition="top center",
-    marker=dict(size=20, color="white", line=dict(width=2, color="black")),
-    name="Jeu sélectionné"
-)
-
-fig.update_layout(
-    xaxis_title="Nombre d'avis",
-    yaxis_title="Ratio d'avis positifs",
-    template="plotly_dark",
-)
+fig = cached_recommendation_figure(dataset_version(), top5, game_row, active_filters)
 
-st.plotly_chart(fig, use_container_width=True)
+with span("render/recommandations"):
+    st.plotly_chart(fig, use_container_width=True)
 
 
 # =========================================================
-# 7. EXPLICATION
+# 6. EXPLICATION
 # =========================================================
 # 1. Calculs comme avant
 st.subheader("Pourquoi ces recommandations ?")
@@ -393,3 +224,5 @@ st.markdown(html_block.replace(",", " "), unsafe_allow_html=True)
 
 st.markdown("---")
 st.page_link("pages/05_Synthèse_&_Conclusions.py", label="◀ Page précédente : Synthèse & Conclusion")
+
+end_page()
@@ -0,0 +1,211 @@
+"""
+ETL incrémental (utils/etl.py) : mêmes lignes qu'un passage complet, CSV et
+copies Feather jamais réécrits pour un changement, ordre du brut rétabli par
+le compactage.
+"""
+
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import etl
+from utils.etl import manifest_path, run_etl, run_incremental_etl
+from utils.load_data import (
+    build_columnar_copy,
+    patch_path,
+    read_clean_csv,
+    read_columnar,
+    read_columnar_patches,
+    read_tombstones,
+    table_to_frame,
+)
+
+# en-tête du dump Kaggle (« DiscountDLC count » collé : une colonne de plus par ligne)
+HEADER = [
+    "AppID", "Name", "Release date", "Estimated owners", "Peak CCU", "Required age", "Price",
+    "DiscountDLC count", "About the game", "Supported languages", "Positive", "Negative",
+    "Developers", "Publishers", "Categories", "Genres", "Tags",
+]
+
+
+def raw_row(app_id, name, positive=120, genres="Action,Indie"):
+    return [
+        app_id, name, "Mar 3, 2019", "0 - 20000", 0, 0, "4.99", 0, 1,
+        "Long text,\nwith newline", "['English']", positive, 10,
+        "Dev A", "Pub B", "Single-player", genres, "Indie",
+    ]
+
+
+def write_raw(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def games():
+    # 30 jeux retenus, plus un jeu à 3 avis (écarté par le nettoyage)
+    rows = {app_id: raw_row(app_id, f"Game {app_id}") for app_id in range(10, 310, 10)}
+    rows[5] = raw_row(5, "Tiny", positive=3)
+    return rows
+
+
+def run(tmp_path, name, rows, incremental=False, **kwargs):
+    raw, out = tmp_path / f"{name}.raw.csv", tmp_path / f"{name}.csv"
+    write_raw(raw, list(rows.values()))
+    etl = run_incremental_etl if incremental else run_etl
+    etl(str(raw), str(out), chunk_size=7, workers=1, verbose=False, **kwargs)
+    return out
+
+
+def by_app_id(df):
+    return df.sort_values("AppID").reset_index(drop=True)
+
+
+def test_incremental_matches_full_run(tmp_path, games):
+    out = run(tmp_path, "games", games)
+    before = out.read_bytes()
+
+    # suppression, modification, ajout au milieu du brut, jeu qui passe sous le seuil
+    changed = dict(games)
+    del changed[50]
+    changed[120] = raw_row(120, "Game 120 Remastered", positive=900)
+    changed[200] = raw_row(200, "Game 200", positive=2)
+    changed = {**{k: v for k, v in changed.items() if k < 100}, 95: raw_row(95, "New"),
+               **{k: v for k, v in changed.items() if k >= 100}}
+
+    run(tmp_path, "games", changed, incremental=True)
+    full = run(tmp_path, "full", changed)
+
+    # CSV non réécrit : l'ancien contenu reste en tête du fichier
+    assert out.read_bytes().startswith(before)
+    assert len(read_tombstones(str(out))) == 3      # 50, 120 (ancienne version), 200
+
+    incremental = read_clean_csv(str(out))
+    expected = read_clean_csv(str(full))
+    pd.testing.assert_frame_equal(by_app_id(incremental), by_app_id(expected))
+    # ordre non garanti : lignes ajoutées ou modifiées en fin de table
+    assert incremental["AppID"].tolist()[-2:] == [95, 120]
+
+
+def test_compaction_restores_full_run_output(tmp_path, games):
+    out = run(tmp_path, "games", games)
+    changed = {k: v for k, v in games.items() if k != 50}
+    changed[10] = raw_row(10, "Game 10 GOTY")
+
+    run(tmp_path, "games", changed, incremental=True, compact=True)
+    full = run(tmp_path, "full", changed)
+
+    assert out.read_bytes() == full.read_bytes()
+    assert len(read_tombstones(str(out))) == 0
+    # manifeste : chaque AppID retenu pointe sur sa ligne du CSV compacté
+    with np.load(manifest_path(str(out))) as data:
+        rows = dict(zip(data["app_ids"].tolist(), data["rows"].tolist()))
+    csv_ids = read_clean_csv(str(out))["AppID"].tolist()
+    assert [rows[app_id] for app_id in csv_ids] == list(range(len(csv_ids)))
+
+
+def test_unchanged_source_leaves_output_untouched(tmp_path, games):
+    out = run(tmp_path, "games", games)
+    before = out.read_bytes()
+    run(tmp_path, "games", games, incremental=True)
+    assert out.read_bytes() == before
+    assert not len(read_tombstones(str(out)))
+
+
+def test_successive_passes_track_rows(tmp_path, games):
+    out = run(tmp_path, "games", games)
+    current = dict(games)
+    for step in range(3):
+        current[10 + 10 * step] = raw_row(10 + 10 * step, f"Edit {step}")
+        current.pop(300 - 10 * step)
+        run(tmp_path, "games", current, incremental=True)
+
+    full = run(tmp_path, "full", current)
+    pd.testing.assert_frame_equal(by_app_id(read_clean_csv(str(out))), by_app_id(read_clean_csv(str(full))))
+
+
+@pytest.fixture
+def columnar(tmp_path, monkeypatch):
+    # copies Feather tenues à jour pour le CSV « games » du test
+    paths = str(tmp_path / "games.feather"), str(tmp_path / "games_period.feather")
+    monkeypatch.setattr(
+        etl, "columnar_paths", lambda output: paths if output.endswith("games.csv") else None
+    )
+    return paths
+
+
+def columnar_frame(path, columnar_path):
+    df = by_app_id(table_to_frame(read_columnar(path, memory_map=False, columnar_path=columnar_path)))
+    # dictionnaires unifiés à la lecture : catégories comparées en texte
+    return df.astype({"Developer": str, "Publisher": str})
+
+
+def rebuilt_columnar(tmp_path, out):
+    """Copies reconstruites depuis le CSV : référence des copies patchées."""
+    paths = str(tmp_path / "rebuilt.feather"), str(tmp_path / "rebuilt_period.feather")
+    build_columnar_copy(str(out), *paths)
+    return [columnar_frame(path, paths[0]) for path in paths]
+
+
+def test_incremental_patches_columnar_copies(tmp_path, games, columnar):
+    columnar_path, period_path = columnar
+    out = run(tmp_path, "games", games)
+    base = open(columnar_path, "rb").read()
+
+    current = dict(games)
+    for step in range(3):
+        current[20 + 10 * step] = raw_row(20 + 10 * step, f"Edit {step}", positive=500 + step)
+        current.pop(300 - 10 * step)
+        # hors période 2014–2024 une fois sur deux, nouveau développeur (dictionnaire du correctif)
+        added = raw_row(1000 + step, f"Added {step}")
+        added[2], added[12] = ("Jan 5, 2011" if step % 2 else "Jun 1, 2020"), f"Studio {step}"
+        current[1000 + step] = added
+        run(tmp_path, "games", current, incremental=True)
+
+    # base jamais réécrite : un correctif par passage, remplacements marqués retirés
+    assert open(columnar_path, "rb").read() == base
+    n_patches, dead_ids, dead_parts = read_columnar_patches(columnar_path)
+    assert n_patches == 3
+    assert sorted(zip(dead_ids.tolist(), dead_parts.tolist())) == [
+        (20, 0), (30, 0), (40, 0), (280, 0), (290, 0), (300, 0)
+    ]
+
+    rebuilt, rebuilt_period = rebuilt_columnar(tmp_path, out)
+    assert 1001 in rebuilt["AppID"].tolist() and 1001 not in rebuilt_period["AppID"].tolist()
+    pd.testing.assert_frame_equal(columnar_frame(columnar_path, columnar_path), rebuilt)
+    pd.testing.assert_frame_equal(columnar_frame(period_path, columnar_path), rebuilt_period)
+
+
+def test_patched_row_patched_again(tmp_path, games, columnar):
+    columnar_path, _ = columnar
+    out = run(tmp_path, "games", games)
+    current = dict(games)
+    for step in range(2):
+        current[10] = raw_row(10, f"Game 10 v{step}", positive=300 + step)
+        run(tmp_path, "games", current, incremental=True)
+
+    # deuxième version retirée dans le premier correctif, pas dans la base
+    _, dead_ids, dead_parts = read_columnar_patches(columnar_path)
+    assert sorted(zip(dead_ids.tolist(), dead_parts.tolist())) == [(10, 0), (10, 1)]
+    assert os.path.exists(patch_path(2, columnar_path))
+    pd.testing.assert_frame_equal(columnar_frame(columnar_path, columnar_path), rebuilt_columnar(tmp_path, out)[0])
+
+
+def test_compaction_rewrites_columnar_copies(tmp_path, games, columnar):
+    columnar_path, _ = columnar
+    out = run(tmp_path, "games", games)
+    changed = {k: v for k, v in games.items() if k != 50}
+    run(tmp_path, "games", changed, incremental=True)
+    assert read_columnar_patches(columnar_path)[0] == 0     # rien d'ajouté : pas de fichier
+
+    changed[10] = raw_row(10, "Game 10 GOTY")
+    run(tmp_path, "games", changed, incremental=True, compact=True)
+
+    assert read_columnar_patches(columnar_path)[0] == 0
+    assert not os.path.exists(patch_path(1, columnar_path))
+    pd.testing.assert_frame_equal(columnar_frame(columnar_path, columnar_path), rebuilt_columnar(tmp_path, out)[0])
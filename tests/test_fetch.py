@@ -0,0 +1,200 @@
+"""
+Aperçus distants (utils/fetch.py) contre un serveur HTTP local (http.server
+dans un thread) : Range 206, revalidation 304, serveur sans Range, fichier vide.
+"""
+
+import threading
+from io import BytesIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+import requests
+
+from utils import fetch
+
+ETAG = '"v1"'
+
+
+def csv_body(n_rows):
+    lines = ["AppID,Name,About"]
+    lines += [f'{i},Game {i},"Long text,\nwith newline"' for i in range(n_rows)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+class Server:
+    """Sert `body` ; honore Range et ETag selon les options, journalise les requêtes."""
+
+    def __init__(self, body, ranges=True):
+        self.body = body
+        self.etag = ETAG
+        self.ranges = ranges
+        self.next_version = None    # (corps, ETag) servi après la première requête
+        self.requests = []      # (statut, en-têtes de la requête, octets envoyés)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/games.csv"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def handle(self, handler):
+        headers = dict(handler.headers)
+        if self.requests and self.next_version is not None:
+            self.body, self.etag = self.next_version
+            self.next_version = None
+        if headers.get("If-None-Match") == self.etag:
+            return self.reply(handler, 304, b"", headers)
+
+        range_header = headers.get("Range")
+        if_range = headers.get("If-Range")
+        if not (self.ranges and range_header) or (if_range is not None and if_range != self.etag):
+            return self.reply(handler, 200, self.body, headers)
+
+        start, stop = (int(x) for x in range_header.removeprefix("bytes=").split("-"))
+        if start >= len(self.body):
+            return self.reply(handler, 416, b"", headers)
+        part = self.body[start:stop + 1]
+        extra = {"Content-Range": f"bytes {start}-{start + len(part) - 1}/{len(self.body)}"}
+        self.reply(handler, 206, part, headers, extra)
+
+    def reply(self, handler, status, data, request_headers, extra=None):
+        self.requests.append((status, request_headers, len(data)))
+        handler.send_response(status)
+        handler.send_header("ETag", self.etag)
+        handler.send_header("Content-Length", str(len(data)))
+        for name, value in (extra or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        try:
+            handler.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass    # client arrêté en cours de lecture (lecture en flux)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(body, ranges=True):
+        servers.append(Server(body, ranges))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def session():
+    with requests.Session() as s:
+        yield s
+
+
+def expected(body, nrows):
+    return pd.read_csv(BytesIO(body), nrows=nrows)
+
+
+def test_range_request_answered_with_206(serve, session, tmp_path):
+    body = csv_body(5_000)
+    server = serve(body)
+
+    df = fetch.fetch_csv_head(server.url, nrows=20, cache_dir=str(tmp_path), session=session)
+
+    pd.testing.assert_frame_equal(df, expected(body, 20))
+    statuses = [status for status, _, _ in server.requests]
+    assert statuses == [206]
+    assert server.requests[0][1]["Range"] == f"bytes=0-{fetch.FIRST_RANGE - 1}"
+    assert sum(sent for _, _, sent in server.requests) < len(body)
+
+
+def test_ranges_grow_until_records_are_complete(serve, session, tmp_path):
+    # enregistrements longs : le premier bloc ne suffit pas
+    body = b"AppID,About\n" + b"".join(f'{i},"{"x" * 9_000}"\n'.encode() for i in range(40))
+    server = serve(body)
+
+    df = fetch.fetch_csv_head(server.url, nrows=3, cache_dir=str(tmp_path), session=session)
+
+    pd.testing.assert_frame_equal(df, expected(body, 3))
+    # 4 enregistrements de 9 Ko (un de plus que demandé) : blocs de 16, 32 puis 64 Ko
+    assert [status for status, _, _ in server.requests] == [206, 206, 206]
+    assert all(headers["If-Range"] == ETAG for _, headers, _ in server.requests[1:])
+
+
+def test_file_changed_between_blocks(serve, session, tmp_path, monkeypatch):
+    # If-Range périmé : 200 complet, le cache garde les validateurs du nouveau fichier
+    old = b"AppID,About\n" + b"".join(f'{i},"{"x" * 9_000}"\n'.encode() for i in range(40))
+    new = b"AppID,About\n" + b"".join(f'{i},"{"y" * 9_000}"\n'.encode() for i in range(40))
+    server = serve(old)
+    server.next_version = (new, '"v2"')
+
+    df = fetch.fetch_csv_head(server.url, nrows=3, cache_dir=str(tmp_path), session=session)
+
+    pd.testing.assert_frame_equal(df, expected(new, 3))
+    assert [status for status, _, _ in server.requests] == [206, 200]
+    _, meta = fetch.read_cached(server.url, str(tmp_path))
+    assert meta["etag"] == '"v2"'
+
+    # revalidation suivante : ETag du nouveau fichier, 304 légitime
+    monkeypatch.setattr(fetch, "REVALIDATE_AFTER", 0)
+    again = fetch.fetch_csv_head(server.url, nrows=3, cache_dir=str(tmp_path), session=session)
+    pd.testing.assert_frame_equal(again, df)
+    status, headers, _ = server.requests[-1]
+    assert (status, headers["If-None-Match"]) == (304, '"v2"')
+
+
+def test_etag_revalidation_answered_with_304(serve, session, tmp_path, monkeypatch):
+    body = csv_body(500)
+    server = serve(body)
+    first = fetch.fetch_csv_head(server.url, nrows=10, cache_dir=str(tmp_path), session=session)
+
+    # cache expiré : le serveur est réinterrogé avec l'ETag reçu
+    monkeypatch.setattr(fetch, "REVALIDATE_AFTER", 0)
+    second = fetch.fetch_csv_head(server.url, nrows=10, cache_dir=str(tmp_path), session=session)
+
+    pd.testing.assert_frame_equal(second, first)
+    status, headers, sent = server.requests[-1]
+    assert (status, headers["If-None-Match"], sent) == (304, ETAG, 0)
+
+
+def test_fresh_cache_skips_the_server(serve, session, tmp_path):
+    server = serve(csv_body(500))
+    fetch.fetch_csv_head(server.url, nrows=10, cache_dir=str(tmp_path), session=session)
+    fetch.fetch_csv_head(server.url, nrows=10, cache_dir=str(tmp_path), session=session)
+    assert len(server.requests) == 1
+
+
+def test_server_ignoring_range_returns_full_body(serve, session, tmp_path):
+    body = csv_body(20_000)
+    server = serve(body, ranges=False)
+
+    df = fetch.fetch_csv_head(server.url, nrows=20, cache_dir=str(tmp_path), session=session)
+
+    pd.testing.assert_frame_equal(df, expected(body, 20))
+    assert [status for status, _, _ in server.requests] == [200]
+    # lecture en flux arrêtée tôt : seul un préfixe est gardé en cache
+    cached, _ = fetch.read_cached(server.url, str(tmp_path))
+    assert len(cached) < len(body)
+
+
+def test_empty_file_answered_with_416(serve, session, tmp_path):
+    server = serve(b"")
+
+    df = fetch.fetch_csv_head(server.url, nrows=20, cache_dir=str(tmp_path), session=session)
+
+    assert df.empty
+    assert [status for status, _, _ in server.requests] == [416]
+
+
+def test_read_head_of_empty_body():
+    assert fetch.read_head(b"", 20).empty
@@ -0,0 +1,175 @@
+"""
+Recommandeur (utils/recommend.py) contre le code d'origine de la page 06 :
+même top-5 que le moteur ligne à ligne (ex aequo compris), même catégorie
+principale que infer_main_category.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.recommend import (
+    KNOWN_OPEN_WORLD,
+    clean_for_recommendation,
+    main_categories,
+    recommend_games,
+    recommendation_genre_index,
+)
+
+GENRES = ["Action", "Adventure", "Indie", "RPG", "Strategy", "Simulation", "Casual", "Racing"]
+
+
+@pytest.fixture(scope="module")
+def cleaned():
+    # valeurs peu variées : beaucoup de scores exactement égaux
+    rng = np.random.default_rng(4)
+    n = 600
+    positive = rng.choice([60, 90, 120, 400, 900], n)
+    negative = rng.choice([0, 10, 40, 100], n)
+    genres = [
+        ",".join(rng.choice(GENRES, rng.integers(1, 4), replace=False)) for _ in range(n)
+    ]
+    games = pd.DataFrame({
+        "AppID": np.arange(n),
+        "Name": [f"Game {i % 500}" for i in range(n)],     # quelques homonymes
+        "Genres": genres,
+        "Positive": positive,
+        "Negative": negative,
+        "Total_reviews": positive + negative,
+        "Ratio_Positive": positive / (positive + negative),
+    })
+    return clean_for_recommendation(games)
+
+
+def baseline_top5(df, selected_game):
+    """Moteur de similarité de la page 06 avant vectorisation (copie conforme)."""
+    game_row = df[df["Name"] == selected_game].iloc[0]
+    cat = game_row["main_category"]
+
+    def genre_overlap_count(target_row, ref_row):
+        return len(set(ref_row["Genres_list"]).intersection(set(target_row["Genres_list"])))
+
+    def similarity_score(target_row, ref_row):
+        g1 = set(ref_row["Genres_list"])
+        g2 = set(target_row["Genres_list"])
+        genre_score = len(g1.intersection(g2)) / len(g1) * 50 if len(g1) else 0
+        ratio_diff = abs(ref_row["Ratio_Positive"] - target_row["Ratio_Positive"])
+        qual_score = max(0, (1 - ratio_diff) * 30)
+        pop_diff = abs(ref_row["log_reviews"] - target_row["log_reviews"])
+        pop_score = max(0, (1 - pop_diff / 5) * 20)
+        return genre_score + qual_score + pop_score
+
+    candidates = df[df["Name"] != selected_game].copy()
+    same_cat = candidates[candidates["main_category"] == cat].copy()
+    base = same_cat if len(same_cat) >= 20 else candidates
+    base["common_genres"] = base.apply(lambda r: genre_overlap_count(r, game_row), axis=1)
+    with_common = base[base["common_genres"] >= 1]
+    work = with_common if len(with_common) >= 5 else base
+    work["score_similarité"] = work.apply(lambda r: similarity_score(r, game_row), axis=1)
+    return work.sort_values("score_similarité", ascending=False).head(5)
+
+
+def test_same_top5_as_the_original_engine(cleaned):
+    df, genre_bits = cleaned
+    for name in df["Name"].unique()[:120]:
+        expected = baseline_top5(df, name)
+        top5 = recommend_games(df, genre_bits, name)
+        assert list(top5.index) == list(expected.index), name
+        np.testing.assert_array_equal(
+            top5["score_similarité"].to_numpy(), expected["score_similarité"].to_numpy()
+        )
+
+
+def infer_main_category(name, genres):
+    """Règles de catégorie de la page 06 avant CATEGORY_RULES (copie conforme)."""
+    if not isinstance(genres, list):
+        genres = []
+    gl = [g.lower() for g in genres]
+    name_low = str(name).lower()
+
+    def contains_any(keywords):
+        return any(any(k in g for k in keywords) for g in gl)
+
+    if any(k in name_low for k in KNOWN_OPEN_WORLD) or \
+       contains_any(["open world", "sandbox", "crime"]):
+        return "Open World / Sandbox"
+    if contains_any(["battle royale"]):
+        return "Battle Royale"
+    if contains_any(["fps", "first-person shooter", "shooter"]) and not contains_any(["battle royale"]):
+        return "FPS"
+    if contains_any(["rpg", "jrpg", "role-playing", "action rpg"]):
+        return "RPG"
+    if contains_any(["mmorpg", "mmo", "massively multiplayer"]):
+        return "MMO / MMORPG"
+    if contains_any(["strategy", "rts", "4x", "turn-based"]):
+        return "Strategy"
+    if contains_any(["simulation", "simulator", "city builder", "building", "tycoon"]):
+        return "Simulation"
+    if contains_any(["sports", "racing", "football", "soccer", "f1", "basketball", "tennis"]):
+        return "Sports / Racing"
+    if contains_any(["survival", "horror", "zombie"]):
+        return "Survival / Horror"
+    if contains_any(["indie", "casual", "puzzle", "relaxing"]):
+        return "Indie / Casual"
+    if contains_any(["action", "adventure"]):
+        return "Action / Adventure"
+    return "Autre"
+
+
+# (nom, genres) : chaque règle, mots-clés contenus dans un genre, casse,
+# priorités entre règles, exclusion « battle royale » de FPS, nom seul
+CATEGORY_CASES = [
+    ("Grand Theft Auto V", "Action,Adventure"),
+    ("MAFIA II", "Shooter"),
+    ("Batman Arkham Knight", ""),
+    ("Spider-Man Remastered", "Indie"),
+    ("Farm Builder", "Open World,Simulation"),
+    ("Sandbox Pro", "Sandboxes"),
+    ("Heist", "Crime,RPG"),
+    ("Last Stand", "Battle Royale,Shooter"),
+    ("Arena", "Shooter"),
+    ("Doom Clone", "FPS,Horror"),
+    ("Space Hero", "First-Person Shooter"),
+    ("Quest", "Action RPG"),
+    ("Tales", "JRPG,Strategy"),
+    ("Legends", "Role-Playing,MMO"),
+    ("World Online", "Massively Multiplayer,Strategy"),
+    ("Empire", "RTS"),
+    ("Galaxy", "4X,Simulation"),
+    ("Tactics", "Turn-Based Tactics"),
+    ("Pilot", "Flight Simulator"),
+    ("Metropolis", "City Builder"),
+    ("Base", "Base Building,Sports"),
+    ("Money Maker", "Tycoon"),
+    ("Goal", "Football,Survival"),
+    ("Grand Prix", "F1"),
+    ("Hoops", "Basketball"),
+    ("Court", "Tennis,Indie"),
+    ("Kart", "Racing"),
+    ("Night", "Survival Horror"),
+    ("Dead Walk", "Zombies,Casual"),
+    ("Tiny", "Indie"),
+    ("Match 3", "Puzzle"),
+    ("Calm", "Relaxing"),
+    ("Casual Fun", "Casual,Action"),
+    ("Jump", "Action"),
+    ("Explore", "Adventure"),
+    ("Nothing", "Education"),
+    ("Empty", ""),
+    (None, "Utilities"),
+]
+
+
+def test_main_categories_match_the_original_rules():
+    names = pd.Series([name for name, _ in CATEGORY_CASES], dtype=object)
+    genre_index = recommendation_genre_index(pd.Series([g for _, g in CATEGORY_CASES]))
+
+    categories = main_categories(names, genre_index)
+    expected = [
+        infer_main_category(name, genres)
+        for name, genres in zip(names, genre_index.genre_lists())
+    ]
+
+    assert list(categories) == expected
+    # chaque règle (et la valeur par défaut) est couverte par au moins un cas
+    assert set(expected) == set(categories.categories)
@@ -0,0 +1,74 @@
+"""
+Groupes de titres (utils/titles.py) : la mise à jour après un passage
+incrémental de l'ETL donne les mêmes groupes qu'un calcul complet.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.titles import group_titles, regroup_changed
+
+TITLE_COLUMNS = ["AppID", "Name", "Developer", "Publisher"]
+
+
+def catalogue():
+    rows = [
+        # rééditions d'un même développeur, chaîne par quasi-doublons
+        (1, "Space Quest", "Orbit", 900),
+        (2, "Space Quest Remastered", "Orbit", 300),
+        (3, "Space Quest™", "Orbit", 50),
+        (4, "Space Quest 2", "Orbit", 700),          # suite : groupe à part
+        # homonymes exacts chez deux développeurs : groupe commun
+        (5, "Chess", "Knight", 100),
+        (6, "Chess", "Bishop", 400),
+        (7, "Chess Deluxe", "Bishop", 20),
+        # jeux isolés
+        *[(100 + i, f"Game {i}", f"Studio {i % 7}", 10 * i) for i in range(40)],
+    ]
+    df = pd.DataFrame(rows, columns=["AppID", "Name", "Developer", "Total_reviews"])
+    return df.assign(Publisher=df["Developer"])
+
+
+def regrouped(old, new, changed_ids):
+    """regroup_changed de `old` vers `new`, comparé à group_titles(new)."""
+    old_groups = group_titles(old, workers=1)
+    dropped = old[old["AppID"].isin(changed_ids)][TITLE_COLUMNS]
+    result = regroup_changed(
+        new, old["AppID"].to_numpy(), old_groups, np.asarray(changed_ids), dropped, workers=1
+    )
+    assert result is not None
+    group_ids, n_regrouped = result
+    np.testing.assert_array_equal(group_ids, group_titles(new, workers=1))
+    return group_ids, n_regrouped
+
+
+def test_deletion_splits_a_chain():
+    old = catalogue()
+    new = old[old["AppID"] != 6].reset_index(drop=True)      # lien Knight ↔ Bishop perdu
+    group_ids, n_regrouped = regrouped(old, new, [6])
+    by_app = dict(zip(new["AppID"], group_ids))
+    assert by_app[5] != by_app[7]
+    # seuls les jeux de l'ancien groupe et des développeurs touchés sont revus
+    assert n_regrouped < len(new) // 2
+
+
+def test_rename_and_review_changes():
+    old = catalogue()
+    new = old.copy()
+    new.loc[new["AppID"] == 4, "Name"] = "Space Quest Remastered"  # rejoint le groupe
+    new.loc[new["AppID"] == 3, "Total_reviews"] = 5_000            # nouveau représentant
+    group_ids, _ = regrouped(old, new, [3, 4])
+    by_app = dict(zip(new["AppID"], group_ids))
+    assert by_app[1] == by_app[4] == 3
+
+
+def test_additions_link_existing_games():
+    old = catalogue()
+    added = pd.DataFrame({
+        "AppID": [500, 501], "Name": ["Game 3", "Game 12 Gold"],
+        "Developer": ["Elsewhere", "Studio 5"], "Total_reviews": [5, 8],
+    })
+    new = pd.concat([old, added.assign(Publisher=added["Developer"])], ignore_index=True)
+    group_ids, _ = regrouped(old, new, [500, 501])
+    by_app = dict(zip(new["AppID"], group_ids))
+    assert by_app[500] == by_app[103] and by_app[501] == by_app[112]
@@ -0,0 +1,491 @@
+"""
+Graphiques partagés entre les pages.
+
+Nuages popularité × qualité à niveau de détail (LOD) : au-delà d'un budget
+de points, les jeux sont regroupés côté serveur en tuiles de densité
+(log10(Total_reviews) × Ratio_Positive, et année en 3D) ; seuls les jeux
+les plus populaires restent des points individuels, avec leur nom.
+La charge envoyée au navigateur est bornée par la taille de la grille, quel
+que soit le nombre de jeux filtrés. Une fenêtre de zoom ré-agrège la zone
+visible avec la même grille, donc à une résolution plus fine.
+
+Cache de figures : le JSON des figures construites est conservé dans le
+processus, partagé par toutes les sessions, avec éviction LRU bornée en
+octets. Une page dont les entrées n'ont pas changé saute à la fois le
+travail pandas et la construction / validation Plotly.
+
+Encodage compact : avant mise en cache, les tableaux numériques sont
+réduits (float64 → float32, flottants entiers → int32) pour être envoyés en
+tableaux typés base64 plus courts, et les textes de survol répétés ne sont
+plus écrits qu'une fois par suite de points consécutifs (ordre des points
+conservé ; jamais sur une figure dont la page lit les sélections).
+"""
+
+import base64
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils.trace import span
+
+# =========================================================
+# PARAMÈTRES LOD
+# =========================================================
+
+POINT_BUDGET = int(os.environ.get("STEAM_LOD_BUDGET", 1500))
+N_OUTLIERS = 25
+GRID_2D = (60, 40)          # cases log10(avis) × ratio
+GRID_3D = (30, 20)          # idem, une case par année en plus
+
+
+# =========================================================
+# AGRÉGATION
+# =========================================================
+
+def log_reviews(df):
+    return np.log10(np.maximum(df["Total_reviews"].to_numpy(dtype=np.float64), 1))
+
+
+def full_window(df):
+    """Fenêtre (x0, x1, y0, y1) couvrant tous les jeux, x en log10(avis)."""
+    if df.empty:
+        return (0.0, 1.0, 0.0, 1.0)
+    x = log_reviews(df)
+    return (float(x.min()), float(x.max()) + 1e-9, 0.0, 1.0 + 1e-9)
+
+
+def in_window(df, window):
+    """Jeux situés dans la fenêtre."""
+    x0, x1, y0, y1 = window
+    x = log_reviews(df)
+    y = df["Ratio_Positive"].to_numpy(dtype=np.float64)
+    return df[(x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)]
+
+
+def density_tiles(df, window, grid=GRID_2D, by_year=False):
+    """
+    Tuiles non vides d'une grille sur la fenêtre : centre de la tuile
+    (Total_reviews, Ratio_Positive[, Release_year]) et nombre de jeux.
+    """
+    x0, x1, y0, y1 = window
+    sample = [log_reviews(df), df["Ratio_Positive"].to_numpy(dtype=np.float64)]
+    bins = list(grid)
+    ranges = [(x0, x1), (y0, y1)]
+
+    if by_year:
+        years = df["Release_year"].to_numpy(dtype=np.float64)
+        y_min, y_max = (years.min(), years.max()) if len(years) else (0, 0)
+        sample.append(years)
+        bins.append(int(y_max - y_min) + 1)
+        ranges.append((y_min - 0.5, y_max + 0.5))
+
+    counts, edges = np.histogramdd(np.column_stack(sample), bins=bins, range=ranges)
+    cells = np.nonzero(counts)
+    centers = [(e[:-1] + e[1:])[c] / 2 for e, c in zip(edges, cells)]
+
+    tiles = pd.DataFrame({
+        "Total_reviews": 10 ** centers[0],
+        "Ratio_Positive": centers[1],
+        "nb_jeux": counts[cells].astype(np.int64),
+    })
+    if by_year:
+        tiles["Release_year"] = np.rint(centers[2]).astype(np.int64)
+    return tiles
+
+
+def lod_scatter_data(df, window=None, budget=POINT_BUDGET, n_outliers=N_OUTLIERS,
+                     grid=GRID_2D, by_year=False):
+    """
+    (points, tuiles) à afficher pour les jeux de `df` dans la fenêtre.
+    Sous le budget : tous les jeux, tuiles=None. Au-delà : les n_outliers jeux
+    les plus populaires en points nommés, le reste en tuiles de densité.
+    """
+    window = window or full_window(df)
+    df = in_window(df, window)
+    if len(df) <= budget:
+        return df, None
+
+    points = df.nlargest(n_outliers, "Total_reviews")
+    rest = df.drop(points.index)
+    return points, density_tiles(rest, window, grid, by_year)
+
+
+def zoom_window(selected_points, window, grid=GRID_2D):
+    """
+    Nouvelle fenêtre à partir des points sélectionnés (boîte ou lasso Plotly),
+    élargie d'une tuile pour inclure les bords ; None si rien n'est sélectionné.
+    """
+    pts = [p for p in selected_points if p.get("x") is not None and p.get("y") is not None]
+    if not pts:
+        return None
+
+    x = np.log10(np.maximum([p["x"] for p in pts], 1))
+    y = np.array([p["y"] for p in pts], dtype=np.float64)
+    dx = (window[1] - window[0]) / grid[0]
+    dy = (window[3] - window[2]) / grid[1]
+    return (
+        round(float(x.min() - dx), 4),
+        round(float(x.max() + dx), 4),
+        round(float(max(y.min() - dy, 0.0)), 4),
+        round(float(min(y.max() + dy, 1.0 + 1e-9)), 4),
+    )
+
+
+# =========================================================
+# FIGURES LOD
+# =========================================================
+
+def _tile_sizes(counts, size_max):
+    return 6 + (size_max - 6) * np.sqrt(counts / max(counts.max(), 1))
+
+
+def lod_figure_2d(points, tiles, height=600, size_max=28, log_x=True):
+    """Tuiles de densité (couleur = nombre de jeux) + points nommés."""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=tiles["Total_reviews"],
+        y=tiles["Ratio_Positive"],
+        mode="markers",
+        name="Densité",
+        marker=dict(
+            symbol="square",
+            size=_tile_sizes(tiles["nb_jeux"].to_numpy(), size_max),
+            color=np.log10(tiles["nb_jeux"]),
+            colorscale="Viridis",
+            opacity=0.75,
+            colorbar=dict(title="jeux (log)"),
+        ),
+        customdata=tiles["nb_jeux"],
+        hovertemplate="%{customdata} jeux<br>~%{x:,.0f} avis<br>ratio ~%{y:.2f}<extra></extra>",
+    ))
+    fig.add_trace(go.Scatter(
+        x=points["Total_reviews"],
+        y=points["Ratio_Positive"],
+        mode="markers+text",
+        name="Jeux les plus populaires",
+        text=points["Name"],
+        textposition="top center",
+        textfont=dict(size=10),
+        marker=dict(size=10, color="#E74C3C", line=dict(width=1, color="white")),
+        hovertemplate="<b>%{text}</b><br>%{x:,} avis<br>ratio %{y:.2f}<extra></extra>",
+    ))
+    fig.update_layout(
+        height=height,
+        xaxis_type="log" if log_x else "linear",
+        legend=dict(orientation="h", y=1.05),
+    )
+    return fig
+
+
+def lod_figure_3d(points, tiles, height=650, size_max=18):
+    """Version 3D : tuiles (avis × ratio × année) + points nommés."""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter3d(
+        x=tiles["Total_reviews"],
+        y=tiles["Ratio_Positive"],
+        z=tiles["Release_year"],
+        mode="markers",
+        name="Densité",
+        marker=dict(
+            size=_tile_sizes(tiles["nb_jeux"].to_numpy(), size_max) / 2,
+            color=np.log10(tiles["nb_jeux"]),
+            colorscale="Plasma",
+            opacity=0.7,
+            colorbar=dict(title="jeux (log)"),
+        ),
+        customdata=tiles["nb_jeux"],
+        hovertemplate="%{customdata} jeux<br>~%{x:,.0f} avis<br>ratio ~%{y:.2f}<br>%{z}<extra></extra>",
+    ))
+    fig.add_trace(go.Scatter3d(
+        x=points["Total_reviews"],
+        y=points["Ratio_Positive"],
+        z=points["Release_year"],
+        mode="markers+text",
+        name="Jeux les plus populaires",
+        text=points["Name"],
+        textfont=dict(size=9),
+        marker=dict(size=5, color="#E74C3C"),
+        hovertemplate="<b>%{text}</b><br>%{x:,} avis<br>ratio %{y:.2f}<br>%{z}<extra></extra>",
+    ))
+    fig.update_layout(height=height, legend=dict(orientation="h", y=1.05))
+    return fig
+
+
+# =========================================================
+# ENCODAGE COMPACT
+# =========================================================
+
+# traces dont les points peuvent être répartis entre plusieurs traces sans
+# changer le rendu (marqueurs seuls, pas de lignes entre les points)
+SPLITTABLE_TRACES = {"scatter", "scattergl", "scatter3d"}
+HOVER_TEXT_KEYS = ("hovertext", "text")
+MAX_TEXT_RUNS = 64
+
+
+def _decode(values):
+    """Tableau typé Plotly ({"dtype", "bdata"[, "shape"]}) → np.ndarray, sinon inchangé."""
+    if isinstance(values, dict) and set(values) <= {"dtype", "bdata", "shape"} and "bdata" in values:
+        array = np.frombuffer(base64.b64decode(values["bdata"]), dtype=values["dtype"])
+        shape = values.get("shape")
+        if shape:
+            array = array.reshape([int(d) for d in str(shape).split(",")])
+        return array
+    return values
+
+
+def compact_array(values):
+    """
+    Tableau numérique au type le plus court au rendu identique :
+    entiers exacts → int32, autres flottants → float32. Sinon inchangé.
+    """
+    values = _decode(values)
+    if isinstance(values, (list, tuple)):
+        if not values or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            return values
+        values = np.asarray(values)
+    if not isinstance(values, np.ndarray) or values.dtype.kind not in "iuf":
+        return values
+
+    if values.dtype.kind == "f":
+        finite = np.isfinite(values)
+        if finite.all() and np.all(values == np.round(values)) and np.abs(values).max(initial=0) < 2 ** 31:
+            return values.astype(np.int32)
+        if np.abs(values[finite]).max(initial=0) < 3e38:
+            return values.astype(np.float32)
+        return values
+
+    # entiers : Plotly choisit déjà le plus petit type (int8/16/32) à l'encodage
+    if values.dtype.itemsize > 4 and np.abs(values).max(initial=0) < 2 ** 31:
+        return values.astype(np.int32)
+    return values
+
+
+def _compact_arrays(obj):
+    """Applique compact_array à tous les tableaux d'un dict de trace (récursif)."""
+    if isinstance(_decode(obj), np.ndarray):
+        return compact_array(obj)
+    if isinstance(obj, dict):
+        return {k: _compact_arrays(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, np.ndarray)):
+        return compact_array(obj)
+    return obj
+
+
+def _per_point_keys(trace, n):
+    """Chemins (clé, sous-clé) des attributs par point de la trace."""
+    keys = []
+    for k, v in trace.items():
+        if _is_array(v):
+            if len(_decode(v)) == n:
+                keys.append((k, None))
+        elif isinstance(v, dict):
+            keys += [(k, sub) for sub, w in v.items() if _is_array(w) and len(_decode(w)) == n]
+    return keys
+
+
+def _is_array(v):
+    return isinstance(_decode(v), (list, tuple, np.ndarray))
+
+
+def _split_by_text(trace):
+    """
+    Une trace par suite de points consécutifs de même texte de survol (texte
+    scalaire) au lieu d'un tableau de textes répétés ; None si la trace ne
+    s'y prête pas. Les suites sont tracées dans l'ordre : ordre de dessin et
+    superposition des points inchangés. Numéros de trace et de point changent
+    en revanche : à écarter pour les figures dont on lit les sélections.
+    """
+    if trace.get("type", "scatter") not in SPLITTABLE_TRACES or "lines" in trace.get("mode", "markers"):
+        return None
+    key = next((k for k in HOVER_TEXT_KEYS if _is_array(trace.get(k))), None)
+    if key is None:
+        return None
+
+    texts = np.asarray(trace[key], dtype=object)
+    n = len(texts)
+    codes, _ = pd.factorize(texts)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if n else np.empty(0, dtype=np.int64)
+    if n == 0 or len(starts) > MAX_TEXT_RUNS or n < 8 * len(starts):
+        return None
+
+    marker = dict(trace.get("marker") or {})
+    color = np.asarray(_decode(marker.get("color"))) if _is_array(marker.get("color")) else None
+    if color is not None and len(color) == n and color.dtype.kind in "iuf":
+        # échelle de couleurs commune à toutes les traces, une seule barre de couleur
+        marker.setdefault("cmin", float(color.min()))
+        marker.setdefault("cmax", float(color.max()))
+    trace = dict(trace, marker=marker)
+
+    paths = [p for p in _per_point_keys(trace, n) if p != (key, None)]
+    group = trace.get("legendgroup") or trace.get("name") or f"texts_{id(trace)}"
+
+    parts = []
+    for i, (start, stop) in enumerate(zip(starts, np.r_[starts[1:], n])):
+        part = {k: (dict(v) if isinstance(v, dict) else v) for k, v in trace.items()}
+        for k, sub in paths:
+            values = _decode(trace[k] if sub is None else trace[k][sub])
+            picked = (values if isinstance(values, np.ndarray) else np.asarray(values, dtype=object))[start:stop]
+            if sub is None:
+                part[k] = picked
+            else:
+                part[k][sub] = picked
+        part[key] = texts[start]
+        part["legendgroup"] = group
+        if i > 0:
+            part["showlegend"] = False
+            if isinstance(part.get("marker"), dict):
+                part["marker"]["showscale"] = False
+        parts.append(part)
+    return parts
+
+
+def compact_figure(fig, split_texts=True):
+    """
+    Figure équivalente, à l'encodage JSON plus court (voir payload_bytes).
+    split_texts=False : traces gardées telles quelles (figures à sélection,
+    dont les événements renvoient numéros de trace et de point).
+    """
+    spec = fig.to_plotly_json()
+    data = []
+    for trace in spec["data"]:
+        data.extend((split_texts and _split_by_text(trace)) or [trace])
+    spec["data"] = [_compact_arrays(t) for t in data]
+    return go.Figure(spec, _validate=False)
+
+
+def payload_bytes(fig):
+    """Taille du JSON de la figure tel qu'envoyé au navigateur."""
+    return len(fig.to_json().encode())
+
+
+# =========================================================
+# CACHE DE FIGURES (TOUTES SESSIONS)
+# =========================================================
+
+FIGURE_CACHE_BYTES = int(os.environ.get("STEAM_FIGURE_CACHE_MB", 64)) * 1024 * 1024
+
+
+class FigureCache:
+    """LRU de figures sérialisées (JSON), bornée en octets, sûre entre threads."""
+
+    def __init__(self, max_bytes=FIGURE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return spec
+
+    def put(self, key, spec):
+        size = len(spec)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.n_bytes -= len(old)
+            self._entries[key] = spec
+            self.n_bytes += size
+            while self.n_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.n_bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.n_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+figure_cache = FigureCache()
+
+
+def figure_key(version, chart_id, params):
+    """Clé stable : version du dataset, identifiant du graphique, paramètres triés."""
+    return (version, chart_id, json.dumps(params, sort_keys=True, default=str))
+
+
+def cached_figure(version, chart_id, build, selectable=False, **params):
+    """
+    Figure `chart_id` pour (version, params) : relue depuis le JSON en cache,
+    sinon construite par build() puis mise en cache. `build` doit contenir
+    tout le travail qui ne dépend que de ces entrées. selectable=True pour
+    une figure affichée avec on_select : traces et points non redécoupés.
+    """
+    key = figure_key(version, chart_id, params)
+    spec = figure_cache.get(key)
+    if spec is None:
+        with span(f"figure/{chart_id}"):
+            fig = compact_figure(build(), split_texts=not selectable)
+            figure_cache.put(key, fig.to_json())
+        return fig
+
+    # figure déjà validée à sa construction : pas de revalidation Plotly
+    with span(f"figure/{chart_id} (cache)"):
+        return go.Figure(json.loads(spec), _validate=False)
+
+
+# =========================================================
+# RECOMMANDATIONS (PAGE 06)
+# =========================================================
+
+def recommendation_figure(top, game_row):
+    """Popularité × qualité des jeux recommandés, avec le jeu de référence."""
+    import plotly.express as px
+
+    fig = px.scatter(
+        top,
+        x="Total_reviews",
+        y="Ratio_Positive",
+        size="Total_reviews",
+        color="score_similarité",
+        hover_name="Name",
+        color_continuous_scale="Plasma",
+        height=600,
+    )
+
+    fig.add_scatter(
+        x=[game_row["Total_reviews"]],
+        y=[game_row["Ratio_Positive"]],
+        mode="markers+text",
+        text=[game_row["Name"]],
+        textposition="top center",
+        marker=dict(size=20, color="white", line=dict(width=2, color="black")),
+        name="Jeu sélectionné"
+    )
+
+    fig.update_layout(
+        xaxis_title="Nombre d'avis",
+        yaxis_title="Ratio d'avis positifs",
+        template="plotly_dark",
+    )
+    return fig
+
+
+def cached_recommendation_figure(version, top, game_row, filters=None):
+    """
+    Figure de la page 06, en cache par jeu de référence, origine des scores
+    (table des voisins ou calcul à la volée) et filtres globaux s'il y en a.
+    """
+    params = {"app_id": int(game_row["AppID"]), "source": top.attrs.get("source", "live")}
+    if filters is not None:
+        params["filters"] = filters
+    return cached_figure(
+        version, "06/recommandations", lambda: recommendation_figure(top, game_row), **params
+    )
@@ -0,0 +1,78 @@
+"""
+Règles de nettoyage partagées entre l'application et le pipeline hors ligne.
+
+Filtre NSFW : une seule expression régulière (alternance des motifs) appliquée
+à des colonnes entières, au lieu d'une boucle Python par ligne.
+La liste des motifs peut être remplacée par un fichier texte (un motif par
+ligne, # pour les commentaires) indiqué par la variable STEAM_NSFW_PATTERNS.
+"""
+
+import os
+import re
+
+import pandas as pd
+
+# =========================================================
+# MOTIFS NSFW
+# =========================================================
+
+NSFW_PATTERNS = [
+    "sex", "sexual", "adult", "hentai", "nsfw", "erotic", "porn",
+    "pussy", "boob", "dick", "naked", "nude", "orgasm", "futa",
+    "fetish", "milf", "bdsm", "bondage", "deepthroat", "sperm",
+    "vagina", "cum", "penetrat", "tits", "stripper"
+]
+
+
+def load_nsfw_patterns(path=None):
+    """Motifs du fichier `path` (ou STEAM_NSFW_PATTERNS), sinon la liste par défaut."""
+    path = path or os.environ.get("STEAM_NSFW_PATTERNS")
+    if not path:
+        return list(NSFW_PATTERNS)
+
+    with open(path, encoding="utf-8") as f:
+        lines = (line.split("#", 1)[0].strip().lower() for line in f)
+        return [line for line in lines if line]
+
+
+def compile_nsfw_regex(patterns):
+    """Alternance unique des motifs (échappés, les plus longs d'abord)."""
+    ordered = sorted(set(patterns), key=len, reverse=True)
+    return "|".join(re.escape(p) for p in ordered)
+
+
+# =========================================================
+# FILTRE VECTORISÉ
+# =========================================================
+
+def nsfw_mask(names, genres=None, patterns=None):
+    """
+    True pour chaque jeu dont le nom (ou la chaîne de genres) contient un motif.
+
+    Équivaut à chercher les motifs dans (Name + " " + Genres).lower(), pour
+    tout motif (échappé, caractères spéciaux compris). Un motif sans blanc ne
+    peut pas chevaucher la jonction des deux colonnes : il est cherché dans
+    chaque colonne ; un motif avec blanc est cherché sur la concaténation.
+    """
+    patterns = load_nsfw_patterns() if patterns is None else [p.lower() for p in patterns]
+    spanning = [p for p in patterns if re.search(r"\s", p)]
+    simple = [p for p in patterns if p not in spanning]
+
+    def column(col):
+        return pd.Series(col).astype(pd.StringDtype("pyarrow")).fillna("").str.lower()
+
+    def matches(col, group):
+        return col.str.contains(compile_nsfw_regex(group), regex=True).to_numpy(dtype=bool)
+
+    names = column(names)
+    genres = column(genres) if genres is not None else None
+    mask = pd.Series(False, index=names.index, dtype=bool)
+
+    if simple:
+        mask |= matches(names, simple)
+        if genres is not None:
+            mask |= matches(genres, simple)
+    if spanning:
+        text = names if genres is None else names + " " + genres.to_numpy()
+        mask |= matches(text, spanning)
+    return mask
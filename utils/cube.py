@@ -0,0 +1,233 @@
+"""
+Cube d'agrégats pré-calculé : année × genre × tranche de prix.
+
+Construit une seule fois par version du dataset (avec l'index des genres),
+il remplace les groupby / pivots refaits à chaque rerun des pages 02, 04
+et 05 : leurs tables et graphiques sont des sommes sur quelques milliers de
+cases, quel que soit le nombre de jeux.
+
+- measures[m] : tableau (n_years, n_genres + 1, n_bands) ; la dernière case
+  de l'axe genre compte chaque jeu une seule fois (tous genres confondus)
+- price_counts : (n_years, n_prices) nombre de jeux par prix exact, pour
+  les médianes, quantiles et histogrammes de prix
+
+Deux cubes aux mêmes axes s'additionnent case à case : le cube d'une
+sélection filtrée se met à jour par différence (utils/filters.py).
+"""
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# TRANCHES DE PRIX
+# =========================================================
+
+PRICE_BANDS = ["Gratuit", "< 5 €", "< 10 €", "< 20 €", "< 40 €", "40 € et +"]
+PRICE_EDGES = np.array([5, 10, 20, 40])
+
+MEASURES = ["count", "total_reviews", "positive", "negative", "ratio_sum"]
+
+
+def price_band(prices):
+    """Code de tranche (0 = gratuit … 5 = 40 € et +) pour chaque prix."""
+    prices = np.nan_to_num(np.asarray(prices, dtype=np.float64))
+    return np.where(prices <= 0, 0, 1 + np.searchsorted(PRICE_EDGES, prices, side="right"))
+
+
+# =========================================================
+# CUBE
+# =========================================================
+
+class AggregateCube:
+    """Agrégats par (année, genre, tranche de prix) et distribution des prix par année."""
+
+    def __init__(self, years, vocab, measures, price_values, price_counts):
+        self.years = years                  # np.ndarray[int], années consécutives
+        self.vocab = vocab                  # genres (même ordre que GenreIndex.vocab)
+        self.measures = measures            # dict nom → (n_years, n_genres + 1, n_bands)
+        self.price_values = price_values    # prix distincts, triés
+        self.price_counts = price_counts    # (n_years, n_prices)
+
+    def _years(self, year_min, year_max):
+        lo = np.searchsorted(self.years, year_min, side="left")
+        hi = np.searchsorted(self.years, year_max, side="right")
+        return slice(lo, hi)
+
+    def _rollup(self, year_min, year_max):
+        return {m: a[self._years(year_min, year_max)] for m, a in self.measures.items()}
+
+    def updated(self, added, removed):
+        """
+        Cube mis à jour par différence : + jeux ajoutés, − jeux retirés
+        (cubes aux mêmes axes, voir build_cube(like=...)).
+        """
+        measures = {m: a + added.measures[m] - removed.measures[m] for m, a in self.measures.items()}
+        price_counts = self.price_counts + added.price_counts - removed.price_counts
+        return AggregateCube(self.years, self.vocab, measures, self.price_values, price_counts)
+
+    # ---------------------------------------------------------
+    # TOUS GENRES CONFONDUS (PAGE 02)
+    # ---------------------------------------------------------
+
+    def by_year(self, year_min, year_max):
+        """Par année : nb_jeux, total_reviews, total_pos, total_neg, nb_gratuits."""
+        cube = self._rollup(year_min, year_max)
+        games = {m: a[:, -1, :] for m, a in cube.items()}
+        return pd.DataFrame({
+            "Release_year": self.years[self._years(year_min, year_max)],
+            "nb_jeux": games["count"].sum(axis=1).astype(np.int64),
+            "total_reviews": games["total_reviews"].sum(axis=1).astype(np.int64),
+            "total_pos": games["positive"].sum(axis=1).astype(np.int64),
+            "total_neg": games["negative"].sum(axis=1).astype(np.int64),
+            "nb_gratuits": games["count"][:, 0].astype(np.int64),
+        })
+
+    def by_price_band(self, year_min, year_max):
+        """Par tranche de prix : nb_jeux, total_reviews, ratio_moyen."""
+        cube = self._rollup(year_min, year_max)
+        count = cube["count"][:, -1, :].sum(axis=0)
+        return pd.DataFrame({
+            "tranche_prix": PRICE_BANDS,
+            "nb_jeux": count.astype(np.int64),
+            "total_reviews": cube["total_reviews"][:, -1, :].sum(axis=0).astype(np.int64),
+            "ratio_moyen": cube["ratio_sum"][:, -1, :].sum(axis=0) / np.maximum(count, 1),
+        })
+
+    def price_distribution(self, year_min, year_max):
+        """(prix distincts, nombre de jeux) sur la période, prix absents exclus."""
+        counts = self.price_counts[self._years(year_min, year_max)].sum(axis=0)
+        present = counts > 0
+        return self.price_values[present], counts[present]
+
+    def median_price_by_year(self, year_min, year_max):
+        """Prix médian par année (interpolation linéaire, comme pandas)."""
+        rows = self.price_counts[self._years(year_min, year_max)]
+        return pd.DataFrame({
+            "Release_year": self.years[self._years(year_min, year_max)],
+            "Price": [weighted_quantile(self.price_values, c, 0.5) for c in rows],
+        })
+
+    # ---------------------------------------------------------
+    # PAR GENRE (PAGES 04 / 05)
+    # ---------------------------------------------------------
+
+    def genre_table(self, year_min, year_max):
+        """Même format que utils.genres.genre_table, sur la période."""
+        cube = self._rollup(year_min, year_max)
+        per_genre = {m: a[:, :-1, :].sum(axis=(0, 2)) for m, a in cube.items()}
+        table = pd.DataFrame({
+            "Genres_list": self.vocab,
+            "nb_jeux": per_genre["count"].astype(np.int64),
+            "total_reviews": per_genre["total_reviews"].astype(np.int64),
+            "total_pos": per_genre["positive"].astype(np.int64),
+            "total_neg": per_genre["negative"].astype(np.int64),
+            "ratio_moyen": per_genre["ratio_sum"] / np.maximum(per_genre["count"], 1),
+        })
+        return table[table["nb_jeux"] > 0].reset_index(drop=True)
+
+    def genre_year_counts(self, year_min, year_max):
+        """Même format que utils.genres.genre_year_counts (genres × années)."""
+        years = np.arange(year_min, year_max + 1)
+        counts = np.zeros((len(years), len(self.vocab)), dtype=np.int64)
+
+        sel = self._years(year_min, year_max)
+        offset = self.years[sel][0] - year_min if sel.stop > sel.start else 0
+        block = self.measures["count"][sel, :-1, :].sum(axis=2)
+        counts[offset:offset + len(block)] = block
+
+        return pd.DataFrame(
+            counts.T,
+            index=pd.Index(self.vocab, name="Genres_list"),
+            columns=pd.Index(years, name="Release_year"),
+        )
+
+
+def weighted_quantile(values, counts, q):
+    """Quantile `q` de `values` répétées `counts` fois (interpolation linéaire)."""
+    n = int(counts.sum())
+    if n == 0:
+        return np.nan
+    cum = np.cumsum(counts)
+    h = (n - 1) * q
+    lo = values[np.searchsorted(cum, np.floor(h), side="right")]
+    hi = values[np.searchsorted(cum, np.ceil(h), side="right")]
+    return lo + (h - np.floor(h)) * (hi - lo)
+
+
+def describe_distribution(values, counts):
+    """Équivalent de Series.describe() pour une distribution (valeurs, effectifs)."""
+    n = int(counts.sum())
+    mean = (values * counts).sum() / n if n else np.nan
+    var = (counts * (values - mean) ** 2).sum() / (n - 1) if n > 1 else np.nan
+    return pd.Series({
+        "count": float(n),
+        "mean": mean,
+        "std": np.sqrt(var),
+        "min": values.min() if n else np.nan,
+        "25%": weighted_quantile(values, counts, 0.25),
+        "50%": weighted_quantile(values, counts, 0.5),
+        "75%": weighted_quantile(values, counts, 0.75),
+        "max": values.max() if n else np.nan,
+    }, name="Price")
+
+
+# =========================================================
+# CONSTRUCTION
+# =========================================================
+
+def build_cube(df, genre_index, like=None):
+    """
+    Cube des jeux de `df` (lignes alignées sur genre_index), années connues uniquement.
+    like : cube dont reprendre les axes (années, prix distincts) ; les cubes
+    obtenus s'additionnent case à case. Jeux hors de ses années ignorés.
+    """
+    years = pd.to_numeric(df["Release_year"], errors="coerce").to_numpy(dtype=np.float64)
+    known = ~np.isnan(years)
+    if like is not None:
+        years_axis = like.years
+        known &= (years >= years_axis[0]) & (years <= years_axis[-1]) if len(years_axis) else False
+    elif not known.any():
+        years_axis = np.empty(0, dtype=np.int64)
+    else:
+        years_axis = np.arange(int(years[known].min()), int(years[known].max()) + 1)
+
+    n_years, n_genres, n_bands = len(years_axis), genre_index.n_genres, len(PRICE_BANDS)
+
+    # jeux sans année rangés dans une année fictive, retirée à la fin
+    year_code = np.where(known, np.nan_to_num(years) - (years_axis[0] if n_years else 0), n_years)
+    year_code = year_code.astype(np.int64)
+    prices = df["Price"].to_numpy(dtype=np.float64, na_value=0)
+    band = price_band(prices)
+
+    values = {
+        "total_reviews": df["Total_reviews"].to_numpy(dtype=np.float64),
+        "positive": df["Positive"].to_numpy(dtype=np.float64),
+        "negative": df["Negative"].to_numpy(dtype=np.float64),
+        "ratio_sum": df["Ratio_Positive"].to_numpy(dtype=np.float64),
+    }
+
+    # (année, bande) par jeu ; l'index des genres agrège par (clé, genre)
+    key = year_code * n_bands + band
+    key_size = (n_years + 1) * n_bands
+    per_genre = genre_index.aggregate(values, by=key, by_size=key_size)
+
+    measures = {}
+    for m in MEASURES:
+        weights = None if m == "count" else values[m]
+        all_games = np.bincount(key, weights=weights, minlength=key_size)
+        cube = np.concatenate([per_genre[m], all_games[:, None]], axis=1)   # (key, genres + 1)
+        cube = cube.reshape(n_years + 1, n_bands, n_genres + 1).transpose(0, 2, 1)
+        measures[m] = cube[:n_years]
+
+    if like is None:
+        price_values, price_code = np.unique(prices, return_inverse=True)
+    else:
+        # prix de `df` tous présents dans `like` (jeux du même catalogue)
+        price_values = like.price_values
+        price_code = np.searchsorted(price_values, prices)
+    price_counts = np.bincount(
+        year_code * len(price_values) + price_code,
+        minlength=(n_years + 1) * len(price_values),
+    ).reshape(n_years + 1, len(price_values))[:n_years]
+
+    return AggregateCube(years_axis, genre_index.vocab, measures, price_values, price_counts)
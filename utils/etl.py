@@ -0,0 +1,578 @@
+"""
+Pipeline de préparation : games.csv (Kaggle, brut) → games_clean.csv.
+
+Le fichier brut est lu par blocs de taille fixe (seules les colonnes utiles
+sont parsées) ; chaque bloc est nettoyé dans un pool de processus :
+- correction de l'en-tête décalé du dump Kaggle (« DiscountDLC count »)
+- conversion des dates et extraction de l'année
+- conversion numérique (Price, Positive, Negative, DLC_count)
+- parsing des genres → Genres (liste brute) et Genres_list (genres canoniques)
+- exclusion des jeux NSFW, des jeux avec < 50 avis et des jeux sans genre
+- suppression des doublons (AppID)
+
+Les blocs nettoyés sont écrits dans l'ordre du fichier source ; le nombre de
+blocs en vol est limité, donc la mémoire reste bornée quelle que soit la
+taille du brut. La copie colonne (Feather) est régénérée à la fin.
+
+Mode incrémental (--incremental) : un manifeste garde l'empreinte de chaque
+ligne brute (par AppID) du passage précédent et sa ligne dans le CSV. Seuls
+les AppID ajoutés, supprimés ou modifiés sont nettoyés ; ni games_clean.csv ni
+les copies Feather ne sont réécrits (lignes ajoutées en fin de fichier ou dans
+un correctif, lignes retirées listées, voir plus bas) et la table des groupes
+de titres n'est recalculée que pour les jeux liés aux changements. Restent
+linéaires : la lecture et le hachage du brut.
+
+Hors du mode incrémental : la table des voisins (page 06). L'ordre des ex
+aequo y reproduit le tri d'origine de la page, qui dépend de tout le tableau
+des candidats ; une ligne non recalculée ne peut pas être garantie identique
+à une reconstruction. Elle est listée en fin de passage, à reconstruire.
+
+Usage : python -m utils.etl data/games.csv [-o data/games_clean.csv]
+                              [--chunk-size 20000] [--workers 8]
+                              [--incremental [--compact]]
+"""
+
+import argparse
+import csv
+import hashlib
+import os
+from collections import deque
+from io import StringIO
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from utils.cleaning import load_nsfw_patterns, nsfw_mask
+from utils.genres import parse_genres, safe_parse_genres
+from utils.load_data import (
+    PATH_GAMES_CLEAN,
+    PATH_GAMES_COLUMNAR,
+    PATH_PERIOD_COLUMNAR,
+    build_columnar_copy,
+    columnar_is_fresh,
+    columnar_rows,
+    dataset_version,
+    patch_path,
+    prepare_games,
+    read_clean_csv,
+    read_columnar_patches,
+    read_tombstones,
+    tombstones_path,
+    write_columnar_patches,
+    write_feather_atomic,
+)
+
+PATH_GAMES_RAW = "data/games.csv"
+
+DEFAULT_CHUNK_SIZE = 20_000
+MIN_REVIEWS = 50
+MAX_COLUMNAR_PATCHES = 16   # au-delà : copies Feather reconstruites
+
+# à incrémenter à chaque changement de clean_chunk : le manifeste est alors ignoré
+RULES_VERSION = 1
+
+# colonnes du dump Kaggle → colonnes de games_clean
+RAW_COLUMNS = {
+    "AppID": "AppID",
+    "Name": "Name",
+    "Release date": "Release_date",
+    "Price": "Price",
+    "DLC count": "DLC_count",
+    "Positive": "Positive",
+    "Negative": "Negative",
+    "Developers": "Developer",
+    "Publishers": "Publisher",
+    "Genres": "Genres",
+}
+
+# colonnes texte du CSV (relecture d'un correctif, voir patch_columnar_copies)
+TEXT_COLUMNS = ["Name", "Release_date", "Developer", "Publisher", "Genres", "Genres_list"]
+# colonnes utiles au regroupement des titres (anciennes versions des lignes retirées)
+TITLE_COLUMNS = ["AppID", "Name", "Developer", "Publisher"]
+
+CLEAN_COLUMNS = [
+    "AppID", "Name", "Release_date", "Release_year", "Developer", "Publisher",
+    "Positive", "Negative", "Total_reviews", "Ratio_Positive",
+    "Genres", "Genres_list", "Price", "DLC_count",
+]
+
+
+# =========================================================
+# LECTURE PAR BLOCS
+# =========================================================
+
+def raw_header(path):
+    """
+    En-tête du brut, corrigé : le dump Kaggle colle « Discount » et
+    « DLC count », ce qui décale toutes les colonnes d'un cran.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f))
+
+    fixed = []
+    for col in header:
+        if col == "DiscountDLC count":
+            fixed.extend(["Discount", "DLC count"])
+        else:
+            fixed.append(col)
+    return fixed
+
+
+def read_raw_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Itérateur de blocs du brut, limité aux colonnes de RAW_COLUMNS."""
+    header = raw_header(path)
+    usecols = [c for c in header if c in RAW_COLUMNS]
+    return pd.read_csv(
+        path,
+        names=header,
+        header=0,
+        usecols=usecols,
+        index_col=False,
+        dtype=str,
+        chunksize=chunk_size,
+    )
+
+
+def first_occurrences(chunk, seen_ids):
+    """
+    Lignes d'AppID valide vues pour la première fois (dans le brut entier),
+    avec leur AppID et l'empreinte de leur contenu brut. Met à jour seen_ids.
+    """
+    app_ids = pd.to_numeric(chunk["AppID"], errors="coerce")
+    keep = app_ids.notna() & ~app_ids.duplicated()
+    keep &= ~app_ids.isin(seen_ids)
+
+    rows = chunk[keep.to_numpy()]
+    ids = app_ids[keep].to_numpy(dtype=np.int64)
+    seen_ids.update(ids.tolist())
+
+    hashes = pd.util.hash_pandas_object(rows.fillna(""), index=False).to_numpy()
+    return rows, ids, hashes
+
+
+# =========================================================
+# NETTOYAGE D'UN BLOC (PROCESSUS DE TRAVAIL)
+# =========================================================
+
+def _genre_columns(genres):
+    """(Genres, Genres_list) au format liste Python, chaque chaîne distincte parsée une fois."""
+    factor, uniques = pd.factorize(genres.fillna(""), use_na_sentinel=False)
+    raw = np.array([str(safe_parse_genres(u)) for u in uniques], dtype=object)
+    canonical = [parse_genres(u) for u in uniques]
+    n_genres = np.array([len(lst) for lst in canonical])
+    listed = np.array([str(lst) for lst in canonical], dtype=object)
+    return raw[factor], listed[factor], n_genres[factor]
+
+
+def clean_chunk(chunk):
+    """Applique toutes les étapes de nettoyage à un bloc brut."""
+    df = chunk.rename(columns=RAW_COLUMNS)
+    for col in RAW_COLUMNS.values():
+        if col not in df.columns:
+            df[col] = None
+
+    df["AppID"] = pd.to_numeric(df["AppID"], errors="coerce")
+    df = df[df["AppID"].notna()].copy()
+    df["AppID"] = df["AppID"].astype(np.int64)
+
+    df["Name"] = df["Name"].fillna("Unknown").str.strip()
+    df["Developer"] = df["Developer"].fillna("").str.strip()
+    df["Publisher"] = df["Publisher"].fillna("").str.strip()
+
+    # dates : « Oct 21, 2008 », « Oct 2008 »…
+    dates = pd.to_datetime(df["Release_date"], errors="coerce", format="mixed")
+    df["Release_date"] = dates.dt.strftime("%Y-%m-%d")
+    df["Release_year"] = dates.dt.year
+
+    for col in ["Price", "Positive", "Negative", "DLC_count"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    for col in ["Positive", "Negative", "DLC_count"]:
+        df[col] = df[col].astype(np.int64)
+
+    df["Genres"], df["Genres_list"], n_genres = _genre_columns(df["Genres"])
+
+    df["Total_reviews"] = df["Positive"] + df["Negative"]
+    df["Ratio_Positive"] = df["Positive"] / df["Total_reviews"].replace(0, 1)
+
+    keep = (
+        ~nsfw_mask(df["Name"], df["Genres"]).to_numpy()
+        & (df["Total_reviews"] >= MIN_REVIEWS).to_numpy()
+        & (n_genres > 0)
+        & df["Release_year"].notna().to_numpy()
+    )
+    df = df[keep].copy()
+    df["Release_year"] = df["Release_year"].astype(np.int64)
+
+    return df.drop_duplicates(subset=["AppID"], keep="first")[CLEAN_COLUMNS]
+
+
+# =========================================================
+# MANIFESTE (EMPREINTES PAR APPID)
+# =========================================================
+
+def manifest_path(output_path):
+    return f"{os.path.splitext(output_path)[0]}.manifest.npz"
+
+
+def rules_fingerprint():
+    """Empreinte des règles de nettoyage : si elles changent, tout est retraité."""
+    rules = [RULES_VERSION, MIN_REVIEWS, sorted(load_nsfw_patterns())]
+    return hashlib.sha1(repr(rules).encode()).hexdigest()
+
+
+def write_manifest(path, ids, hashes, rows, n_rows):
+    """
+    Enregistre, triés par AppID, l'empreinte de chaque ligne brute et le numéro
+    de sa ligne dans le CSV nettoyé (-1 si écartée) ; n_rows = lignes du CSV,
+    retirées comprises (écriture atomique).
+    """
+    order = np.argsort(ids, kind="stable")
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, app_ids=ids[order], hashes=hashes[order], rows=rows[order],
+             n_rows=np.array(n_rows), rules=np.array(rules_fingerprint()))
+    os.replace(tmp_path, path)
+
+
+def read_manifest(path):
+    """
+    (app_ids triés, empreintes, lignes du CSV, n_rows), ou None si absent,
+    d'un ancien format ou produit par d'autres règles.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        if "rows" not in data or str(data["rules"]) != rules_fingerprint():
+            return None
+        return data["app_ids"], data["hashes"], data["rows"], int(data["n_rows"])
+
+
+def unchanged_rows(ids, hashes, manifest):
+    """Masque des lignes dont l'AppID figure au manifeste avec la même empreinte."""
+    old_ids, old_hashes = manifest[:2]
+    if len(old_ids) == 0:
+        return np.zeros(len(ids), dtype=bool)
+    pos = np.searchsorted(old_ids, ids).clip(max=len(old_ids) - 1)
+    return (old_ids[pos] == ids) & (old_hashes[pos] == hashes)
+
+
+def csv_rows(ids, clean_ids, first_row=0):
+    """Ligne du CSV de chaque AppID de `ids` : position dans clean_ids (+ first_row), -1 sinon."""
+    rows = pd.Index(clean_ids).get_indexer(ids)
+    return np.where(rows >= 0, rows + first_row, -1)
+
+
+# =========================================================
+# TABLES DÉRIVÉES
+# =========================================================
+
+def columnar_paths(output_path):
+    """Copies Feather (complète, 2014–2024) tenues à jour avec `output_path`, ou None."""
+    if os.path.abspath(output_path) != os.path.abspath(PATH_GAMES_CLEAN):
+        return None
+    return PATH_GAMES_COLUMNAR, PATH_PERIOD_COLUMNAR
+
+
+def stale_tables(output_path, updated=()):
+    """
+    Tables hors ligne construites pour la version précédente du dataset et non
+    mises à jour (`updated`) : leur contrôle de version les écarte (repli plus
+    lent), à reconstruire.
+    """
+    if os.path.abspath(output_path) != os.path.abspath(PATH_GAMES_CLEAN):
+        return []
+    from utils.neighbours import PATH_NEIGHBOURS
+    from utils.titles import PATH_TITLE_GROUPS
+
+    tables = [
+        (PATH_NEIGHBOURS, "python -m utils.neighbours"),
+        (PATH_TITLE_GROUPS, "python -m utils.titles"),
+    ]
+    return [(path, command) for path, command in tables if os.path.exists(path) and path not in updated]
+
+
+def report_stale_tables(output_path, updated=()):
+    stale = stale_tables(output_path, updated)
+    if stale:
+        print("Tables dérivées à reconstruire (version du dataset modifiée) :")
+        for path, command in stale:
+            print(f"  - {path} : {command}")
+
+
+# =========================================================
+# PIPELINE
+# =========================================================
+
+def _clean_in_order(chunks, workers):
+    """Nettoie les blocs dans le pool, résultats rendus dans l'ordre, mémoire bornée."""
+    max_in_flight = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(clean_chunk, chunk))
+            while len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _remove_tombstones(output_path):
+    try:
+        os.remove(tombstones_path(output_path))
+    except FileNotFoundError:
+        pass
+
+
+def run_etl(raw_path=PATH_GAMES_RAW, output_path=PATH_GAMES_CLEAN,
+            chunk_size=DEFAULT_CHUNK_SIZE, workers=None, verbose=True):
+    """Nettoie le brut bloc par bloc et écrit games_clean.csv (+ manifeste, copie Feather)."""
+    workers = workers or os.cpu_count() or 1
+
+    seen_ids = set()
+    id_parts, hash_parts, clean_parts = [], [], []
+    n_raw = n_clean = 0
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+
+    def raw_rows():
+        nonlocal n_raw
+        for chunk in read_raw_chunks(raw_path, chunk_size):
+            n_raw += len(chunk)
+            rows, ids, hashes = first_occurrences(chunk, seen_ids)
+            id_parts.append(ids)
+            hash_parts.append(hashes)
+            yield rows
+
+    first = True
+    for cleaned in _clean_in_order(raw_rows(), workers):
+        cleaned.to_csv(tmp_path, mode="w" if first else "a", header=first, index=False)
+        clean_parts.append(cleaned["AppID"].to_numpy(dtype=np.int64))
+        n_clean += len(cleaned)
+        first = False
+
+    if first:
+        pd.DataFrame(columns=CLEAN_COLUMNS).to_csv(tmp_path, index=False)
+    # réécriture complète : les lignes retirées d'un passage incrémental n'existent plus
+    _remove_tombstones(output_path)
+    os.replace(tmp_path, output_path)
+
+    ids = np.concatenate(id_parts) if id_parts else np.empty(0, np.int64)
+    clean_ids = np.concatenate(clean_parts) if clean_parts else np.empty(0, np.int64)
+    write_manifest(
+        manifest_path(output_path),
+        ids,
+        np.concatenate(hash_parts) if hash_parts else np.empty(0, np.uint64),
+        csv_rows(ids, clean_ids),
+        n_clean,
+    )
+
+    if verbose:
+        print(f"{n_raw:,} jeux bruts → {n_clean:,} jeux retenus ({output_path})")
+        report_stale_tables(output_path)
+
+    paths = columnar_paths(output_path)
+    if paths:
+        build_columnar_copy(output_path, *paths)
+
+
+# =========================================================
+# PIPELINE INCRÉMENTAL
+# =========================================================
+# Le CSV n'est jamais réécrit pour un changement : lignes ajoutées ou modifiées
+# écrites en fin de fichier, anciennes versions et lignes supprimées listées
+# dans le fichier des lignes retirées (utils/load_data.py, ignorées au
+# chargement). Mêmes lignes qu'un passage complet, mais pas le même ordre :
+# les lignes nouvelles ou modifiées sont en fin de table. Compactage (au-delà
+# de COMPACT_RATIO lignes retirées, ou --compact) : réécriture dans l'ordre du
+# brut, identique octet pour octet à run_etl.
+
+COMPACT_RATIO = 0.25
+
+
+def append_clean_csv(path, new):
+    """Ajoute les lignes nettoyées `new` en fin de CSV (sans réécrire l'existant)."""
+    if len(new):
+        new.to_csv(path, mode="a", header=False, index=False)
+
+
+def write_tombstones(path, dead):
+    """Fichier des lignes retirées du CSV `path` (numéros triés, écriture atomique)."""
+    target = tombstones_path(path)
+    tmp_path = f"{target}.{os.getpid()}.tmp.npy"
+    np.save(tmp_path, np.asarray(dead, dtype=np.int64))
+    os.replace(tmp_path, target)
+
+
+def compact_clean_csv(path, ids):
+    """
+    Réécrit le CSV sans ses lignes retirées, dans l'ordre du brut (`ids`,
+    AppID dans l'ordre source). Retourne les AppID du CSV compacté, dans l'ordre.
+    """
+    # lignes relues telles quelles (texte) : octets inchangés
+    live = read_clean_csv(path, dtype=str, keep_default_na=False)
+    rank = pd.Index(ids).get_indexer(pd.to_numeric(live["AppID"]).to_numpy())
+    live = live.iloc[np.argsort(rank, kind="stable")]
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    live.to_csv(tmp_path, index=False)
+    _remove_tombstones(path)
+    os.replace(tmp_path, path)
+    return pd.to_numeric(live["AppID"]).to_numpy(dtype=np.int64)
+
+
+def patch_columnar_copies(output_path, drop_ids, new, columnar_path, period_path):
+    """
+    Correctif des copies Feather, sans les relire ni les réécrire : lignes
+    `new` préparées seules dans un nouveau fichier de correctif, version
+    courante des AppID de drop_ids marquée comme retirée (utils/load_data.py).
+    Au-delà de MAX_COLUMNAR_PATCHES correctifs : copies reconstruites.
+    """
+    n_patches, dead_ids, dead_parts = read_columnar_patches(columnar_path)
+    if n_patches >= MAX_COLUMNAR_PATCHES:
+        build_columnar_copy(output_path, columnar_path, period_path)
+        return
+
+    # version courante : dernier correctif qui contient l'AppID, sinon la base
+    drop_ids = np.asarray(drop_ids, dtype=np.int64)
+    part_of = np.zeros(len(drop_ids), dtype=np.int64)
+    for number in range(1, n_patches + 1):
+        ids = feather.read_table(patch_path(number, columnar_path), columns=["AppID"])["AppID"]
+        part_of[np.isin(drop_ids, ids.to_numpy())] = number
+
+    if len(new):
+        # relecture du texte écrit dans le CSV : mêmes valeurs et types qu'une reconstruction
+        text = StringIO(new.to_csv(index=False))
+        new = prepare_games(pd.read_csv(text, dtype={col: str for col in TEXT_COLUMNS}))
+        n_patches += 1
+        write_feather_atomic(new, patch_path(n_patches, columnar_path))
+
+    write_columnar_patches(
+        n_patches,
+        np.concatenate([dead_ids, drop_ids]),
+        np.concatenate([dead_parts, part_of]),
+        columnar_path,
+    )
+
+
+def run_incremental_etl(raw_path=PATH_GAMES_RAW, output_path=PATH_GAMES_CLEAN,
+                        chunk_size=DEFAULT_CHUNK_SIZE, workers=None, verbose=True, compact=False):
+    """
+    Ne nettoie que les AppID ajoutés ou modifiés depuis le dernier passage :
+    ajout en fin de CSV, anciennes versions et supprimés marqués comme retirés,
+    copies Feather et groupes de titres mis à jour pour ces seuls AppID.
+    Sans manifeste valide (premier passage, règles modifiées), bascule sur run_etl.
+    """
+    manifest = read_manifest(manifest_path(output_path))
+    if manifest is None or not os.path.exists(output_path):
+        if verbose:
+            print("Pas de manifeste valide : nettoyage complet")
+        return run_etl(raw_path, output_path, chunk_size, workers, verbose)
+
+    workers = workers or os.cpu_count() or 1
+    paths = columnar_paths(output_path)
+    columnar_was_fresh = paths is not None and columnar_is_fresh(output_path, *paths)
+    old_version = dataset_version(output_path)
+
+    seen_ids = set()
+    id_parts, hash_parts = [], []
+    n_raw = n_changed = 0
+
+    def changed_rows():
+        nonlocal n_raw, n_changed
+        for chunk in read_raw_chunks(raw_path, chunk_size):
+            n_raw += len(chunk)
+            rows, ids, hashes = first_occurrences(chunk, seen_ids)
+            id_parts.append(ids)
+            hash_parts.append(hashes)
+
+            changed = ~unchanged_rows(ids, hashes, manifest)
+            n_changed += int(changed.sum())
+            if changed.any():
+                yield rows[changed]
+
+    cleaned = [c for c in _clean_in_order(changed_rows(), workers) if len(c)]
+    new = pd.concat(cleaned, ignore_index=True) if cleaned else pd.DataFrame(columns=CLEAN_COLUMNS)
+
+    ids = np.concatenate(id_parts) if id_parts else np.empty(0, np.int64)
+    hashes = np.concatenate(hash_parts) if hash_parts else np.empty(0, np.uint64)
+
+    # à retirer : supprimés du brut + modifiés (réinsérés s'ils passent les filtres)
+    old_ids, _, old_rows, n_rows = manifest
+    unchanged = unchanged_rows(ids, hashes, manifest)
+    deleted = np.setdiff1d(old_ids, ids)
+    drop_ids = np.union1d(deleted, ids[~unchanged & np.isin(ids, old_ids)])
+
+    # lignes du CSV : inchangées en place, nouvelles versions en fin de fichier
+    rows = np.full(len(ids), -1, dtype=np.int64)
+    if len(old_ids):
+        at = np.searchsorted(old_ids, ids).clip(max=len(old_ids) - 1)
+        rows = np.where(unchanged, old_rows[at], -1)
+    new_ids = pd.to_numeric(new["AppID"]).to_numpy(dtype=np.int64)
+    appended = csv_rows(ids, new_ids, first_row=n_rows)
+    rows = np.where(appended >= 0, appended, rows)
+    dead = old_rows[np.isin(old_ids, drop_ids) & (old_rows >= 0)]
+    tombstones = np.union1d(read_tombstones(output_path), dead)
+    n_rows += len(new)
+
+    if verbose:
+        print(
+            f"{n_raw:,} jeux bruts : {n_changed:,} ajoutés ou modifiés, "
+            f"{len(deleted):,} supprimés → {len(new):,} lignes ajoutées, "
+            f"{len(dead):,} lignes retirées"
+        )
+
+    changed = bool(len(dead) or len(new))
+    # anciennes versions des lignes retirées, lues avant tout correctif (groupes de titres)
+    dropped = None
+    if changed and columnar_was_fresh:
+        dropped = columnar_rows(drop_ids, paths[0], columns=TITLE_COLUMNS)
+    if changed:
+        append_clean_csv(output_path, new)
+        write_tombstones(output_path, tombstones)
+
+    if compact or len(tombstones) > COMPACT_RATIO * max(n_rows, 1):
+        clean_ids = compact_clean_csv(output_path, ids)
+        rows, n_rows = csv_rows(ids, clean_ids), len(clean_ids)
+        if verbose:
+            print(f"CSV compacté : {len(tombstones):,} lignes retirées supprimées, ordre du brut rétabli")
+        if paths:
+            build_columnar_copy(output_path, *paths)
+        changed = True
+    elif changed and paths:
+        if columnar_was_fresh:
+            patch_columnar_copies(output_path, drop_ids, new, *paths)
+        else:
+            build_columnar_copy(output_path, *paths)
+    write_manifest(manifest_path(output_path), ids, hashes, rows, n_rows)
+
+    updated = []
+    if changed and dropped is not None:
+        from utils.titles import PATH_TITLE_GROUPS, update_title_groups
+
+        if update_title_groups(old_version, np.union1d(drop_ids, new_ids), dropped, verbose=verbose):
+            updated.append(PATH_TITLE_GROUPS)
+
+    if verbose and changed:
+        report_stale_tables(output_path, updated)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="games.csv (brut) → games_clean.csv")
+    parser.add_argument("raw", nargs="?", default=PATH_GAMES_RAW, help="fichier brut Kaggle")
+    parser.add_argument("-o", "--output", default=PATH_GAMES_CLEAN, help="fichier nettoyé")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="lignes par bloc")
+    parser.add_argument("--workers", type=int, default=None, help="processus (défaut : tous les cœurs)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="ne retraiter que les AppID ajoutés, supprimés ou modifiés")
+    parser.add_argument("--compact", action="store_true",
+                        help="avec --incremental : réécrire le CSV sans ses lignes retirées, dans l'ordre du brut")
+    args = parser.parse_args()
+
+    if args.incremental:
+        run_incremental_etl(args.raw, args.output, chunk_size=args.chunk_size, workers=args.workers,
+                            compact=args.compact)
+    else:
+        run_etl(args.raw, args.output, chunk_size=args.chunk_size, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
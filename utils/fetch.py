@@ -0,0 +1,232 @@
+"""
+Aperçus des fichiers bruts publiés en GitHub Release (page d'accueil).
+
+Seules les premières lignes d'un CSV de plusieurs centaines de Mo sont utiles :
+- requêtes HTTP Range de taille croissante, arrêtées dès que les `nrows`
+  premiers enregistrements sont complets (champs multilignes compris)
+- session requests partagée (pool de connexions, timeouts, retries)
+- cache disque des octets reçus, revalidé par ETag / If-Modified-Since :
+  une réponse 304 ne coûte que les en-têtes
+- les aperçus sont lancés en tâche de fond, en parallèle, dès l'ouverture de
+  la page : le clic sur un bouton ne fait qu'attendre un résultat déjà prêt
+
+requests et pandas ne sont importés que dans les threads de téléchargement :
+la page d'accueil ne paie pas leur import au premier affichage.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+PATH_HTTP_CACHE = "data/.http_cache"
+
+TIMEOUT = (5, 20)                  # connexion, lecture (secondes)
+FIRST_RANGE = 16 * 1024            # premier bloc demandé
+MAX_BYTES = 4 * 1024 * 1024        # plafond, même si les lignes sont énormes
+REVALIDATE_AFTER = 3600            # secondes avant de reinterroger le serveur
+
+# =========================================================
+# SESSION HTTP PARTAGÉE
+# =========================================================
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def http_session():
+    """Session unique par processus : connexions TCP/TLS réutilisées."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+# =========================================================
+# CACHE DISQUE
+# =========================================================
+
+def _cache_paths(url, cache_dir):
+    key = hashlib.sha1(url.encode()).hexdigest()
+    return os.path.join(cache_dir, f"{key}.bin"), os.path.join(cache_dir, f"{key}.json")
+
+
+def read_cached(url, cache_dir=PATH_HTTP_CACHE):
+    """(octets, méta) du cache, ou (None, {}) si absent."""
+    body_path, meta_path = _cache_paths(url, cache_dir)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            return f.read(), meta
+    except (OSError, ValueError):
+        return None, {}
+
+
+def write_cached(url, body, meta, cache_dir=PATH_HTTP_CACHE):
+    """Écriture atomique du corps puis des méta-données."""
+    os.makedirs(cache_dir, exist_ok=True)
+    body_path, meta_path = _cache_paths(url, cache_dir)
+    for path, data, mode in ((body_path, body, "wb"), (meta_path, json.dumps(meta), "w")):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, mode) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+# =========================================================
+# LECTURE PARTIELLE
+# =========================================================
+
+def parse_head(body, nrows):
+    """
+    Les `nrows` premiers enregistrements si le préfixe `body` les contient
+    entièrement, sinon None. On exige un enregistrement de plus : le dernier
+    enregistrement lu peut être tronqué (champ entre guillemets coupé).
+    """
+    import pandas as pd
+
+    end = body.rfind(b"\n")
+    if end < 0:
+        return None
+    try:
+        df = pd.read_csv(BytesIO(body[:end + 1]), nrows=nrows + 1)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError):
+        return None
+    if len(df) <= nrows:
+        return None
+    return df.head(nrows)
+
+
+def _validators(meta):
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def read_head(body, nrows):
+    """
+    Aperçu à partir d'octets en cache : enregistrements complets, sinon tout ce
+    qui est lisible ; DataFrame vide pour un corps vide (fichier vide, 416).
+    """
+    df = parse_head(body, nrows)
+    if df is None:
+        import pandas as pd
+
+        try:
+            df = pd.read_csv(BytesIO(body), nrows=nrows)
+        except pd.errors.EmptyDataError:
+            df = pd.DataFrame()
+    return df
+
+
+def _fetch_prefix(url, nrows, cached, meta, session):
+    """
+    Télécharge un préfixe suffisant pour `nrows` enregistrements.
+    Retourne (octets, méta) ; (cached, meta) si le serveur répond 304.
+    """
+    body = b""
+    size = FIRST_RANGE
+    headers = _validators(meta) if cached is not None else {}
+
+    while True:
+        start = len(body)
+        headers["Range"] = f"bytes={start}-{size - 1}"
+        with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as resp:
+            if resp.status_code == 304:
+                return cached, meta
+            if resp.status_code == 416:
+                # le fichier s'arrête pile à la fin du bloc précédent
+                return body, meta
+            resp.raise_for_status()
+
+            # 200 sur un bloc suivant : corps repris depuis le nouveau fichier,
+            # ses validateurs remplacent ceux de l'ancien
+            if start == 0 or resp.status_code != 206:
+                meta = {
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                }
+
+            if resp.status_code != 206:
+                # serveur sans Range (ou fichier modifié entre deux blocs) :
+                # lecture en flux, arrêtée dès que possible
+                body = b""
+                for part in resp.iter_content(FIRST_RANGE):
+                    body += part
+                    if parse_head(body, nrows) is not None or len(body) >= MAX_BYTES:
+                        break
+                return body, meta
+
+            part = resp.content
+            body += part
+
+        exhausted = len(part) < size - start
+        if exhausted or parse_head(body, nrows) is not None or size >= MAX_BYTES:
+            return body, meta
+
+        # blocs suivants : même version du fichier uniquement (sinon 200 complet)
+        headers = {"If-Range": meta["etag"]} if meta.get("etag") else {}
+        size = min(2 * size, MAX_BYTES)
+
+
+def fetch_csv_head(url, nrows=20, cache_dir=PATH_HTTP_CACHE, session=None):
+    """
+    Les `nrows` premières lignes d'un CSV distant, via le cache disque.
+    Le serveur n'est réinterrogé qu'après REVALIDATE_AFTER secondes.
+    """
+    cached, meta = read_cached(url, cache_dir)
+    if cached is None or meta.get("nrows", 0) < nrows:
+        cached, meta = None, {}
+    elif time.time() - meta.get("checked_at", 0) < REVALIDATE_AFTER:
+        return read_head(cached, nrows)
+
+    body, meta = _fetch_prefix(url, nrows, cached, meta, session or http_session())
+    write_cached(url, body, dict(meta, nrows=nrows, checked_at=time.time()), cache_dir)
+    return read_head(body, nrows)
+
+
+# =========================================================
+# PRÉCHARGEMENT EN PARALLÈLE
+# =========================================================
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="preview")
+_futures = {}
+_futures_lock = threading.Lock()
+
+
+def prefetch_csv_heads(urls, nrows=20, cache_dir=PATH_HTTP_CACHE):
+    """
+    Lance (sans attendre) le chargement des aperçus de toutes les URL, en
+    parallèle. Retourne {url: Future[DataFrame]} ; un même aperçu n'est
+    téléchargé qu'une fois par processus tant qu'il n'a pas expiré.
+    """
+    now = time.time()
+    out = {}
+    with _futures_lock:
+        for url in urls:
+            key = (url, nrows, cache_dir)
+            entry = _futures.get(key)
+            stale = entry is None or now - entry[0] >= REVALIDATE_AFTER
+            failed = entry is not None and entry[1].done() and entry[1].exception() is not None
+            if stale or failed:
+                entry = (now, _executor.submit(fetch_csv_head, url, nrows, cache_dir))
+                _futures[key] = entry
+            out[url] = entry[1]
+    return out
@@ -0,0 +1,354 @@
+"""
+Filtres globaux partagés par les pages 02 à 06 (barre latérale).
+
+Index bitmap construit une fois par version du dataset, sur load_games() :
+un bit par jeu, mots uint64. Pour N jeux, un bitmap pèse N / 8 octets.
+- années : bitmaps cumulés « année <= a », une plage = deux opérations
+- tranches de prix (utils/cube.py) et genres : un bitmap par valeur, OR
+- volume d'avis : bitmaps cumulés « au moins S avis » par seuil
+- développeur : listes de jeux par développeur, bitmap construit à la demande
+
+Une combinaison de filtres = quelques dizaines de AND / OR sur des mots
+uint64. Le résultat (Selection) est mémorisé par signature de filtres
+(Filters, tuple hashable) : positions, masque et effectif calculés une fois.
+
+Cubes d'agrégats des sélections (pages 02, 04 et 05) : mis à jour par
+différence depuis la sélection connue la plus proche (jeux ajoutés et
+retirés), pas reconstruits ; une année ou un genre de plus ne coûte que les
+jeux qui changent.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.cube import PRICE_BANDS, build_cube, price_band
+from utils.load_data import YEAR_MAX, YEAR_MIN
+from utils.recommend import popcount
+from utils.search import fold, fold_names
+
+REVIEW_THRESHOLDS = [0, 10, 50, 100, 1_000, 10_000, 100_000]
+PRICING = {"all": "Tous", "free": "Gratuits", "paid": "Payants"}
+MEMO_SIZE = 64          # sélections mémorisées par index
+CUBE_STATES = 16        # cubes filtrés gardés comme points de départ
+MAX_DELTAS = 32         # mises à jour successives avant reconstruction (sommes flottantes)
+CUBE_COLUMNS = ["Release_year", "Price", "Total_reviews", "Positive", "Negative", "Ratio_Positive"]
+WIDGETS = ["years", "bands", "pricing", "genres", "min_reviews", "developer"]
+
+
+class Filters(NamedTuple):
+    """Signature d'une combinaison de filtres (hashable, clé de cache)."""
+    year_min: int = YEAR_MIN                # None (les deux bornes) : toutes années,
+    year_max: int = YEAR_MAX                # jeux sans année compris
+    band_min: int = 0                       # tranches de prix (PRICE_BANDS), bornes incluses
+    band_max: int = len(PRICE_BANDS) - 1
+    pricing: str = "all"                    # all / free / paid
+    genres: tuple = ()                      # au moins un de ces genres
+    min_reviews: int = 0                    # un des REVIEW_THRESHOLDS
+    developer: str = ""                     # nom exact (accents et casse indifférents)
+
+    def years_only(self):
+        """Vrai si seule la plage d'années diffère des valeurs par défaut."""
+        return self._replace(year_min=YEAR_MIN, year_max=YEAR_MAX) == DEFAULT_FILTERS
+
+
+DEFAULT_FILTERS = Filters()
+ALL_YEARS_FILTERS = Filters(year_min=None, year_max=None)   # catalogue complet (page 06)
+
+
+# =========================================================
+# BITMAPS
+# =========================================================
+
+def _n_words(n):
+    return max(1, (n + 63) // 64)
+
+
+def _bitmaps(rows, codes, n_codes, n_games):
+    """Un bitmap (mots uint64) par code : bit `row` levé dans le bitmap `code`."""
+    n_words = _n_words(n_games)
+    rows = np.asarray(rows, dtype=np.int64)
+    keys = np.asarray(codes, dtype=np.int64) * n_words + (rows >> 6)
+    values = np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64))
+
+    # bits d'un même mot regroupés par tri, puis réunis par OR
+    order = np.argsort(keys, kind="stable")
+    keys, values = keys[order], values[order]
+    bits = np.zeros(n_codes * n_words, dtype=np.uint64)
+    if len(keys):
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        bits[keys[starts]] = np.bitwise_or.reduceat(values, starts)
+    return bits.reshape(n_codes, n_words)
+
+
+def _positions(words):
+    """Positions des bits levés ; seuls les mots non nuls sont décompressés."""
+    nonzero = np.flatnonzero(words)
+    bits = np.unpackbits(words[nonzero].view(np.uint8), bitorder="little").reshape(-1, 64)
+    return (nonzero[:, None] * 64 + np.arange(64))[bits.astype(bool)]
+
+
+class Selection:
+    """Jeux retenus par une combinaison de filtres (positions dans load_games())."""
+
+    def __init__(self, words, n_games):
+        self.words = words
+        self.n_games = n_games
+        self.count = int(popcount(words))
+        self._rows = None
+
+    def __len__(self):
+        return self.count
+
+    def __and__(self, other):
+        return Selection(self.words & other.words, self.n_games)
+
+    def mask(self):
+        bits = np.unpackbits(self.words.view(np.uint8), bitorder="little")
+        return bits[:self.n_games].astype(bool)
+
+    def rows(self):
+        """Positions des jeux retenus (croissantes), calculées une fois."""
+        if self._rows is None:
+            self._rows = _positions(self.words)
+        return self._rows
+
+    def contains(self, positions):
+        """Masque des positions retenues (lecture directe des bits, sans décompresser)."""
+        positions = np.asarray(positions, dtype=np.int64)
+        bits = self.words[positions >> 6] >> (positions & 63).astype(np.uint64)
+        return (bits & np.uint64(1)).astype(bool)
+
+
+class BitmapIndex:
+    """Bitmaps par année, tranche de prix, genre, volume d'avis ; listes par développeur."""
+
+    def __init__(self, frame, genre_index, memo_size=MEMO_SIZE):
+        n = self.n_games = len(frame)
+        positions = np.arange(n)
+
+        # années connues, bitmaps cumulés « année <= years[i] »
+        years = pd.to_numeric(frame["Release_year"], errors="coerce").to_numpy(dtype=np.float64)
+        known = ~np.isnan(years)
+        self.years, year_code = np.unique(years[known].astype(np.int64), return_inverse=True)
+        self.year_upto = np.bitwise_or.accumulate(
+            _bitmaps(positions[known], year_code, len(self.years), n), axis=0
+        )
+
+        prices = frame["Price"].to_numpy(dtype=np.float64, na_value=0)
+        self.band_bits = _bitmaps(positions, price_band(prices), len(PRICE_BANDS), n)
+
+        self.all_bits = _bitmaps(positions, np.zeros(n), 1, n)[0]
+
+        self.genres = genre_index.vocab
+        self.genre_codes = genre_index.codes
+        self.genre_bits = _bitmaps(genre_index.pair_rows, genre_index.indices, genre_index.n_genres, n)
+
+        # « au moins REVIEW_THRESHOLDS[i] avis » : cumul depuis le seuil le plus haut
+        reviews = frame["Total_reviews"].to_numpy(dtype=np.int64)
+        bucket = np.searchsorted(REVIEW_THRESHOLDS, reviews, side="right") - 1
+        valid = bucket >= 0
+        per_bucket = _bitmaps(positions[valid], bucket[valid], len(REVIEW_THRESHOLDS), n)
+        self.reviews_atleast = np.bitwise_or.accumulate(per_bucket[::-1], axis=0)[::-1]
+
+        # développeurs : codes de catégorie, listes de jeux triées (CSR)
+        developers = frame["Developer"].astype("category")
+        codes = developers.cat.codes.to_numpy(dtype=np.int64)
+        has_developer = codes >= 0
+        self.developer_rows = positions[has_developer][np.argsort(codes[has_developer], kind="stable")]
+        counts = np.bincount(codes[has_developer], minlength=len(developers.cat.categories))
+        self.developer_indptr = np.concatenate([[0], np.cumsum(counts)])
+        names = developers.cat.categories.to_numpy(dtype=object)
+        self.developer_names = {name: i for i, name in enumerate(names)}
+        # noms normalisés triés : recherche dichotomique des variantes
+        folded = fold_names(names).to_numpy(dtype=object)
+        self.developer_order = np.argsort(folded, kind="stable")
+        self.developer_folded = folded[self.developer_order]
+
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ---------- bitmaps élémentaires ----------
+
+    def _empty(self):
+        return np.zeros(_n_words(self.n_games), dtype=np.uint64)
+
+    def _years_between(self, year_min, year_max):
+        hi = np.searchsorted(self.years, year_max, side="right") - 1
+        lo = np.searchsorted(self.years, year_min, side="left") - 1
+        if hi < 0 or hi <= lo:
+            return self._empty()
+        return self.year_upto[hi] & ~self.year_upto[lo] if lo >= 0 else self.year_upto[hi].copy()
+
+    def _developer(self, name):
+        # nom exact d'abord ; sinon variantes d'accents et de casse
+        code = self.developer_names.get(name)
+        if code is not None:
+            codes = [code]
+        else:
+            key = fold(name)
+            lo = np.searchsorted(self.developer_folded, key, side="left")
+            hi = np.searchsorted(self.developer_folded, key, side="right")
+            codes = self.developer_order[lo:hi].tolist()
+        rows = np.concatenate([
+            self.developer_rows[self.developer_indptr[c]:self.developer_indptr[c + 1]] for c in codes
+        ] or [self.developer_rows[:0]])
+        return _bitmaps(rows, np.zeros(len(rows)), 1, self.n_games)[0]
+
+    # ---------- sélection ----------
+
+    def _combine(self, f):
+        if f.year_min is None:
+            bits = self.all_bits.copy()
+        else:
+            bits = self._years_between(f.year_min, f.year_max)
+        bits &= np.bitwise_or.reduce(self.band_bits[f.band_min:f.band_max + 1], axis=0) \
+            if f.band_min <= f.band_max else self._empty()
+        if f.pricing == "free":
+            bits &= self.band_bits[0]
+        elif f.pricing == "paid":
+            bits &= ~self.band_bits[0]
+        if f.genres:
+            codes = [self.genre_codes[g] for g in f.genres if g in self.genre_codes]
+            bits &= np.bitwise_or.reduce(self.genre_bits[codes], axis=0) if codes else self._empty()
+        if f.min_reviews:
+            bits &= self.reviews_atleast[np.searchsorted(REVIEW_THRESHOLDS, f.min_reviews, side="right") - 1]
+        if f.developer:
+            bits &= self._developer(f.developer)
+        return bits
+
+    def select(self, filters=DEFAULT_FILTERS):
+        """Selection des jeux qui passent `filters`, mémorisée par signature."""
+        with self._lock:
+            selection = self._memo.get(filters)
+            if selection is not None:
+                self._memo.move_to_end(filters)
+                return selection
+
+        selection = Selection(self._combine(filters), self.n_games)
+        with self._lock:
+            self._memo[filters] = selection
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return selection
+
+
+def build_bitmap_index(df, genre_index):
+    """Index bitmap d'un catalogue (lignes alignées sur genre_index)."""
+    return BitmapIndex(df, genre_index)
+
+
+# =========================================================
+# AGRÉGATS INCRÉMENTAUX
+# =========================================================
+
+class FilteredCubes:
+    """
+    Cubes d'agrégats (utils/cube.py) des sélections récentes.
+
+    Nouvelle sélection : point de départ le plus proche parmi les cubes gardés
+    et le cube complet (bits différents : XOR + popcount des mots), puis
+    cube(ajoutés) - cube(retirés) appliqué à son cube. Reconstruction si la
+    sélection compte moins de jeux que la différence, ou après MAX_DELTAS
+    mises à jour successives.
+    """
+
+    def __init__(self, frame, genre_index, cube, size=CUBE_STATES):
+        self.frame = frame[CUBE_COLUMNS]
+        self.genre_index = genre_index
+        self.size = size
+        n = len(frame)
+        # état de départ permanent : tous les jeux, cube partagé
+        self._full = (_bitmaps(np.arange(n), np.zeros(n), 1, n)[0], cube, 0)
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cube_of(self, rows):
+        return build_cube(self.frame.take(rows), self.genre_index.subset(rows), like=self._full[1])
+
+    def cube(self, filters, selection):
+        """Cube des jeux de `selection` (retenus par `filters`)."""
+        with self._lock:
+            state = self._states.get(filters)
+            if state is not None:
+                self._states.move_to_end(filters)
+                return state[1]
+            candidates = [self._full, *self._states.values()]
+
+        words = selection.words
+        distances = [int(popcount(words ^ start)) for start, _, _ in candidates]
+        best = int(np.argmin(distances))
+        start, start_cube, depth = candidates[best]
+        if distances[best] < selection.count and depth < MAX_DELTAS:
+            added = self._cube_of(_positions(words & ~start))
+            removed = self._cube_of(_positions(start & ~words))
+            cube, depth = start_cube.updated(added, removed), depth + 1
+        else:
+            cube, depth = self._cube_of(selection.rows()), 0
+
+        with self._lock:
+            self._states[filters] = (words, cube, depth)
+            while len(self._states) > self.size:
+                self._states.popitem(last=False)
+        return cube
+
+
+# =========================================================
+# BARRE LATÉRALE
+# =========================================================
+
+def filter_sidebar(index, all_years=False):
+    """
+    Filtres globaux dans la barre latérale ; retourne la signature (Filters).
+    Les widgets d'une page sont oubliés en changeant de page : leur valeur
+    initiale est relue dans st.session_state["filtres"].
+    all_years : plage d'années laissée à sa valeur par défaut = toutes années
+    (bornes None) au lieu de YEAR_MIN–YEAR_MAX ; page 06, catalogue complet.
+    """
+    saved = st.session_state.get("filtres", DEFAULT_FILTERS)
+    sidebar = st.sidebar
+    sidebar.header("Filtres")
+
+    if sidebar.button("Réinitialiser les filtres"):
+        for key in WIDGETS:
+            st.session_state.pop(f"filtre_{key}", None)
+        saved = DEFAULT_FILTERS
+
+    first = int(min(index.years.min(initial=YEAR_MIN), YEAR_MIN))
+    last = int(max(index.years.max(initial=YEAR_MAX), YEAR_MAX))
+    year_min, year_max = sidebar.slider(
+        "Année de sortie", first, last, (saved.year_min, saved.year_max), key="filtre_years",
+    )
+    band_min, band_max = sidebar.select_slider(
+        "Tranche de prix", options=list(range(len(PRICE_BANDS))), value=(saved.band_min, saved.band_max),
+        format_func=PRICE_BANDS.__getitem__, key="filtre_bands",
+    )
+    pricing = sidebar.radio(
+        "Modèle économique", list(PRICING), index=list(PRICING).index(saved.pricing),
+        format_func=PRICING.get, horizontal=True, key="filtre_pricing",
+    )
+    genres = sidebar.multiselect(
+        "Genres (au moins un)", index.genres.tolist(), default=list(saved.genres), key="filtre_genres",
+    )
+    min_reviews = sidebar.select_slider(
+        "Nombre minimum d'avis", options=REVIEW_THRESHOLDS, value=saved.min_reviews,
+        format_func="{:,}".format, key="filtre_min_reviews",
+    )
+    developer = sidebar.text_input(
+        "Développeur", value=saved.developer, placeholder="Nom exact", key="filtre_developer",
+    )
+
+    filters = Filters(
+        int(year_min), int(year_max), int(band_min), int(band_max), pricing,
+        tuple(sorted(genres)), int(min_reviews), developer.strip(),
+    )
+    st.session_state["filtres"] = filters
+    if all_years and (filters.year_min, filters.year_max) == (YEAR_MIN, YEAR_MAX):
+        filters = filters._replace(year_min=None, year_max=None)
+    sidebar.caption(f"{index.select(filters).count:,} jeux retenus".replace(",", " "))
+    return filters
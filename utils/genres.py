@@ -0,0 +1,263 @@
+"""
+Index des genres, construit une seule fois par version du dataset.
+
+- vocabulaire canonique trié → codes entiers
+- CSR jeu → genres (indptr / indices)
+- listes inversées genre → jeux (postings)
+
+Toutes les agrégations et tous les filtres par genre passent par cet index :
+plus aucun explode de la colonne texte Genres à chaque rerun.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# PARSING & NORMALISATION (RÉFÉRENCE UNIQUE)
+# =========================================================
+
+def safe_parse_genres(x):
+    """Liste de genres bruts depuis "['Action', 'Indie']", "Action, Indie", etc."""
+    if isinstance(x, list):
+        return x
+    if not isinstance(x, str) or x.strip() == "":
+        return []
+    s = x.strip()
+
+    if s.startswith("[") and s.endswith("]"):
+        items = re.findall(r"'(.*?)'|\"(.*?)\"", s)
+        cleaned = [a or b for (a, b) in items if (a or b)]
+        if cleaned:
+            return cleaned
+        # liste vide "[]" ou sans guillemets "[Action, Indie]"
+        s = s[1:-1]
+
+    tokens = re.split(r"[,;/|]", s)
+    return [t.strip() for t in tokens if t.strip()]
+
+
+def normalize_genre(g):
+    if not isinstance(g, str):
+        return None
+    s = g.strip()
+    if s == "":
+        return None
+
+    low = s.lower()
+
+    if "free to play" in low or "free-to-play" in low or "f2p" in low:
+        return "free to play"
+
+    if low in {"rpg", "mmorpg"}:
+        return low.upper()
+
+    return s.title()
+
+
+def parse_genres(x):
+    """Genres canonicaux d'un jeu, sans doublon, dans l'ordre d'apparition."""
+    out = []
+    for g in safe_parse_genres(x):
+        g = normalize_genre(g)
+        if g and g not in out:
+            out.append(g)
+    return out
+
+
+def normalize_genre_title(g):
+    """Normalisation historique de la page 06 : casse de titre seule (« Free To Play », « Rpg »)."""
+    if not isinstance(g, str):
+        return None
+    s = g.strip()
+    return s.title() if s else None
+
+
+def parse_genres_titled(x):
+    """
+    Genres du recommandeur (page 06), règles historiques de la page conservées :
+    liste entre crochets lue sur ses seuls éléments entre guillemets, casse de
+    titre, doublons gardés (ils comptent dans le filtre « 6 genres au plus »).
+    Libellés affichés et entrées des règles de catégorie inchangés.
+    """
+    if isinstance(x, str) and x.strip().startswith("[") and x.strip().endswith("]"):
+        items = re.findall(r"'(.*?)'|\"(.*?)\"", x.strip())
+        raw = [a or b for (a, b) in items if (a or b)]
+    else:
+        raw = safe_parse_genres(x)
+    return [g for g in map(normalize_genre_title, raw) if g]
+
+
+# =========================================================
+# INDEX
+# =========================================================
+
+class GenreIndex:
+    """Index CSR jeu → genres et listes inversées genre → jeux."""
+
+    def __init__(self, vocab, indptr, indices):
+        self.vocab = vocab                      # np.ndarray[str], trié
+        self.indptr = indptr                    # int64, n_games + 1
+        self.indices = indices                  # int16/int32, codes de genres
+        self.codes = {g: i for i, g in enumerate(vocab)}
+
+        n_games = len(indptr) - 1
+        # une entrée par couple (jeu, genre)
+        self.pair_rows = np.repeat(
+            np.arange(n_games, dtype=np.int32), np.diff(indptr)
+        )
+
+        order = np.argsort(indices, kind="stable")
+        counts = np.bincount(indices, minlength=len(vocab))
+        self.postings_indptr = np.concatenate([[0], np.cumsum(counts)])
+        self.postings = self.pair_rows[order]
+
+    @property
+    def n_games(self):
+        return len(self.indptr) - 1
+
+    @property
+    def n_genres(self):
+        return len(self.vocab)
+
+    def genre_counts(self):
+        """Nombre de genres par jeu."""
+        return np.diff(self.indptr)
+
+    def games_with(self, genre):
+        """Positions des jeux qui possèdent ce genre (liste inversée)."""
+        code = self.codes.get(genre)
+        if code is None:
+            return np.empty(0, dtype=np.int32)
+        return self.postings[self.postings_indptr[code]:self.postings_indptr[code + 1]]
+
+    def mask_any(self, genres):
+        """Masque booléen des jeux ayant au moins un des genres donnés."""
+        mask = np.zeros(self.n_games, dtype=bool)
+        for g in genres:
+            mask[self.games_with(g)] = True
+        return mask
+
+    def genre_lists(self):
+        """Listes de genres (str) par jeu, pour l'affichage."""
+        names = self.vocab[self.indices].tolist()
+        bounds = self.indptr.tolist()
+        return [names[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def bitsets(self):
+        """
+        Ensemble de genres de chaque jeu sous forme de bitset :
+        tableau uint64 (n_games, n_words), bit `code` levé si le jeu a ce genre.
+        """
+        n_words = max(1, (self.n_genres + 63) // 64)
+        bits = np.zeros((self.n_games, n_words), dtype=np.uint64)
+        codes = self.indices.astype(np.int64)
+        np.bitwise_or.at(
+            bits,
+            (self.pair_rows, codes // 64),
+            np.left_shift(np.uint64(1), (codes % 64).astype(np.uint64)),
+        )
+        return bits
+
+    def subset(self, rows):
+        """Index restreint aux jeux `rows` (positions), vocabulaire conservé."""
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        gather = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return GenreIndex(self.vocab, indptr, self.indices[gather])
+
+    def aggregate(self, values=None, by=None, by_size=None):
+        """
+        Agrégats par genre (ou par (clé, genre) si `by` est donné).
+
+        values : dict nom → tableau par jeu, sommé par genre
+        by     : clé entière par jeu (ex. année - 2014), 0 <= by < by_size
+        Retourne un dict nom → tableau (n_genres,) ou (by_size, n_genres),
+        avec "count" = nombre de jeux.
+        """
+        G = self.n_genres
+        if by is None:
+            keys, size = self.indices, G
+        else:
+            keys = np.asarray(by)[self.pair_rows].astype(np.int64) * G + self.indices
+            size = by_size * G
+
+        out = {"count": np.bincount(keys, minlength=size)}
+        for name, v in (values or {}).items():
+            weights = np.asarray(v, dtype=np.float64)[self.pair_rows]
+            out[name] = np.bincount(keys, weights=weights, minlength=size)
+
+        if by is not None:
+            out = {name: a.reshape(by_size, G) for name, a in out.items()}
+        return out
+
+
+def build_genre_index(genres, parse=parse_genres):
+    """
+    Construit l'index à partir de la colonne brute Genres.
+    parse : genres d'une chaîne (parse_genres ; parse_genres_titled pour la page 06).
+
+    Les chaînes de genres se répètent énormément (combinaisons) : chaque
+    chaîne distincte n'est parsée qu'une fois, puis les codes sont recopiés
+    vers les jeux de façon vectorisée.
+    """
+    factor, uniques = pd.factorize(pd.Series(genres, dtype=object), use_na_sentinel=False)
+    parsed = [parse(u) for u in uniques]
+
+    vocab = np.array(sorted({g for lst in parsed for g in lst}), dtype=object)
+    codes = {g: i for i, g in enumerate(vocab)}
+    code_dtype = np.int16 if len(vocab) < 2 ** 15 else np.int32
+
+    u_lengths = np.array([len(lst) for lst in parsed], dtype=np.int64)
+    u_indptr = np.concatenate([[0], np.cumsum(u_lengths)])
+    u_indices = np.array([codes[g] for lst in parsed for g in lst], dtype=code_dtype)
+
+    lengths = u_lengths[factor]
+    indptr = np.concatenate([[0], np.cumsum(lengths)])
+    gather = np.repeat(u_indptr[factor] - indptr[:-1], lengths) + np.arange(indptr[-1])
+    return GenreIndex(vocab, indptr, u_indices[gather])
+
+
+# =========================================================
+# TABLES PAR GENRE (PAGES 04 / 05)
+# =========================================================
+
+def genre_table(index, df):
+    """Une ligne par genre : nb_jeux, total_reviews, total_pos, total_neg, ratio_moyen."""
+    agg = index.aggregate({
+        "total_reviews": df["Total_reviews"],
+        "total_pos": df["Positive"],
+        "total_neg": df["Negative"],
+        "ratio_sum": df["Ratio_Positive"],
+    })
+    table = pd.DataFrame({
+        "Genres_list": index.vocab,
+        "nb_jeux": agg["count"],
+        "total_reviews": agg["total_reviews"].astype(np.int64),
+        "total_pos": agg["total_pos"].astype(np.int64),
+        "total_neg": agg["total_neg"].astype(np.int64),
+        "ratio_moyen": agg["ratio_sum"] / np.maximum(agg["count"], 1),
+    })
+    return table[table["nb_jeux"] > 0].reset_index(drop=True)
+
+
+def genre_year_counts(index, years, year_min, year_max):
+    """Nombre de jeux par genre (lignes) et par année (colonnes year_min..year_max)."""
+    years = np.asarray(years, dtype=np.int64)
+    n_years = year_max - year_min + 1
+    in_range = (years >= year_min) & (years <= year_max)
+
+    # les jeux hors plage sont rangés dans une case supplémentaire, ignorée
+    by = np.where(in_range, years - year_min, n_years)
+    counts = index.aggregate(by=by, by_size=n_years + 1)["count"][:n_years]
+
+    return pd.DataFrame(
+        counts.T,
+        index=pd.Index(index.vocab, name="Genres_list"),
+        columns=pd.Index(range(year_min, year_max + 1), name="Release_year"),
+    )
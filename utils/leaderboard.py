@@ -0,0 +1,187 @@
+"""
+Classements précalculés (pages 03 et 04) : « top 20 des jeux de 2019 en
+Strategy par ratio » sans trier la table à chaque rerun.
+
+Construit une fois par version du dataset. Pour chaque métrique :
+- rang global de chaque jeu (valeur décroissante, ordre des lignes à égalité)
+- listes courtes pré-triées par (année, genre) et par (année, tous genres),
+  limitées aux DEPTH premiers rangs, au format CSR et stockées sous forme de rangs
+
+Requête : une liste par année retenue, les k premiers rangs de chacune,
+fusion par tri de quelques centaines d'entiers au plus. Au-delà de DEPTH
+(k plus grand), repli sur un tri des lignes filtrées.
+
+Filtres globaux (utils/filters.py) : le classement global est parcouru par
+blocs croissants, chaque bloc testé sur les bits de la sélection ; arrêt dès
+k jeux retenus.
+
+Métriques :
+- total_reviews : nombre total d'avis
+- ratio         : part d'avis positifs
+- score         : ratio pondéré par le volume d'avis (note SteamDB) :
+                  ratio - (ratio - 0,5) × 2^(-log10(avis + 1)) ; peu d'avis
+                  → note tirée vers 50 %
+"""
+
+import numpy as np
+import pandas as pd
+
+DEPTH = 100     # rangs conservés par liste (année, genre)
+
+METRICS = {
+    "total_reviews": "Nombre total d'avis",
+    "ratio": "Ratio d'avis positifs",
+    "score": "Score pondéré par les avis",
+}
+
+
+# =========================================================
+# MÉTRIQUES
+# =========================================================
+
+def review_score(positive_ratio, total_reviews):
+    """Ratio pondéré par le volume d'avis (note SteamDB)."""
+    ratio = np.asarray(positive_ratio, dtype=np.float64)
+    total = np.asarray(total_reviews, dtype=np.float64)
+    return ratio - (ratio - 0.5) * np.power(2.0, -np.log10(total + 1))
+
+
+def metric_values(df):
+    """Valeurs par jeu de chaque métrique (tableaux float64 alignés sur `df`)."""
+    total = df["Total_reviews"].to_numpy(dtype=np.float64)
+    ratio = df["Ratio_Positive"].to_numpy(dtype=np.float64, na_value=np.nan)
+    return {
+        "total_reviews": total,
+        "ratio": ratio,
+        "score": review_score(ratio, total),
+    }
+
+
+def rank_order(values):
+    """Lignes par valeur décroissante (ordre d'origine à égalité, NaN en dernier)."""
+    values = np.asarray(values, dtype=np.float64)
+    return np.lexsort((np.arange(len(values)), np.isnan(values), -np.nan_to_num(values)))
+
+
+def top_rows(order, mask, k):
+    """Les `k` premières lignes d'un classement précalculé qui passent le masque."""
+    return order[mask[order]][:k]
+
+
+# =========================================================
+# CLASSEMENT
+# =========================================================
+
+class Leaderboard:
+    """Classements d'une table de jeux (positions = lignes de `frame`)."""
+
+    def __init__(self, frame, genre_index, depth=DEPTH, source_rows=None, n_source=None):
+        self.frame = frame
+        self.genre_index = genre_index
+        self.depth = depth
+
+        # ligne → position dans le catalogue des sélections (load_games()), et inverse
+        self.source_rows = np.arange(len(frame)) if source_rows is None else np.asarray(source_rows)
+        n_source = len(frame) if n_source is None else n_source
+        self.row_of_source = np.full(n_source, -1, dtype=np.int64)
+        self.row_of_source[self.source_rows] = np.arange(len(frame))
+
+        years = pd.to_numeric(frame["Release_year"], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+        self.years, self.year_slots = np.unique(years, return_inverse=True)
+        self.genres = genre_index.vocab
+
+        # une entrée par (jeu, genre) et par (jeu, tous genres = code n_genres)
+        n_games, n_genres = len(frame), genre_index.n_genres
+        rows = np.concatenate([genre_index.pair_rows, np.arange(n_games, dtype=np.int32)])
+        codes = np.concatenate([genre_index.indices.astype(np.int64), np.full(n_games, n_genres)])
+        self._keys = self.year_slots[rows] * (n_genres + 1) + codes
+        self._rows = rows
+
+        self.order, self.rank, self.lists = {}, {}, {}
+        for metric, values in metric_values(frame).items():
+            self._build(metric, values)
+        del self._keys, self._rows
+
+    def _build(self, metric, values):
+        order = rank_order(values)
+        rank = np.empty(len(order), dtype=np.int32)
+        rank[order] = np.arange(len(order), dtype=np.int32)
+
+        # listes (année, genre) triées par rang, tronquées aux `depth` premiers
+        ranks = rank[self._rows]
+        by_key = np.lexsort((ranks, self._keys))
+        keys, ranks = self._keys[by_key], ranks[by_key]
+        n_keys = len(self.years) * (self.genre_index.n_genres + 1)
+        starts = np.searchsorted(keys, np.arange(n_keys))
+        keep = np.arange(len(keys)) - starts[keys] < self.depth
+        counts = np.bincount(keys[keep], minlength=n_keys)
+
+        self.order[metric] = order
+        self.rank[metric] = rank
+        self.lists[metric] = (np.concatenate([[0], np.cumsum(counts)]), ranks[keep])
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _year_slots(self, years):
+        if years is None:
+            return range(len(self.years))
+        lo, hi = (years, years) if np.isscalar(years) else years
+        return range(np.searchsorted(self.years, lo, "left"), np.searchsorted(self.years, hi, "right"))
+
+    def top(self, metric, k=20, years=None, genre=None):
+        """
+        Positions des `k` meilleurs jeux pour `metric`, filtrés par année
+        (une année ou bornes incluses) et par genre.
+        """
+        n_genres = self.genre_index.n_genres
+        code = n_genres if genre is None else self.genre_index.codes.get(genre)
+        slots = self._year_slots(years)
+        if code is None or not len(slots):
+            return np.empty(0, dtype=np.int64)
+        if k > self.depth:
+            return self._top_sorted(metric, k, slots, code)
+
+        indptr, ranks = self.lists[metric]
+        keys = [slot * (n_genres + 1) + code for slot in slots]
+        # fusion des listes pré-triées : leurs k premiers rangs suffisent
+        merged = np.sort(np.concatenate([ranks[indptr[key]:min(indptr[key + 1], indptr[key] + k)] for key in keys]))
+        return self.order[metric][merged[:k]].astype(np.int64)
+
+    def _top_sorted(self, metric, k, slots, code):
+        """Repli au-delà de DEPTH : masque des lignes retenues, parcours du rang global."""
+        mask = np.isin(self.year_slots, np.asarray(slots))
+        if code < self.genre_index.n_genres:
+            mask &= self.genre_index.mask_any([self.genres[code]])
+        return top_rows(self.order[metric], mask, k).astype(np.int64)
+
+    def top_games(self, metric, k=20, years=None, genre=None):
+        """Lignes de `frame` des `k` meilleurs jeux, dans l'ordre du classement."""
+        return self.frame.iloc[self.top(metric, k, years, genre)]
+
+    # ---------- filtres globaux ----------
+
+    def top_selected(self, metric, k, selection):
+        """Positions des `k` meilleurs jeux retenus par `selection` (utils/filters.py)."""
+        order = self.order[metric]
+        found, n_found, start, block = [], 0, 0, max(4 * k, 1024)
+        while start < len(order) and n_found < k:
+            rows = order[start:start + block]
+            rows = rows[selection.contains(self.source_rows[rows])]
+            found.append(rows)
+            n_found += len(rows)
+            start, block = start + block, block * 2
+        return np.concatenate(found)[:k].astype(np.int64) if found else np.empty(0, dtype=np.int64)
+
+    def top_selected_games(self, metric, k, selection):
+        return self.frame.iloc[self.top_selected(metric, k, selection)]
+
+    def rows_in(self, selection):
+        """Lignes de `frame` retenues par `selection`, dans l'ordre de `frame`."""
+        rows = self.row_of_source[selection.rows()]
+        return np.sort(rows[rows >= 0])
+
+
+def build_leaderboard(df, genre_index, depth=DEPTH, source_rows=None, n_source=None):
+    """Classements d'une table de jeux (Total_reviews, Ratio_Positive, Release_year, Genres)."""
+    return Leaderboard(df, genre_index, depth, source_rows, n_source)
@@ -0,0 +1,566 @@
+"""
+Chargement centralisé du dataset final (games_clean).
+
+Toutes les pages passent par ce module : le CSV n'est parsé qu'une seule fois,
+converti en copie colonne typée (Feather / Arrow IPC non compressé) puis
+projeté en mémoire (mmap) en lecture seule. Le même fichier est partagé par
+toutes les sessions et par tous les processus Streamlit d'une machine : les
+pages physiques viennent du cache disque de l'OS, pas d'une copie par session.
+"""
+
+import os
+
+import glob
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import streamlit as st
+
+from utils.cube import build_cube
+from utils.genres import build_genre_index
+from utils.recommend import clean_for_recommendation
+from utils.trace import span
+
+# =========================================================
+# CHEMINS & CONSTANTES
+# =========================================================
+
+PATH_GAMES_CLEAN = "data/games_clean.csv"
+PATH_GAMES_COLUMNAR = "data/games_clean.feather"
+PATH_PERIOD_COLUMNAR = "data/games_clean_2014_2024.feather"
+
+YEAR_MIN, YEAR_MAX = 2014, 2024
+
+# types compacts pour la copie colonne
+INT_COLUMNS = {
+    "AppID": "int32",
+    "Positive": "int32",
+    "Negative": "int32",
+    "Total_reviews": "int32",
+    "DLC_count": "int16",
+}
+CATEGORY_COLUMNS = ["Developer", "Publisher"]
+
+# STEAM_MMAP=0 → lecture classique en mémoire (copie par processus)
+USE_MMAP = os.environ.get("STEAM_MMAP", "1") != "0"
+
+STRING_TYPES = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.large_string(): pd.StringDtype("pyarrow"),
+}
+
+
+# =========================================================
+# VERSION DU DATASET
+# =========================================================
+
+def dataset_version(path=PATH_GAMES_CLEAN):
+    """Empreinte du CSV source et de ses lignes retirées (taille + date de modification)."""
+    stat = os.stat(path)
+    version = f"{stat.st_size}-{stat.st_mtime_ns}"
+    tombstones = tombstones_path(path)
+    if os.path.exists(tombstones):
+        stat = os.stat(tombstones)
+        version += f"-{stat.st_size}-{stat.st_mtime_ns}"
+    return version
+
+
+# =========================================================
+# LIGNES RETIRÉES (ETL INCRÉMENTAL)
+# =========================================================
+# L'ETL incrémental (utils/etl.py) ajoute les lignes nouvelles ou modifiées en
+# fin de CSV sans le réécrire ; les lignes périmées sont listées (numéros de
+# ligne de données, à partir de 0) dans un fichier voisin et ignorées ici.
+
+def tombstones_path(csv_path=PATH_GAMES_CLEAN):
+    return f"{os.path.splitext(csv_path)[0]}.tombstones.npy"
+
+
+def read_tombstones(csv_path=PATH_GAMES_CLEAN):
+    """Numéros (triés) des lignes du CSV à ignorer ; vide sans fichier."""
+    path = tombstones_path(csv_path)
+    if not os.path.exists(path):
+        return np.empty(0, dtype=np.int64)
+    return np.load(path)
+
+
+def read_clean_csv(csv_path=PATH_GAMES_CLEAN, **kwargs):
+    """Lignes vivantes du CSV nettoyé (lignes retirées écartées), index 0..n-1."""
+    df = pd.read_csv(csv_path, **kwargs)
+    dead = read_tombstones(csv_path)
+    if len(dead):
+        df = df.drop(index=dead).reset_index(drop=True)
+    return df
+
+
+# =========================================================
+# PRÉPARATION (FAITE UNE SEULE FOIS)
+# =========================================================
+
+def prepare_games(df):
+    """Nettoyage minimal + colonnes dérivées communes à toutes les pages."""
+    df["Name"] = df["Name"].fillna("Unknown")
+    df["Genres"] = df["Genres"].fillna("")
+    df["Positive"] = df["Positive"].fillna(0).astype(int)
+    df["Negative"] = df["Negative"].fillna(0).astype(int)
+
+    df["Total_reviews"] = df["Positive"] + df["Negative"]
+    df["Ratio_Positive"] = df["Positive"] / df["Total_reviews"].replace(0, 1)
+
+    if "Release_date" in df.columns:
+        df["Release_date"] = pd.to_datetime(df["Release_date"], errors="coerce")
+
+    if "Release_year" not in df.columns:
+        df["Release_year"] = df["Release_date"].dt.year
+    year = pd.to_numeric(df["Release_year"], errors="coerce")
+    df["Release_year"] = year.astype("Int16" if year.isna().any() else "int16")
+
+    for col, dtype in INT_COLUMNS.items():
+        if col in df.columns and not df[col].isna().any():
+            df[col] = df[col].astype(dtype)
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    return df
+
+
+def write_feather_atomic(df, path):
+    """Écrit un Feather non compressé (projetable en mémoire) via un fichier temporaire."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    feather.write_feather(df, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def build_columnar_copy(csv_path=PATH_GAMES_CLEAN, columnar_path=PATH_GAMES_COLUMNAR,
+                        period_path=PATH_PERIOD_COLUMNAR):
+    """
+    Convertit le CSV en Feather typé non compressé (écriture atomique).
+
+    La période 2014–2024 est écrite dans un second fichier : les pages 02–05
+    la projettent directement, sans filtrage ni copie par processus.
+    """
+    df = prepare_games(read_clean_csv(csv_path))
+    write_columnar_copies(df, columnar_path, period_path)
+
+
+def write_columnar_copies(df, columnar_path=PATH_GAMES_COLUMNAR, period_path=PATH_PERIOD_COLUMNAR):
+    """
+    Écrit le dataset préparé et sa tranche 2014–2024 (toujours après le CSV) ;
+    les correctifs des copies précédentes sont effacés.
+    """
+    df = df.reset_index(drop=True)
+    in_period = df["Release_year"].between(YEAR_MIN, YEAR_MAX).fillna(False)
+
+    # index des correctifs d'abord : jamais de nouvelle base lue avec d'anciens correctifs
+    _remove_file(patches_index_path(columnar_path))
+    write_feather_atomic(df[in_period].reset_index(drop=True), period_path)
+    write_feather_atomic(df, columnar_path)
+    for path in glob.glob(patch_path("*", columnar_path)):
+        _remove_file(path)
+
+
+def columnar_is_fresh(csv_path=PATH_GAMES_CLEAN, columnar_path=PATH_GAMES_COLUMNAR,
+                      period_path=PATH_PERIOD_COLUMNAR):
+    """
+    Les copies Feather existent et sont plus récentes que le CSV (et ses lignes
+    retirées) ; un correctif écrit après le CSV les remet à jour.
+    """
+    csv_mtime = os.path.getmtime(csv_path)
+    tombstones = tombstones_path(csv_path)
+    if os.path.exists(tombstones):
+        csv_mtime = max(csv_mtime, os.path.getmtime(tombstones))
+    if not all(os.path.exists(path) for path in (columnar_path, period_path)):
+        return False
+    built = min(os.path.getmtime(columnar_path), os.path.getmtime(period_path))
+    index = patches_index_path(columnar_path)
+    if os.path.exists(index):
+        built = max(built, os.path.getmtime(index))
+    return built >= csv_mtime
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# =========================================================
+# CORRECTIFS DES COPIES COLONNE (ETL INCRÉMENTAL)
+# =========================================================
+# Un passage incrémental (utils/etl.py) ne relit ni ne réécrit les copies
+# Feather : les lignes nouvelles ou modifiées, préparées seules, forment un
+# fichier de correctif numéroté (1, 2…) ; les lignes périmées sont listées
+# par (AppID, fichier) dans un index voisin, fichier 0 = copie de base. La
+# tranche 2014–2024 d'un correctif est prise à la lecture.
+# Avec des correctifs, la table est assemblée (copie par processus) : la
+# projection partagée revient à la prochaine réécriture complète.
+
+def patches_index_path(columnar_path=PATH_GAMES_COLUMNAR):
+    return f"{os.path.splitext(columnar_path)[0]}.patches.npz"
+
+
+def patch_path(number, columnar_path=PATH_GAMES_COLUMNAR):
+    number = number if isinstance(number, str) else f"{number:03d}"
+    return f"{os.path.splitext(columnar_path)[0]}.patch-{number}.feather"
+
+
+def read_columnar_patches(columnar_path=PATH_GAMES_COLUMNAR):
+    """(nombre de correctifs, AppID retirés, fichier de chaque AppID retiré) ; 0 sans index."""
+    path = patches_index_path(columnar_path)
+    if not os.path.exists(path):
+        return 0, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    with np.load(path) as data:
+        return int(data["n_patches"]), data["dead_ids"], data["dead_parts"]
+
+
+def write_columnar_patches(n_patches, dead_ids, dead_parts, columnar_path=PATH_GAMES_COLUMNAR):
+    """Index des correctifs (écriture atomique, toujours après le fichier de correctif)."""
+    path = patches_index_path(columnar_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, n_patches=np.array(n_patches), dead_ids=np.asarray(dead_ids, dtype=np.int64),
+             dead_parts=np.asarray(dead_parts, dtype=np.int64))
+    os.replace(tmp_path, path)
+
+
+def _columnar_parts(path, memory_map, columnar_path):
+    """Tables (base puis correctifs) d'une copie Feather, lignes retirées écartées."""
+    n_patches, dead_ids, dead_parts = read_columnar_patches(columnar_path)
+    in_period = os.path.abspath(path) != os.path.abspath(columnar_path)
+
+    base = feather.read_table(path, memory_map=memory_map)
+    for number in range(n_patches + 1):
+        part = base if number == 0 else feather.read_table(
+            patch_path(number, columnar_path), memory_map=memory_map
+        ).select(base.schema.names)
+        if number and in_period:
+            years = part["Release_year"]
+            part = part.filter(pc.and_(pc.greater_equal(years, YEAR_MIN), pc.less_equal(years, YEAR_MAX)))
+        dead = dead_ids[dead_parts == number]
+        if len(dead):
+            value_set = pa.array(dead).cast(part.schema.field("AppID").type)
+            part = part.filter(pc.invert(pc.is_in(part["AppID"], value_set=value_set)))
+        yield part
+
+
+def read_columnar(path=PATH_GAMES_COLUMNAR, memory_map=USE_MMAP, columnar_path=PATH_GAMES_COLUMNAR):
+    """
+    Table Arrow d'une copie Feather (projetée en mémoire si memory_map=True),
+    correctifs de l'ETL incrémental appliqués.
+    """
+    parts = list(_columnar_parts(path, memory_map, columnar_path))
+    if len(parts) == 1:
+        return parts[0]
+    # dictionnaires (Developer, Publisher) propres à chaque fichier : unifiés
+    return pa.concat_tables(parts, promote_options="permissive")
+
+
+def columnar_rows(app_ids, columnar_path=PATH_GAMES_COLUMNAR, columns=None):
+    """Lignes courantes (DataFrame) des AppID donnés, lues dans la copie et ses correctifs."""
+    value_set = pa.array(np.asarray(app_ids, dtype=np.int64))
+    parts = []
+    for part in _columnar_parts(columnar_path, True, columnar_path):
+        part = part.select(columns) if columns else part
+        mask = pc.is_in(part["AppID"].cast(pa.int64()), value_set=value_set)
+        parts.append(part.filter(mask))
+    return table_to_frame(pa.concat_tables(parts, promote_options="permissive"))
+
+
+def open_games_table(path=PATH_GAMES_COLUMNAR, memory_map=USE_MMAP):
+    """Table Arrow d'une copie Feather à jour (reconstruite depuis le CSV sinon)."""
+    if not columnar_is_fresh():
+        with span("load/build_columnar_copy"):
+            build_columnar_copy()
+    with span(f"load/{os.path.basename(path)}"):
+        return read_columnar(path, memory_map)
+
+
+def table_to_frame(table):
+    """
+    DataFrame adossé aux buffers Arrow : colonnes numériques sans copie et en
+    lecture seule, chaînes conservées au format Arrow.
+    """
+    return table.to_pandas(split_blocks=True, types_mapper=STRING_TYPES.get)
+
+
+def read_games(path=PATH_GAMES_COLUMNAR):
+    """Lecture hors Streamlit : Feather si à jour, sinon reconstruction depuis le CSV."""
+    return table_to_frame(open_games_table(path))
+
+
+# =========================================================
+# POINTS D'ENTRÉE POUR LES PAGES
+# =========================================================
+
+class GamesStore:
+    """Poignée partagée par toutes les sessions d'un processus."""
+
+    def __init__(self, table, period_table):
+        self.table = table
+        with span("load/table_to_frame"):
+            self.frame = table_to_frame(table)
+            self.period_frame = table_to_frame(period_table)
+
+        # index des genres construit une fois, aligné sur les lignes des frames
+        with span("transform/genre_index"):
+            self.genre_index = build_genre_index(self.frame["Genres"])
+            in_period = self.frame["Release_year"].between(YEAR_MIN, YEAR_MAX).fillna(False)
+            self.period_genre_index = self.genre_index.subset(in_period.to_numpy(dtype=bool))
+
+        # agrégats année × genre × tranche de prix, pour les pages de synthèse
+        with span("transform/cube"):
+            self.cube = build_cube(self.frame, self.genre_index)
+
+    def games(self):
+        # copie superficielle : ajouter une colonne ne touche pas la poignée,
+        # écrire dans les valeurs lève « assignment destination is read-only »
+        return self.frame.copy(deep=False)
+
+    def period_games(self, year_min=YEAR_MIN, year_max=YEAR_MAX):
+        if (year_min, year_max) == (YEAR_MIN, YEAR_MAX):
+            return self.period_frame.copy(deep=False)
+        return self.frame[self.frame["Release_year"].between(year_min, year_max)]
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+@span("load/games_store")
+def _games_store(version):
+    return GamesStore(
+        open_games_table(PATH_GAMES_COLUMNAR),
+        open_games_table(PATH_PERIOD_COLUMNAR),
+    )
+
+
+def games_store():
+    """Poignée process-wide sur le dataset projeté en mémoire."""
+    return _games_store(dataset_version())
+
+
+def load_games():
+    """Dataset complet (toutes années), typé, avec Total_reviews / Ratio_Positive."""
+    return games_store().games()
+
+
+def load_period_games(year_min=YEAR_MIN, year_max=YEAR_MAX):
+    """Jeux sortis sur la période étudiée (2014–2024 par défaut)."""
+    return games_store().period_games(year_min, year_max)
+
+
+def load_genre_index():
+    """Index des genres aligné sur load_games()."""
+    return games_store().genre_index
+
+
+def load_period_genre_index():
+    """Index des genres aligné sur load_period_games()."""
+    return games_store().period_genre_index
+
+
+def load_cube():
+    """Cube d'agrégats (année × genre × tranche de prix) du dataset complet."""
+    return games_store().cube
+
+
+# =========================================================
+# TABLES DÉRIVÉES (PAGES 03, 04 ET 06)
+# =========================================================
+# Définies ici plutôt que dans les pages : le préchauffage (utils/prewarm.py)
+# remplit les mêmes entrées de cache que les pages. Partagées par toutes les
+# sessions sans copie ni désérialisation (cache_resource) : les pages reçoivent
+# une copie superficielle, comme pour GamesStore.games().
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+@span("transform/genre_table")
+def _genre_table(version, filters):
+    # indépendant du seuil : une entrée par (version du dataset, filtres)
+    # cumuls du cube année × genre × prix (pas d'explode ni de groupby)
+    cube = load_filtered_cube(filters)
+    year_min, year_max = filters.year_min, filters.year_max
+    genre_stats = cube.genre_table(year_min, year_max)
+
+    pivot_growth = cube.genre_year_counts(year_min, year_max)
+    pivot_growth["croissance"] = pivot_growth[year_max] - pivot_growth[year_min]
+
+    genre_final = genre_stats.merge(
+        pivot_growth[["croissance"]],
+        left_on="Genres_list",
+        right_index=True,
+        how="left"
+    ).fillna(0)
+
+    max_reviews = genre_final["total_reviews"].max() or 1
+    genre_final["taille"] = (
+        genre_final["total_reviews"] / max_reviews * 3000 + 200
+    )
+
+    return genre_final
+
+
+def load_genre_table(filters=None):
+    """Statistiques par genre de la page 04 (jeux retenus par les filtres, avant le seuil)."""
+    return _genre_table(dataset_version(), _with_defaults(filters)).copy(deep=False)
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+@span("transform/clean_for_recommendation")
+def _cleaned_data(version):
+    # catégorie principale (règles Open World, FPS, RPG…) calculée ici,
+    # une fois par version du dataset — voir CATEGORY_RULES ; genres selon la
+    # normalisation historique de la page 06 (index propre au recommandeur)
+    return clean_for_recommendation(load_games())
+
+
+def load_cleaned_data():
+    """Catalogue nettoyé du recommandeur et bitsets de genres alignés : (df, genre_bits)."""
+    df, genre_bits = _cleaned_data(dataset_version())
+    return df.copy(deep=False), genre_bits
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _neighbour_table(version):
+    from utils.neighbours import read_neighbour_table   # utils.neighbours importe ce module
+
+    # None si la table hors ligne est absente ou périmée → calcul direct
+    df, _ = _cleaned_data(version)
+    return read_neighbour_table(version, df["AppID"].to_numpy())
+
+
+def load_neighbour_table():
+    """Table des voisins précalculée (python -m utils.neighbours), ou None."""
+    return _neighbour_table(dataset_version())
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+@span("transform/name_index")
+def _name_index(version):
+    from utils.search import build_name_index
+
+    df, _ = _cleaned_data(version)
+    return build_name_index(df)
+
+
+def load_name_index():
+    """Index de recherche des noms du catalogue nettoyé (utils/search.py)."""
+    return _name_index(dataset_version())
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+@span("transform/game_groups")
+def _game_groups(version):
+    from utils.titles import group_table, group_titles, read_title_groups
+
+    # table hors ligne (python -m utils.titles) si elle est à jour,
+    # sinon regroupement calculé ici, dans le processus ; dans les deux cas
+    # sur le catalogue complet (le curseur d'années descend sous YEAR_MIN)
+    df = games_store().frame
+    group_ids = read_title_groups(version, df["AppID"].to_numpy())
+    if group_ids is None:
+        group_ids = group_titles(df, workers=1)
+    return group_table(df, group_ids)
+
+
+def load_game_groups():
+    """Jeux dédoublonnés (un par game_group_id, toutes années), triés par Total_reviews."""
+    return _game_groups(dataset_version()).copy(deep=False)
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+@span("transform/leaderboard")
+def _leaderboard(version):
+    from utils.leaderboard import build_leaderboard
+
+    # lignes de la table des groupes = positions dans frame (RangeIndex)
+    store = games_store()
+    table = _game_groups(version)
+    source_rows = table.index.to_numpy()
+    genre_index = store.genre_index.subset(source_rows)
+    return build_leaderboard(table, genre_index, source_rows=source_rows, n_source=len(store.frame))
+
+
+def load_leaderboard():
+    """Classements par année et par genre des jeux dédoublonnés de la page 03."""
+    return _leaderboard(dataset_version())
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _genre_rankings(version, filters):
+    from utils.leaderboard import rank_order
+
+    genre_final = _genre_table(version, filters)
+    return {col: rank_order(genre_final[col]) for col in ("total_reviews", "ratio_moyen", "croissance")}
+
+
+def load_genre_rankings(filters=None):
+    """Genres de load_genre_table(filters) classés par total_reviews, ratio_moyen et croissance."""
+    return _genre_rankings(dataset_version(), _with_defaults(filters))
+
+
+# =========================================================
+# FILTRES GLOBAUX (PAGES 02 À 06)
+# =========================================================
+# Sélections mémorisées par signature de filtres dans l'index bitmap
+# (utils/filters.py) ; les tables qui en dépendent sont mises en cache par
+# (version, filtres), quelques combinaisons récentes à la fois.
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+@span("transform/bitmap_index")
+def _bitmap_index(version):
+    from utils.filters import build_bitmap_index   # utils.filters importe ce module
+
+    store = games_store()
+    return build_bitmap_index(store.frame, store.genre_index)
+
+
+def load_bitmap_index():
+    """Index bitmap des filtres globaux, aligné sur load_games()."""
+    return _bitmap_index(dataset_version())
+
+
+def _with_defaults(filters):
+    from utils.filters import DEFAULT_FILTERS   # utils.filters importe ce module
+
+    return DEFAULT_FILTERS if filters is None else filters
+
+
+def load_selection(filters):
+    """Jeux de load_games() retenus par `filters` (Selection, mémorisée)."""
+    return load_bitmap_index().select(filters)
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+@span("transform/filtered_cubes")
+def _filtered_cubes(version):
+    from utils.filters import FilteredCubes   # utils.filters importe ce module
+
+    store = games_store()
+    return FilteredCubes(store.frame, store.genre_index, store.cube)
+
+
+def load_filtered_cube(filters):
+    """
+    Cube d'agrégats des jeux retenus : le cube partagé si seule la plage
+    d'années est filtrée (les pages passent les bornes), sinon le cube de la
+    sélection, mis à jour par différence depuis la sélection connue la plus
+    proche (utils/filters.py).
+    """
+    if filters.years_only():
+        return load_cube()
+    cubes = _filtered_cubes(dataset_version())
+    with span("transform/filtered_cube"):
+        return cubes.cube(filters, load_selection(filters))
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+@span("transform/selected_games")
+def _selected_games(version, filters):
+    return games_store().frame.take(_bitmap_index(version).select(filters).rows())
+
+
+def load_selected_games(filters):
+    """Jeux retenus par `filters` (index = positions dans load_games())."""
+    return _selected_games(dataset_version(), filters).copy(deep=False)
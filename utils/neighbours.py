@@ -0,0 +1,239 @@
+"""
+Table hors ligne des plus proches voisins du recommandeur (page 06).
+
+Pour chaque jeu du catalogue nettoyé : top-N des jeux similaires, avec les
+mêmes règles que la page (score 50/30/20, repli catégorie / genre commun).
+Le calcul est réparti sur tous les cœurs et peut être repris : chaque bloc
+terminé est écrit dans data/neighbours.parts/ et n'est plus recalculé.
+
+Table finale (data/neighbours.npz) :
+- app_ids     int32   (n,)        jeux du catalogue nettoyé
+- neighbours  int32   (n, top)    AppID des voisins, -1 si absent
+- scores      float32 (n, top)    score de similarité (float32 : même
+                                  affichage que le calcul à la volée)
+- version     version du dataset source (la table est ignorée sinon)
+
+Usage : python -m utils.neighbours [--top 10] [--workers 8] [--chunk-size 2000]
+"""
+
+import argparse
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from utils.load_data import dataset_version, read_games
+from utils.recommend import clean_for_recommendation, recommend
+
+PATH_NEIGHBOURS = "data/neighbours.npz"
+PARTS_DIR = "data/neighbours.parts"
+
+DEFAULT_TOP = 10
+DEFAULT_CHUNK_SIZE = 2000
+SCORE_DTYPE = np.float32
+
+
+# =========================================================
+# CALCUL (PROCESSUS DE TRAVAIL)
+# =========================================================
+
+_arrays = {}
+
+
+def _init_worker(arrays):
+    _arrays.update(arrays)
+
+
+def _compute_chunk(start, stop, top, part_path):
+    """Voisins des jeux start..stop-1, écrits dans un fichier de bloc."""
+    a = _arrays
+    neighbours = np.full((stop - start, top), -1, dtype=np.int32)
+    scores = np.full((stop - start, top), np.nan, dtype=SCORE_DTYPE)
+
+    for i, ref in enumerate(range(start, stop)):
+        rows, row_scores = recommend(
+            ref,
+            a["genre_bits"],
+            a["ratio"],
+            a["log_reviews"],
+            exclude=a["name_codes"] == a["name_codes"][ref],
+            categories=a["categories"],
+            k=top,
+        )
+        neighbours[i, :len(rows)] = a["app_ids"][rows]
+        scores[i, :len(rows)] = row_scores
+
+    tmp_path = f"{part_path}.tmp.npz"
+    np.savez(tmp_path, neighbours=neighbours, scores=scores)
+    os.replace(tmp_path, part_path)
+    return start, stop
+
+
+def recommendation_arrays(df, genre_bits):
+    """Colonnes utiles au score, sous forme de tableaux numpy compacts."""
+    return {
+        "app_ids": df["AppID"].to_numpy(dtype=np.int32),
+        "name_codes": pd.factorize(df["Name"])[0],
+        "categories": pd.factorize(df["main_category"])[0],
+        "ratio": df["Ratio_Positive"].to_numpy(dtype=np.float64),
+        "log_reviews": df["log_reviews"].to_numpy(dtype=np.float64),
+        "genre_bits": genre_bits,
+    }
+
+
+# =========================================================
+# CONSTRUCTION (REPRENABLE)
+# =========================================================
+
+def _part_path(parts_dir, start):
+    return os.path.join(parts_dir, f"chunk_{start:09d}.npz")
+
+
+def _prepare_parts_dir(parts_dir, meta):
+    """Conserve les blocs d'un calcul interrompu s'il porte sur les mêmes paramètres."""
+    meta_path = os.path.join(parts_dir, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            if json.load(f) == meta:
+                return
+        shutil.rmtree(parts_dir)
+
+    os.makedirs(parts_dir, exist_ok=True)
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+
+
+def build_neighbour_table(top=DEFAULT_TOP, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                          path=PATH_NEIGHBOURS, parts_dir=PARTS_DIR, verbose=True):
+    """Calcule la table des voisins pour la version courante du dataset."""
+    version = dataset_version()
+
+    df = read_games()
+    df, genre_bits = clean_for_recommendation(df)
+    arrays = recommendation_arrays(df, genre_bits)
+    n = len(df)
+
+    _prepare_parts_dir(parts_dir, {
+        "version": version, "top": top, "chunk_size": chunk_size, "n": n,
+        "scores": np.dtype(SCORE_DTYPE).name,
+    })
+
+    chunks = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+    todo = [(start, stop) for start, stop in chunks if not os.path.exists(_part_path(parts_dir, start))]
+    if verbose:
+        print(f"{n:,} jeux, {len(chunks)} blocs dont {len(todo)} à calculer")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(arrays,)) as pool:
+        futures = [
+            pool.submit(_compute_chunk, start, stop, top, _part_path(parts_dir, start))
+            for start, stop in todo
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            future.result()
+            if verbose:
+                print(f"  bloc {done}/{len(todo)}")
+
+    neighbours, scores = [], []
+    for start, _ in chunks:
+        with np.load(_part_path(parts_dir, start)) as part:
+            neighbours.append(part["neighbours"])
+            scores.append(part["scores"])
+
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(
+        tmp_path,
+        app_ids=arrays["app_ids"],
+        neighbours=np.concatenate(neighbours) if neighbours else np.empty((0, top), np.int32),
+        scores=np.concatenate(scores) if scores else np.empty((0, top), SCORE_DTYPE),
+        version=np.array(version),
+    )
+    os.replace(tmp_path, path)
+    shutil.rmtree(parts_dir)
+
+
+# =========================================================
+# LECTURE (PAGE 06)
+# =========================================================
+
+class NeighbourTable:
+    """Voisins précalculés, exprimés en positions du catalogue nettoyé."""
+
+    def __init__(self, neighbour_rows, scores, table_row_of):
+        self.neighbour_rows = neighbour_rows
+        self.scores = scores
+        self.table_row_of = table_row_of    # position dans df → ligne de la table
+
+    @property
+    def top(self):
+        return self.neighbour_rows.shape[1]
+
+    def lookup(self, ref, k):
+        """(positions, scores) des k voisins du jeu `ref`, ou None si indisponible."""
+        if k > self.top:
+            return None
+        row = self.table_row_of[ref]
+        if row < 0:
+            return None
+        rows = self.neighbour_rows[row, :k]
+        valid = rows >= 0
+        return rows[valid], self.scores[row, :k][valid].astype(np.float64)
+
+    def top_games(self, df, ref, k=5):
+        """
+        Même format que recommend_row (catalogue complet), ou None si la table
+        ne couvre pas ce jeu.
+        """
+        found = self.lookup(ref, k)
+        if found is None:
+            return None
+        rows, scores = found
+        return df.iloc[rows].assign(score_similarité=scores)
+
+
+def read_neighbour_table(version, app_ids, path=PATH_NEIGHBOURS):
+    """
+    Table alignée sur `app_ids` (AppID du catalogue nettoyé), ou None si elle
+    est absente, construite pour une autre version ou incohérente.
+    """
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path) as data:
+        if str(data["version"]) != version:
+            return None
+        table_ids = data["app_ids"]
+        neighbours = data["neighbours"]
+        scores = data["scores"]
+    # table d'un ancien format (scores float16) : ignorée, à reconstruire
+    if scores.dtype != SCORE_DTYPE:
+        return None
+
+    positions = pd.Index(np.asarray(app_ids))
+    if not positions.is_unique:
+        return None
+
+    neighbour_rows = positions.get_indexer(neighbours.ravel()).reshape(neighbours.shape)
+    if ((neighbour_rows < 0) & (neighbours >= 0)).any():
+        return None
+    neighbour_rows[neighbours < 0] = -1
+
+    table_row_of = pd.Index(table_ids).get_indexer(positions)
+    return NeighbourTable(neighbour_rows, scores, table_row_of)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Table des voisins du recommandeur (page 06).")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="voisins conservés par jeu")
+    parser.add_argument("--workers", type=int, default=None, help="processus (défaut : tous les cœurs)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="jeux par bloc")
+    args = parser.parse_args()
+
+    build_neighbour_table(top=args.top, workers=args.workers, chunk_size=args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
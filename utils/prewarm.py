@@ -0,0 +1,220 @@
+"""
+Préchauffage des caches au démarrage du serveur, avec indicateur de disponibilité.
+
+Un thread de fond remplit, avant la première visite, les caches partagés par
+toutes les sessions du processus :
+- poignée du dataset (Feather projeté, index des genres, cube d'agrégats)
+- index bitmap des filtres globaux et sélection par défaut
+- jeux dédoublonnés de la page 03 (groupes de titres) et leurs classements
+  par année et par genre
+- table des genres de la page 04 (indépendante du seuil) et son classement
+- catalogue nettoyé du recommandeur, table des voisins et index de recherche
+  des noms (page 06)
+- recommandations et figures des jeux les plus demandés : les suggestions
+  affichées sans recherche sur la page 06 (les plus populaires, Total_reviews)
+
+Indicateur de disponibilité : le fichier data/.ready (STEAM_READY_FILE) est
+supprimé au lancement du thread et écrit (JSON : pid, version, durées) une fois
+le préchauffage réussi. Le répartiteur de charge n'envoie du trafic qu'aux
+processus dont le fichier existe ; avec plusieurs processus sur une machine,
+donner à chacun son propre fichier. En cas d'échec, data/.ready n'est pas
+écrit : le rapport (statut « error », exception) va dans data/.ready.failed
+(même chemin + « .failed ») et dans le journal, le processus n'est pas annoncé.
+
+Lancement : python -m utils.prewarm [options de streamlit run] démarre le
+serveur et le préchauffage ensemble. Sous `streamlit run app.py`, le
+préchauffage démarre au premier affichage de app.py.
+
+Variables : STEAM_PREWARM=0 (désactive), STEAM_READY_FILE,
+STEAM_PREWARM_GAMES (nombre de jeux populaires, défaut 50).
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+PREWARM = os.environ.get("STEAM_PREWARM", "1") != "0"
+PATH_READY = os.environ.get("STEAM_READY_FILE", "data/.ready")
+PATH_FAILED = f"{PATH_READY}.failed"
+N_POPULAR_GAMES = int(os.environ.get("STEAM_PREWARM_GAMES", 50))
+RUNTIME_POLL = 0.1      # s, attente du runtime Streamlit
+
+logger = logging.getLogger(__name__)
+
+_ready = threading.Event()
+_thread = None
+_thread_lock = threading.Lock()
+
+
+# =========================================================
+# DISPONIBILITÉ
+# =========================================================
+
+def is_ready():
+    """Vrai une fois le préchauffage de ce processus terminé (réussi ou non)."""
+    return _ready.is_set()
+
+
+def _write_report(report, path):
+    """Écriture atomique d'un rapport JSON (disponibilité ou échec)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _clear_ready_file():
+    for path in (PATH_READY, PATH_FAILED):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# =========================================================
+# ÉTAPES DU PRÉCHAUFFAGE
+# =========================================================
+
+def warm_search():
+    """Index des noms de la page 06 ; textdistance importé pour la première faute de frappe."""
+    import textdistance  # noqa: F401  (import différé dans utils/search.py)
+
+    from utils.load_data import load_name_index
+
+    load_name_index()
+
+
+def warm_filters():
+    """Index bitmap et sélection des filtres par défaut (barre latérale)."""
+    from utils.filters import DEFAULT_FILTERS
+    from utils.load_data import load_bitmap_index
+
+    load_bitmap_index().select(DEFAULT_FILTERS).rows()
+
+
+def warm_recommendations(n=N_POPULAR_GAMES):
+    """
+    Top-5 et figure de la page 06 pour les jeux les plus demandés : les
+    suggestions affichées sans recherche (jeu par défaut en tête), par popularité.
+    """
+    from utils.charts import cached_recommendation_figure
+    from utils.load_data import (
+        dataset_version,
+        load_cleaned_data,
+        load_name_index,
+        load_neighbour_table,
+    )
+    from utils.recommend import recommendations_for
+
+    version = dataset_version()
+    df, genre_bits = load_cleaned_data()
+    neighbour_table = load_neighbour_table()
+    refs = load_name_index().search("", limit=n)
+    for ref in refs:
+        top = recommendations_for(df, genre_bits, ref, neighbour_table, k=5)
+        if not top.empty:
+            cached_recommendation_figure(version, top, df.iloc[ref])
+    return len(refs)
+
+
+def prewarm():
+    """Remplit les caches partagés ; retourne la durée de chaque étape (s)."""
+    from utils.load_data import (
+        dataset_version,
+        games_store,
+        load_cleaned_data,
+        load_game_groups,
+        load_genre_rankings,
+        load_genre_table,
+        load_leaderboard,
+        load_neighbour_table,
+    )
+
+    steps = [
+        ("games_store", games_store),
+        ("bitmap_index", warm_filters),
+        ("game_groups", load_game_groups),
+        ("leaderboard", load_leaderboard),
+        ("genre_table", load_genre_table),
+        ("genre_rankings", load_genre_rankings),
+        ("cleaned_data", load_cleaned_data),
+        ("neighbour_table", load_neighbour_table),
+        ("name_index", warm_search),
+        ("recommendations", warm_recommendations),
+    ]
+    timings = {"version": dataset_version()}
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        timings[name] = round(time.perf_counter() - start, 3)
+    return timings
+
+
+# =========================================================
+# THREAD DE FOND
+# =========================================================
+
+def _wait_for_runtime():
+    """
+    Les caches st.cache_* ne sont partagés qu'une fois le runtime créé :
+    avant, Streamlit les remplit dans un stockage jetable.
+    """
+    from streamlit import runtime
+
+    while not runtime.exists():
+        time.sleep(RUNTIME_POLL)
+
+
+def _run():
+    start = time.perf_counter()
+    report = {"pid": os.getpid()}
+    try:
+        _wait_for_runtime()
+        report.update(prewarm(), status="ok")
+    except Exception as exc:   # un échec ne doit pas empêcher de servir les pages
+        logger.exception("Préchauffage interrompu")
+        report.update(status="error", error=f"{type(exc).__name__}: {exc}")
+    report["seconds"] = round(time.perf_counter() - start, 3)
+
+    # seul un préchauffage réussi annonce le processus au répartiteur de charge
+    path = PATH_READY if report["status"] == "ok" else PATH_FAILED
+    try:
+        _write_report(report, path)
+    except OSError:
+        logger.warning("Fichier %s non inscriptible", path)
+    _ready.set()
+    logger.info("Préchauffage terminé : %s", report)
+
+
+def start_prewarm():
+    """Lance le préchauffage une seule fois par processus (appels suivants : no-op)."""
+    global _thread
+    if not PREWARM:
+        return None
+    with _thread_lock:
+        if _thread is None:
+            _clear_ready_file()
+            _thread = threading.Thread(target=_run, name="steam-prewarm", daemon=True)
+            _thread.start()
+    return _thread
+
+
+# =========================================================
+# LANCEMENT DU SERVEUR
+# =========================================================
+
+def main():
+    """Équivalent de `streamlit run app.py [args]`, préchauffage démarré avant le serveur."""
+    from streamlit.web import cli
+
+    start_prewarm()
+    sys.argv = ["streamlit", "run", "app.py", *sys.argv[1:]]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Recommandeur de la page 06, sans dépendance à Streamlit : nettoyage du
+catalogue, catégorie principale et moteur de similarité.
+
+Même score que la version d'origine, calculé en une passe sur des tableaux :
+- genres (0–50)     : part des genres du jeu de référence partagés (bitsets)
+- qualité (0–30)    : écart de Ratio_Positive
+- popularité (0–20) : écart de log(1 + Total_reviews)
+
+Le top-k est extrait par sélection partielle (np.partition), sans tri complet.
+Départage des ex aequo : ordre d'origine des lignes.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.cleaning import nsfw_mask
+from utils.genres import build_genre_index, parse_genres_titled
+
+# seuils de repli de la version d'origine
+MIN_SAME_CATEGORY = 20
+MIN_WITH_COMMON = 5
+
+
+# =========================================================
+# NETTOYAGE DU CATALOGUE (PAGE 06 ET TABLE HORS LIGNE)
+# =========================================================
+
+def recommendation_genre_index(genres):
+    """
+    Index des genres du recommandeur : normalisation historique de la page 06
+    (parse_genres_titled), distincte de celle des pages 04 / 05.
+    """
+    return build_genre_index(genres, parse=parse_genres_titled)
+
+
+def clean_for_recommendation(df, genre_index=None):
+    """
+    Jeux retenus par le recommandeur (filtre NSFW, >= 50 avis, titres suspects)
+    avec Genres_list, log_reviews et main_category. Retourne (df, genre_bits) alignés.
+    genre_index : recommendation_genre_index(df["Genres"]) si absent.
+    """
+    if genre_index is None:
+        genre_index = recommendation_genre_index(df["Genres"])
+
+    # ---------- FILTRE NSFW FORT (regex compilée, voir utils/cleaning.py) ----------
+    keep = (
+        ~nsfw_mask(df["Name"], df["Genres"])
+        # jeux quasi inconnus → on enlève
+        & (df["Total_reviews"] >= 50)
+        # trop de genres = souvent du flood
+        & (genre_index.genre_counts() <= 6)
+        # titres à rallonge bizarres
+        & (df["Name"].str.len() < 80)
+        # titres full caps suspects
+        & df["Name"].apply(lambda x: sum(c.isupper() for c in str(x)) < 20)
+    ).to_numpy(dtype=bool)
+
+    df = df[keep]
+
+    # genres lus sur l'index (chaque chaîne distincte parsée une fois)
+    kept_index = genre_index.subset(keep)
+    df["Genres_list"] = kept_index.genre_lists()
+
+    df["log_reviews"] = np.log1p(df["Total_reviews"])
+
+    # catégorie calculée une fois, avec le reste du catalogue nettoyé
+    df["main_category"] = main_categories(df["Name"], kept_index)
+
+    return df, kept_index.bitsets()
+
+
+# =========================================================
+# CATÉGORISATION PRINCIPALE (VERSION AVEC OPEN WORLD)
+# =========================================================
+
+KNOWN_OPEN_WORLD = [
+    "gta", "grand theft auto", "red dead", "watch dogs", "saints row",
+    "sleeping dogs", "mafia", "just cause", "assassin",
+    "far cry", "spider-man", "spiderman", "batman arkham"
+]
+
+# règles évaluées dans l'ordre, la première qui s'applique l'emporte :
+# (catégorie, mots-clés du nom, mots-clés de genre, mots-clés de genre exclus)
+# un mot-clé de genre s'applique si il est contenu dans un genre (minuscules)
+CATEGORY_RULES = [
+    ("Open World / Sandbox", KNOWN_OPEN_WORLD, ["open world", "sandbox", "crime"], []),
+    ("Battle Royale", [], ["battle royale"], []),
+    ("FPS", [], ["fps", "first-person shooter", "shooter"], ["battle royale"]),
+    ("RPG", [], ["rpg", "jrpg", "role-playing", "action rpg"], []),
+    ("MMO / MMORPG", [], ["mmorpg", "mmo", "massively multiplayer"], []),
+    ("Strategy", [], ["strategy", "rts", "4x", "turn-based"], []),
+    ("Simulation", [], ["simulation", "simulator", "city builder", "building", "tycoon"], []),
+    ("Sports / Racing", [], ["sports", "racing", "football", "soccer", "f1", "basketball", "tennis"], []),
+    ("Survival / Horror", [], ["survival", "horror", "zombie"], []),
+    ("Indie / Casual", [], ["indie", "casual", "puzzle", "relaxing"], []),
+    ("Action / Adventure", [], ["action", "adventure"], []),
+]
+DEFAULT_CATEGORY = "Autre"
+
+
+def _genre_keyword_mask(genre_index, keywords):
+    """Jeux dont au moins un genre contient un des mots-clés."""
+    vocab_low = [g.lower() for g in genre_index.vocab]
+    matching = [g for g, low in zip(genre_index.vocab, vocab_low)
+                if any(k in low for k in keywords)]
+    return genre_index.mask_any(matching)
+
+
+def main_categories(names, genre_index):
+    """
+    Catégorie principale de chaque jeu (catégoriel), via CATEGORY_RULES :
+    masques booléens sur l'index des genres et sur la colonne des noms.
+    """
+    names_low = pd.Series(names).astype(pd.StringDtype("pyarrow")).fillna("").str.lower()
+
+    conditions = []
+    for _, name_keywords, genre_keywords, excluded in CATEGORY_RULES:
+        cond = _genre_keyword_mask(genre_index, genre_keywords)
+        if name_keywords:
+            regex = "|".join(re.escape(k) for k in name_keywords)
+            cond |= names_low.str.contains(regex, regex=True).to_numpy(dtype=bool)
+        if excluded:
+            cond &= ~_genre_keyword_mask(genre_index, excluded)
+        conditions.append(cond)
+
+    labels = [rule[0] for rule in CATEGORY_RULES] + [DEFAULT_CATEGORY]
+    codes = np.select(conditions, np.arange(len(CATEGORY_RULES)), default=len(CATEGORY_RULES))
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+
+# =========================================================
+# SCORE DE SIMILARITÉ
+# =========================================================
+
+def popcount(bits):
+    """Nombre de bits levés par ligne d'un tableau uint64 (n, n_words), ou d'un bitmap (n_words,)."""
+    if hasattr(np, "bitwise_count"):
+        counts = np.bitwise_count(bits)
+    else:
+        counts = np.unpackbits(bits.view(np.uint8), axis=-1).reshape(*bits.shape, 64).sum(axis=-1)
+    return counts.sum(axis=-1, dtype=np.int64)
+
+
+def common_genre_counts(genre_bits, ref):
+    """Nombre de genres partagés avec le jeu `ref` (position), pour tous les jeux."""
+    return popcount(genre_bits & genre_bits[ref])
+
+
+def similarity_scores(genre_bits, ratio, log_reviews, ref, rows=None):
+    """Score de similarité (0–100) des jeux `rows` (tous par défaut) par rapport à `ref`."""
+    if rows is None:
+        rows = np.arange(len(ratio))
+
+    n_ref = popcount(genre_bits[ref:ref + 1])[0]
+    if n_ref:
+        genre_score = popcount(genre_bits[rows] & genre_bits[ref]) / n_ref * 50
+    else:
+        genre_score = np.zeros(len(rows))
+
+    qual_score = np.maximum(0, (1 - np.abs(ratio[ref] - ratio[rows])) * 30)
+    pop_score = np.maximum(0, (1 - np.abs(log_reviews[ref] - log_reviews[rows]) / 5) * 20)
+
+    return genre_score + qual_score + pop_score
+
+
+def top_k(scores, k):
+    """
+    Positions des k meilleurs scores, dans l'ordre de l'ancien tri de la page
+    (sort_values décroissant, quicksort non stable). Sélection partielle si les
+    scores retenus sont tous distincts ; sinon l'ordre des ex aequo dépend du
+    tableau entier, on refait le même tri pour le reproduire à l'identique.
+    """
+    if len(scores) > k:
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(len(scores))
+    values = scores[candidates]
+    if len(np.unique(values)) == len(values):
+        return candidates[np.argsort(-values)]
+    return pd.Series(scores).sort_values(ascending=False).index.to_numpy()[:k]
+
+
+def recommend(ref, genre_bits, ratio, log_reviews, exclude, categories=None, k=5):
+    """
+    Recommandations pour le jeu `ref` (position dans les tableaux).
+
+    exclude    : masque des jeux à écarter (ex. même nom que le jeu choisi)
+    categories : catégorie principale par jeu ; si au moins 20 candidats
+                 partagent celle de `ref`, on se limite à eux.
+    Retourne (positions, scores) des k meilleurs candidats.
+    """
+    candidates = ~np.asarray(exclude, dtype=bool)
+
+    if categories is not None:
+        categories = np.asarray(categories)
+        same_cat = candidates & (categories == categories[ref])
+        if same_cat.sum() >= MIN_SAME_CATEGORY:
+            candidates = same_cat
+
+    with_common = candidates & (common_genre_counts(genre_bits, ref) >= 1)
+    if with_common.sum() >= MIN_WITH_COMMON:
+        candidates = with_common
+
+    rows = np.flatnonzero(candidates)
+    scores = similarity_scores(genre_bits, ratio, log_reviews, ref, rows)
+    best = top_k(scores, k)
+    return rows[best], scores[best]
+
+
+def recommend_row(df, genre_bits, ref, k=5, allowed=None):
+    """
+    Version DataFrame : top-k des jeux proches du jeu en position `ref`
+    (colonnes Name, Ratio_Positive, log_reviews, main_category), choisis
+    parmi les jeux `allowed` (masque, tous par défaut) ; les jeux du même nom
+    que `ref` sont écartés. Ajoute la colonne score_similarité.
+    """
+    same_name = (df["Name"] == df["Name"].iloc[ref]).to_numpy(dtype=bool)
+    exclude = same_name if allowed is None else same_name | ~allowed
+
+    positions, scores = recommend(
+        ref,
+        genre_bits,
+        df["Ratio_Positive"].to_numpy(dtype=np.float64),
+        df["log_reviews"].to_numpy(dtype=np.float64),
+        exclude=exclude,
+        categories=df["main_category"].to_numpy() if "main_category" in df else None,
+        k=k,
+    )
+    return df.iloc[positions].assign(score_similarité=scores)
+
+
+def recommend_games(df, genre_bits, selected_game, k=5, allowed=None):
+    """recommend_row pour la première ligne portant le nom `selected_game`."""
+    ref = int(np.flatnonzero((df["Name"] == selected_game).to_numpy(dtype=bool))[0])
+    return recommend_row(df, genre_bits, ref, k=k, allowed=allowed)
+
+
+def recommendations_for(df, genre_bits, ref, neighbour_table=None, k=5, allowed=None):
+    """
+    Top-k du jeu en position `ref` : table des voisins précalculée si elle
+    couvre ce jeu, sinon recommend_row (même format dans les deux cas).
+    allowed : masque des jeux recommandables (filtres globaux), None = tous.
+    Avec un masque, toujours recommend_row restreint à `allowed` : les règles
+    de repli (catégorie, genre commun) dépendent des candidats, la table
+    filtrée après coup ne donnerait pas le même top-k.
+    top.attrs["source"] : "table" ou "live".
+    """
+    top = None
+    if neighbour_table is not None and allowed is None:
+        top = neighbour_table.top_games(df, ref, k=k)
+    source = "table"
+    if top is None:
+        top, source = recommend_row(df, genre_bits, ref, k=k, allowed=allowed), "live"
+    # origine des scores, dans la clé de cache de la figure (utils/charts.py)
+    top.attrs["source"] = source
+    return top
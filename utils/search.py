@@ -0,0 +1,267 @@
+"""
+Recherche de jeux par nom (page 06) et accès direct à une ligne du catalogue.
+
+Les noms sont normalisés une fois (accents retirés, casse repliée, ponctuation
+→ espace) puis indexés, lignes rangées par popularité décroissante
+(Total_reviews) : parcourir une liste de postings dans l'ordre croissant,
+c'est parcourir les jeux du plus au moins populaire.
+
+- préfixe du nom complet : noms normalisés triés, recherche dichotomique
+- début de mot et sous-chaîne : index inversé de trigrammes (format CSR),
+  intersection des postings puis vérification sur le nom normalisé
+- repli tolérant aux fautes de frappe : jeux partageant le plus de trigrammes
+  avec la requête, départagés par textdistance (Levenshtein normalisé)
+- AppID / nom → position dans le catalogue : index de hachage (pandas),
+  première occurrence retenue pour un nom en double
+
+Ordre des suggestions : nom commençant par la requête, puis mot commençant
+par la requête, puis sous-chaîne, puis repli approché ; popularité à égalité.
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+MAX_SUGGESTIONS = 20
+MAX_VERIFIED = 5_000        # candidats vérifiés au plus par requête (sous-chaîne)
+FUZZY_CANDIDATES = 10       # noms comparés par textdistance
+FUZZY_MIN_SHARED = 0.5      # part minimale des trigrammes de la requête
+FUZZY_MIN_SIMILARITY = 0.6
+FUZZY_MAX_HITS = 200_000    # postings lus au plus par le repli approché
+BUILD_BLOCK = 100_000       # noms par bloc lors du calcul des trigrammes
+
+COMBINING_MARKS = r"[\u0300-\u036f]"
+SEPARATORS = r"[\W_]+"
+
+
+# =========================================================
+# NORMALISATION
+# =========================================================
+
+def fold_names(names):
+    """Noms normalisés (Series de str) : NFKD sans diacritiques, casefold, ponctuation → espace."""
+    return (
+        pd.Series(names, dtype=object).fillna("")
+        .str.normalize("NFKD")
+        .str.replace(COMBINING_MARKS, "", regex=True)
+        .str.casefold()
+        .str.replace(SEPARATORS, " ", regex=True)
+        .str.strip()
+    )
+
+
+def fold(text):
+    """Même normalisation, pour une requête (sans passer par pandas)."""
+    text = re.sub(COMBINING_MARKS, "", unicodedata.normalize("NFKD", text or ""))
+    return re.sub(SEPARATORS, " ", text.casefold()).strip()
+
+
+def trigram_keys(padded):
+    """
+    Trigrammes d'une liste de chaînes, codés en uint64 (3 × 21 bits de point de
+    code). Retourne (numéro de chaîne, clé) pour chaque trigramme.
+    """
+    width = max(map(len, padded), default=0)
+    if width < 3:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+
+    buf = "".join(s.ljust(width, "\0") for s in padded).encode("utf-32-le")
+    codes = np.frombuffer(buf, dtype=np.uint32).reshape(len(padded), width).astype(np.uint64)
+    keys = (codes[:, :-2] << np.uint64(42)) | (codes[:, 1:-1] << np.uint64(21)) | codes[:, 2:]
+    valid = codes[:, 2:] != 0
+    owners = np.broadcast_to(np.arange(len(padded))[:, None], keys.shape)
+    return owners[valid], keys[valid]
+
+
+def _query_keys(text):
+    _, keys = trigram_keys([text])
+    return np.unique(keys)
+
+
+# =========================================================
+# INDEX
+# =========================================================
+
+class NameIndex:
+    """Index des noms d'un catalogue (positions = lignes du DataFrame d'origine)."""
+
+    def __init__(self, names, total_reviews, app_ids):
+        names = np.asarray(names, dtype=object)
+        # ligne de l'index → position dans le catalogue, par popularité décroissante
+        self.positions = np.argsort(-np.asarray(total_reviews, dtype=np.int64), kind="stable")
+        self.names = names[self.positions]
+        self.folded = fold_names(self.names).to_numpy(dtype=object)
+
+        # préfixe du nom complet : noms normalisés triés
+        self.sorted_rows = np.argsort(self.folded, kind="stable")
+        self.sorted_folded = self.folded[self.sorted_rows]
+
+        self._build_trigrams()
+
+        # accès direct : première occurrence de chaque AppID / nom
+        self.app_id_index, self.app_id_positions = _first_occurrence(app_ids)
+        self.name_index, self.name_positions = _first_occurrence(names)
+
+    def _build_trigrams(self):
+        """Postings CSR : clé triée → lignes (croissantes, donc par popularité)."""
+        all_rows, all_keys = [], []
+        for start in range(0, len(self.folded), BUILD_BLOCK):
+            block = [f" {s} " for s in self.folded[start:start + BUILD_BLOCK]]
+            rows, keys = trigram_keys(block)
+            all_rows.append((rows + start).astype(np.int32))
+            all_keys.append(keys)
+
+        rows = np.concatenate(all_rows) if all_rows else np.empty(0, dtype=np.int32)
+        keys = np.concatenate(all_keys) if all_keys else np.empty(0, dtype=np.uint64)
+        order = np.argsort(keys, kind="stable")
+        rows, keys = rows[order], keys[order]
+
+        # un trigramme répété dans un nom ne compte qu'une fois
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])
+        rows, keys = rows[keep], keys[keep]
+
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, dtype=np.int64)
+        self.gram_keys = keys[starts]
+        self.gram_indptr = np.append(starts, len(keys))
+        self.gram_rows = rows
+
+    def __len__(self):
+        return len(self.positions)
+
+    # ---------- accès direct ----------
+
+    def position_of_app_id(self, app_id):
+        """Position du jeu dans le catalogue, ou None."""
+        return _lookup(self.app_id_index, self.app_id_positions, app_id)
+
+    def position_of_name(self, name):
+        """Position de la première ligne portant ce nom exact, ou None."""
+        return _lookup(self.name_index, self.name_positions, name)
+
+    # ---------- recherche ----------
+
+    def _postings(self, key):
+        i = np.searchsorted(self.gram_keys, key)
+        if i == len(self.gram_keys) or self.gram_keys[i] != key:
+            return self.gram_rows[:0]
+        return self.gram_rows[self.gram_indptr[i]:self.gram_indptr[i + 1]]
+
+    def _containing(self, keys, max_rows):
+        """
+        Les `max_rows` lignes les plus populaires qui contiennent tous les
+        trigrammes : la liste la plus courte est lue par blocs, dans l'ordre.
+        """
+        postings = sorted((self._postings(k) for k in keys), key=len)
+        if not postings:
+            return self.gram_rows[:0]
+
+        found, n_found = [], 0
+        for start in range(0, len(postings[0]), max_rows):
+            rows = postings[0][start:start + max_rows]
+            for other in postings[1:]:
+                # postings triés : recherche dichotomique des lignes du bloc
+                at = np.minimum(np.searchsorted(other, rows), len(other) - 1)
+                rows = rows[other[at] == rows]
+            found.append(rows)
+            n_found += len(rows)
+            if n_found >= max_rows:
+                break
+        return np.concatenate(found)[:max_rows] if found else self.gram_rows[:0]
+
+    def _prefix_rows(self, q, limit):
+        lo = np.searchsorted(self.sorted_folded, q, side="left")
+        hi = np.searchsorted(self.sorted_folded, q + "\U0010ffff", side="left")
+        rows = self.sorted_rows[lo:hi]
+        if len(rows) > limit:
+            rows = np.partition(rows, limit - 1)[:limit]
+        return np.sort(rows)
+
+    def _matching_rows(self, q, limit, exclude):
+        """Début de mot puis sous-chaîne, chacun par popularité."""
+        # sous-chaîne : trigrammes de la requête ; 2 caractères : début de mot seul
+        keys = _query_keys(q if len(q) >= 3 else f" {q}")
+        candidates = self._containing(keys, MAX_VERIFIED)
+
+        word_start, inside = [], []
+        needle = f" {q}"
+        for row in candidates.tolist():
+            if row in exclude:
+                continue
+            at = f" {self.folded[row]}".find(needle)
+            if at > 0:
+                word_start.append(row)
+                if len(word_start) >= limit:
+                    break
+            elif len(inside) < limit and len(q) >= 3 and q in self.folded[row]:
+                inside.append(row)
+        return word_start + inside
+
+    def _fuzzy_rows(self, q, limit, exclude):
+        """Repli approché : trigrammes partagés puis textdistance (import différé)."""
+        keys = _query_keys(f" {q} ")
+        if not len(keys):
+            return []
+        # trigrammes les plus rares d'abord ; les plus fréquents (peu discriminants,
+        # longs à compter) sont ignorés au-delà de FUZZY_MAX_HITS lignes lues
+        postings = sorted((p for p in map(self._postings, keys) if len(p)), key=len)
+        sizes = np.cumsum([len(p) for p in postings])
+        postings = postings[:max(3, int(np.searchsorted(sizes, FUZZY_MAX_HITS, side="right")))]
+        if not postings:
+            return []
+        hits = np.concatenate(postings)
+        shared = np.bincount(hits)
+        rows = np.flatnonzero(shared >= max(1, int(np.ceil(len(postings) * FUZZY_MIN_SHARED))))
+        # plus de trigrammes partagés d'abord, puis ligne la plus populaire
+        rank = shared[rows].astype(np.int64) * len(self) - rows
+        n_best = min(len(rows), FUZZY_CANDIDATES + len(exclude))
+        best = np.argpartition(rank, len(rank) - n_best)[len(rank) - n_best:]
+        best = best[np.argsort(-rank[best])]
+
+        from textdistance import Levenshtein
+
+        distance = Levenshtein(external=False)
+        scored = []
+        for row in rows[best].tolist():
+            if row in exclude:
+                continue
+            name = self.folded[row]
+            # requête comparée au début du nom et des mots de même initiale
+            starts = [0] + [m.end() for m in re.finditer(" ", name) if name[m.end():m.end() + 1] == q[0]]
+            similarity = max(distance.normalized_similarity(q, name[s:s + len(q)]) for s in starts[:2])
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                scored.append((-similarity, row))
+        return [row for _, row in sorted(scored)[:limit]]
+
+    def search(self, query, limit=MAX_SUGGESTIONS):
+        """Positions (catalogue) des `limit` meilleures suggestions pour `query`."""
+        q = fold(query)
+        if not q:
+            return self.positions[:limit].tolist()
+
+        rows = self._prefix_rows(q, limit).tolist()
+        # nom exact en tête
+        rows.sort(key=lambda row: self.folded[row] != q)
+        if len(rows) < limit:
+            rows += self._matching_rows(q, limit - len(rows), set(rows))
+        if len(rows) < limit and len(q) >= 3:
+            rows += self._fuzzy_rows(q, limit - len(rows), set(rows))
+        return self.positions[rows[:limit]].tolist()
+
+
+def _first_occurrence(values):
+    values = pd.Series(np.asarray(values))
+    first = ~values.duplicated().to_numpy()
+    return pd.Index(values.to_numpy()[first]), np.flatnonzero(first)
+
+
+def _lookup(index, positions, value):
+    i = index.get_indexer([value])[0]
+    return None if i < 0 else int(positions[i])
+
+
+def build_name_index(df):
+    """Index des noms d'un catalogue (colonnes Name, Total_reviews, AppID)."""
+    return NameIndex(df["Name"].to_numpy(), df["Total_reviews"].to_numpy(), df["AppID"].to_numpy())
@@ -0,0 +1,371 @@
+"""
+Regroupement des titres en double (page 03) : rééditions, éditions, ™,
+« Remastered », variantes de casse ou d'espacement d'un même jeu.
+
+Deux jeux du même développeur sont regroupés si leurs titres normalisés sont
+identiques ou très proches ; game_group_id = AppID du jeu le plus commenté
+du groupe. Aucune comparaison toutes paires :
+- normalisation : ™ ® © retirés, accents et casse repliés, ponctuation →
+  espace, suffixes d'édition retirés en fin de titre (Remastered, GOTY,
+  Definitive Edition, (Classic)…)
+- blocage : développeur ; les titres identiques après normalisation sont
+  regroupés par hachage
+- voisinage trié : chaque titre distinct n'est comparé qu'aux WINDOW titres
+  suivants du même développeur, dans l'ordre alphabétique puis dans l'ordre
+  des titres écrits à l'envers (une faute en début de titre)
+- comparaison : similarité de Jaccard des trigrammes >= NEAR_THRESHOLD et
+  mêmes numéros (« 2 », « II », « 2019 ») : une suite n'est pas un doublon
+- homonymes exacts regroupés quel que soit le développeur (règle historique
+  de la page 03, drop_duplicates sur Name)
+- paires réunies par union-find
+
+Les développeurs sont répartis en blocs contigus traités par un pool de
+processus (tous les cœurs par défaut).
+
+Table (data/title_groups.npz) : app_ids, group_ids (AppID du représentant),
+version du dataset source (la table est ignorée sinon). Après un passage
+incrémental de l'ETL, seuls les anciens groupes qui touchent le développeur
+ou le nom d'un AppID modifié sont regroupés à nouveau : les autres gardent
+leur groupe (regroup_changed).
+
+Usage : python -m utils.titles [--workers 8] [--chunk-size 50000]
+"""
+
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.load_data import dataset_version, read_games
+from utils.search import fold_names
+
+PATH_TITLE_GROUPS = "data/title_groups.npz"
+
+WINDOW = 4
+NEAR_THRESHOLD = 0.8
+DEFAULT_CHUNK_SIZE = 50_000     # titres distincts par bloc de travail
+
+TRADEMARKS = r"[™®©]"
+EDITION_WORDS = [
+    "remastered", "remaster", "definitive", "deluxe", "goty", "game of the year",
+    "complete", "ultimate", "gold", "enhanced", "special", "anniversary",
+    "collectors", "collector s", "director s cut", "classic", "hd", "edition", "version",
+]
+EDITION_SUFFIX = r"(?:\s+(?:" + "|".join(EDITION_WORDS) + r"))+$"
+NUMBER_TOKEN = re.compile(r"\b(?:\d+|[ivx]{1,4})\b")
+
+
+# =========================================================
+# NORMALISATION
+# =========================================================
+
+def title_keys(names):
+    """Clé de titre (Series de str) : forme repliée, sans marque ni suffixe d'édition."""
+    folded = fold_names(pd.Series(names, dtype=object).fillna("").str.replace(TRADEMARKS, "", regex=True))
+    keys = (" " + folded).str.replace(EDITION_SUFFIX, "", regex=True).str.strip()
+    # titre réduit à des mots d'édition (« Classic ») : forme repliée conservée
+    return keys.where(keys != "", folded)
+
+
+def developer_keys(df):
+    """Clé de blocage : développeur, à défaut éditeur."""
+    developer = df["Developer"].astype(object) if "Developer" in df else pd.Series("", index=df.index)
+    if "Publisher" in df:
+        developer = developer.fillna(df["Publisher"].astype(object))
+    return fold_names(developer.to_numpy())
+
+
+def _trigrams(key):
+    padded = f" {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _signature(key):
+    """(numéros, trigrammes) d'une clé, calculés une fois par titre distinct."""
+    return tuple(NUMBER_TOKEN.findall(key)), _trigrams(key)
+
+
+def near_duplicates(a, b):
+    """Deux signatures de titres du même développeur désignent-elles le même jeu ?"""
+    (numbers_a, ga), (numbers_b, gb) = a, b
+    if numbers_a != numbers_b:
+        return False
+    # Jaccard >= t impose |petit| >= t × |grand| : test gratuit avant l'intersection
+    if min(len(ga), len(gb)) < NEAR_THRESHOLD * max(len(ga), len(gb)):
+        return False
+    common = len(ga & gb)
+    return common >= NEAR_THRESHOLD * (len(ga) + len(gb) - common)
+
+
+# =========================================================
+# COMPARAISON (PROCESSUS DE TRAVAIL)
+# =========================================================
+
+def _compare_chunk(developers, keys):
+    """
+    Paires (i, j) de titres distincts proches dans un bloc de développeurs
+    (indices locaux). Deux passes de voisinage trié : clé, puis clé inversée.
+    """
+    signatures = [_signature(k) for k in keys]
+    pairs = []
+    for sort_keys in (keys, [k[::-1] for k in keys]):
+        order = sorted(range(len(keys)), key=lambda i: (developers[i], sort_keys[i]))
+        for pos, i in enumerate(order):
+            for j in order[pos + 1:pos + 1 + WINDOW]:
+                if developers[j] != developers[i]:
+                    break
+                if near_duplicates(signatures[i], signatures[j]):
+                    pairs.append((i, j))
+    return pairs
+
+
+def _compare_range(args):
+    developers, keys, offset = args
+    return [(i + offset, j + offset) for i, j in _compare_chunk(developers, keys)]
+
+
+def _chunks(developers, chunk_size):
+    """Bornes de blocs contigus qui ne coupent jamais un développeur."""
+    n = len(developers)
+    bounds, start = [], 0
+    while start < n:
+        stop = min(start + chunk_size, n)
+        while stop < n and developers[stop] == developers[stop - 1]:
+            stop += 1
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+# =========================================================
+# UNION-FIND
+# =========================================================
+
+def _find(parent, i):
+    root = i
+    while parent[root] != root:
+        root = parent[root]
+    while parent[i] != root:
+        parent[i], i = root, parent[i]
+    return root
+
+
+def _union_pairs(n, pairs):
+    parent = list(range(n))
+    for i, j in pairs:
+        ri, rj = _find(parent, i), _find(parent, j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+    return np.array([_find(parent, i) for i in range(n)], dtype=np.int64)
+
+
+# =========================================================
+# GROUPES
+# =========================================================
+
+def _same_name_pairs(names, entry_of_row):
+    """Homonymes exacts, tous développeurs confondus (règle historique de la page 03)."""
+    codes = pd.factorize(names)[0]
+    order = np.lexsort((entry_of_row, codes))
+    codes, entries = codes[order], entry_of_row[order]
+    linked = (codes[1:] == codes[:-1]) & (entries[1:] != entries[:-1])
+    return list(zip(entries[:-1][linked].tolist(), entries[1:][linked].tolist()))
+
+
+def group_titles(df, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    game_group_id de chaque ligne (AppID du jeu le plus commenté de son groupe).
+    workers=1 : calcul dans le processus courant, sans pool.
+    """
+    entries = pd.DataFrame({
+        "developer": developer_keys(df).to_numpy(),
+        "key": title_keys(df["Name"].to_numpy()).to_numpy(),
+    })
+    # blocage exact : une entrée par (développeur, clé de titre), dans l'ordre trié
+    entry_of_row = entries.groupby(["developer", "key"], sort=True).ngroup().to_numpy()
+    uniques = entries.drop_duplicates().sort_values(["developer", "key"])
+    developers = uniques["developer"].tolist()
+    keys = uniques["key"].tolist()
+
+    tasks = [(developers[a:b], keys[a:b], a) for a, b in _chunks(developers, chunk_size)]
+    if workers == 1 or len(tasks) <= 1:
+        results = list(map(_compare_range, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_compare_range, tasks))
+    pairs = [pair for chunk_pairs in results for pair in chunk_pairs]
+    pairs += _same_name_pairs(df["Name"], entry_of_row)
+
+    roots = _union_pairs(len(uniques), pairs)
+    group_of_row = roots[entry_of_row]
+
+    # représentant : le plus commenté, puis le plus petit AppID
+    app_ids = df["AppID"].to_numpy(dtype=np.int64)
+    reviews = df["Total_reviews"].to_numpy(dtype=np.int64)
+    order = np.lexsort((app_ids, -reviews, group_of_row))
+    first = np.r_[True, group_of_row[order][1:] != group_of_row[order][:-1]]
+    representative = np.empty(roots.max() + 1 if len(roots) else 0, dtype=np.int64)
+    representative[group_of_row[order][first]] = app_ids[order][first]
+    return representative[group_of_row]
+
+
+def group_table(df, group_ids):
+    """
+    Un jeu par groupe (le plus commenté de `df`), trié par Total_reviews
+    décroissant, avec game_group_id et n_titres (titres du groupe dans `df`).
+    """
+    table = df.assign(game_group_id=group_ids)
+    table["n_titres"] = table.groupby("game_group_id")["AppID"].transform("size")
+    return (
+        table.sort_values(["Total_reviews", "AppID"], ascending=[False, True], kind="stable")
+             .drop_duplicates("game_group_id")
+    )
+
+
+# =========================================================
+# TABLE HORS LIGNE
+# =========================================================
+
+def _write_title_groups(path, app_ids, group_ids, version):
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, app_ids=app_ids, group_ids=group_ids, version=np.array(version))
+    os.replace(tmp_path, path)
+
+
+def build_title_groups(workers=None, chunk_size=DEFAULT_CHUNK_SIZE, path=PATH_TITLE_GROUPS, verbose=True):
+    """Calcule les groupes de titres du dataset complet (version courante)."""
+    version = dataset_version()
+    df = read_games()
+    group_ids = group_titles(df, workers=workers, chunk_size=chunk_size)
+
+    if verbose:
+        n_groups = len(np.unique(group_ids))
+        print(f"{len(df):,} jeux → {n_groups:,} groupes ({len(df) - n_groups:,} doublons regroupés)")
+
+    _write_title_groups(path, df["AppID"].to_numpy(dtype=np.int64), group_ids, version)
+
+
+# =========================================================
+# MISE À JOUR INCRÉMENTALE (ETL)
+# =========================================================
+# Liens entre jeux : fenêtres du voisinage trié (tout le développeur) et
+# homonymes exacts. Un AppID modifié ne change que les liens de son
+# développeur et de son nom (ancienne et nouvelle version) ; les autres liens
+# existaient déjà, donc relient des jeux d'un même ancien groupe. Seuls les
+# anciens groupes qui touchent ces développeurs ou ces noms peuvent changer :
+# leurs jeux sont regroupés à nouveau (fenêtres calculées sur les
+# développeurs entiers), tous les autres gardent groupe et représentant.
+
+def affected_rows(df, developers, old_group, changed_ids, dropped):
+    """
+    Masque des jeux de `df` dont le groupe peut changer : développeur
+    (developer_keys(df)) ou nom d'un AppID modifié, puis tout leur ancien
+    groupe (old_group, -1 si absent).
+    dropped : anciennes versions des lignes retirées (AppID, Name, Developer,
+    Publisher, old_group).
+    """
+    names = df["Name"].astype(object).reset_index(drop=True)
+    changed = np.isin(df["AppID"].to_numpy(dtype=np.int64), changed_ids)
+
+    touched = (
+        changed
+        | developers.isin(set(developers[changed]) | set(developer_keys(dropped))).to_numpy()
+        | names.isin(set(names[changed]) | set(dropped["Name"].astype(object))).to_numpy()
+    )
+    groups = np.setdiff1d(np.r_[old_group[touched], dropped["old_group"].to_numpy()], [-1])
+    return touched | np.isin(old_group, groups)
+
+
+def regroup_changed(df, old_app_ids, old_group_ids, changed_ids, dropped, workers=None):
+    """
+    game_group_id de `df` à partir des groupes de la version précédente
+    (old_app_ids, old_group_ids) : jeux de affected_rows() regroupés à nouveau,
+    les autres inchangés ; même résultat que group_titles(df).
+    Retourne (group_ids, nombre de jeux regroupés), ou None si l'ancienne
+    table ne couvre pas un jeu non modifié.
+    """
+    index = pd.Index(old_app_ids)
+    rows = index.get_indexer(df["AppID"].to_numpy(dtype=np.int64))
+    old_group = np.where(rows >= 0, old_group_ids[rows.clip(min=0)], -1)
+    dropped_rows = index.get_indexer(dropped["AppID"].to_numpy(dtype=np.int64))
+    dropped = dropped.assign(old_group=np.where(dropped_rows >= 0, old_group_ids[dropped_rows.clip(min=0)], -1))
+
+    developers = developer_keys(df)
+    mask = affected_rows(df, developers, old_group, changed_ids, dropped)
+    if (old_group[~mask] < 0).any():
+        return None
+
+    group_ids = old_group.copy()
+    if mask.any():
+        # développeurs entiers : mêmes fenêtres de comparaison qu'un calcul complet
+        block = developers.isin(set(developers[mask])).to_numpy()
+        regrouped = group_titles(df[block], workers=workers)
+        group_ids[mask] = regrouped[mask[block]]
+    return group_ids, int(mask.sum())
+
+
+def update_title_groups(old_version, changed_ids, dropped, workers=None, path=PATH_TITLE_GROUPS,
+                        verbose=True):
+    """
+    Met la table à jour après un passage incrémental de l'ETL, si elle était à
+    jour pour `old_version` (avant le passage). Retourne False sinon : table à
+    reconstruire (python -m utils.titles).
+    changed_ids : AppID ajoutés, modifiés ou supprimés ; dropped : voir affected_rows.
+    """
+    if not os.path.exists(path):
+        return False
+    with np.load(path) as data:
+        if str(data["version"]) != old_version:
+            return False
+        old_app_ids, old_group_ids = data["app_ids"], data["group_ids"]
+
+    df = read_games()
+    result = regroup_changed(df, old_app_ids, old_group_ids, changed_ids, dropped, workers=workers)
+    if result is None:
+        return False
+    group_ids, n_regrouped = result
+
+    _write_title_groups(path, df["AppID"].to_numpy(dtype=np.int64), group_ids, dataset_version())
+    if verbose:
+        print(f"Groupes de titres mis à jour : {n_regrouped:,} jeux sur {len(df):,} regroupés à nouveau")
+    return True
+
+
+def read_title_groups(version, app_ids, path=PATH_TITLE_GROUPS):
+    """
+    game_group_id aligné sur `app_ids`, ou None si la table est absente,
+    construite pour une autre version ou ne couvre pas tous les jeux.
+    """
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path) as data:
+        if str(data["version"]) != version:
+            return None
+        table_ids = data["app_ids"]
+        group_ids = data["group_ids"]
+
+    index = pd.Index(table_ids)
+    if not index.is_unique:
+        return None
+    rows = index.get_indexer(np.asarray(app_ids))
+    if (rows < 0).any():
+        return None
+    return group_ids[rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Groupes de titres en double (page 03).")
+    parser.add_argument("--workers", type=int, default=None, help="processus (défaut : tous les cœurs)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="titres distincts par bloc de travail")
+    args = parser.parse_args()
+
+    build_title_groups(workers=args.workers, chunk_size=args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+Traces par rerun et profilage à la demande.
+
+- span("load/cube") : bloc (ou décorateur) chronométré ; les spans imbriqués
+  forment l'arbre du rerun. Hors d'une page tracée (ETL, benchmarks), un span
+  ne fait rien.
+- start_page / end_page : début et fin d'un rerun ; l'arbre est écrit comme
+  une ligne JSON dans un journal à rotation (data/.traces/reruns.jsonl).
+  Un rerun coupé par st.stop, st.rerun ou une exception est écrit au rerun
+  suivant de la même session, avec le statut « interrupted ».
+- ?profile=<jeton> dans l'URL : le rerun suivant est échantillonné (pile du
+  thread du script toutes les 5 ms) et enregistré en flamegraph SVG + piles
+  « folded » (data/.traces/profiles/). Désactivé sauf si STEAM_PROFILE_TOKEN
+  est défini, et seulement avec ce jeton : un visiteur anonyme ne peut pas
+  lancer le profileur. Le paramètre est retiré : un seul rerun profilé.
+  L'échantillonneur s'arrête seul dès que le script de la page n'est plus sur
+  la pile (st.stop, st.rerun, exception) ou après PROFILE_MAX_SECONDS ; seuls
+  les PROFILE_MAX_FILES profils les plus récents sont gardés.
+
+Sans profilage, un span coûte deux lectures d'horloge et un ajout de liste :
+quelques microsecondes par étape, négligeable devant un rerun.
+
+Variables : STEAM_TRACE=0 (désactive), STEAM_TRACE_LOG, STEAM_TRACE_MAX_MB,
+STEAM_PROFILE_TOKEN, STEAM_PROFILE_DIR, STEAM_PROFILE_INTERVAL_MS,
+STEAM_PROFILE_MAX_SECONDS, STEAM_PROFILE_MAX_FILES.
+"""
+
+import glob
+import hmac
+import html
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import ContextDecorator
+from logging.handlers import RotatingFileHandler
+
+# =========================================================
+# CONFIGURATION
+# =========================================================
+
+TRACING = os.environ.get("STEAM_TRACE", "1") != "0"
+PATH_TRACE_LOG = os.environ.get("STEAM_TRACE_LOG", "data/.traces/reruns.jsonl")
+PATH_PROFILES = os.environ.get("STEAM_PROFILE_DIR", "data/.traces/profiles")
+TRACE_MAX_BYTES = int(float(os.environ.get("STEAM_TRACE_MAX_MB", 5)) * 1024 * 1024)
+TRACE_BACKUPS = 3
+
+PROFILE_PARAM = "profile"
+PROFILE_TOKEN = os.environ.get("STEAM_PROFILE_TOKEN", "")     # vide : profilage désactivé
+PROFILE_INTERVAL = float(os.environ.get("STEAM_PROFILE_INTERVAL_MS", 5)) / 1000
+PROFILE_MAX_SECONDS = float(os.environ.get("STEAM_PROFILE_MAX_SECONDS", 60))
+PROFILE_MAX_FILES = int(os.environ.get("STEAM_PROFILE_MAX_FILES", 20))
+
+_local = threading.local()          # pile des spans ouverts du thread du script
+_open_traces = {}                   # session → trace pas encore écrite
+_open_lock = threading.Lock()
+
+
+# =========================================================
+# SPANS
+# =========================================================
+
+class Trace:
+    """Un rerun en cours : racine de l'arbre, session, profileur éventuel."""
+
+    def __init__(self, page, session):
+        self.page = page
+        self.session = session
+        self.ts = time.time()
+        self.root = [page, time.perf_counter(), None, [], None]   # nom, début, fin, enfants, erreur
+        self.last = self.root[1]
+        self.profiler = None
+
+
+class span(ContextDecorator):
+    """Étape chronométrée du rerun courant (no-op hors d'une page tracée)."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack:
+            node = [self.name, time.perf_counter(), None, [], None]
+            stack[-1][3].append(node)
+            stack.append(node)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stack = getattr(_local, "stack", None)
+        if stack and len(stack) > 1:
+            node = stack.pop()
+            node[2] = _local.trace.last = time.perf_counter()
+            if exc_type is not None:
+                node[4] = exc_type.__name__
+        return False
+
+
+def _tree(node, end):
+    stop = node[2] if node[2] is not None else end
+    out = {"name": node[0], "ms": round((stop - node[1]) * 1000, 3)}
+    if node[4]:
+        out["error"] = node[4]
+    if node[3]:
+        out["children"] = [_tree(child, end) for child in node[3]]
+    return out
+
+
+# =========================================================
+# DÉBUT / FIN DE RERUN
+# =========================================================
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+def _profile_requested(session):
+    """
+    Vrai (une seule fois) si l'URL contient ?profile=<STEAM_PROFILE_TOKEN> ;
+    le paramètre est retiré. Toujours faux sans jeton configuré.
+    """
+    if session is None or not PROFILE_TOKEN:
+        return False
+    import streamlit as st
+
+    if PROFILE_PARAM not in st.query_params:
+        return False
+    token = st.query_params[PROFILE_PARAM]
+    del st.query_params[PROFILE_PARAM]
+    return hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode())
+
+
+def start_page(page):
+    """Ouvre la trace du rerun (à appeler en tête de page)."""
+    session = _session_id()
+    with _open_lock:
+        previous = _open_traces.pop(session, None)
+    if previous is not None:
+        _flush(previous, "interrupted", previous.last)
+
+    if not TRACING:
+        _local.stack = _local.trace = None
+        return
+
+    trace = Trace(page, session)
+    if _profile_requested(session):
+        # script de la page (appelant) : l'échantillonneur s'arrête quand il quitte la pile
+        page_code = sys._getframe(1).f_code
+        trace.profiler = SamplingProfiler(threading.get_ident(), page_code=page_code).start()
+    _local.trace = trace
+    _local.stack = [trace.root]
+    with _open_lock:
+        _open_traces[session] = trace
+
+
+def end_page():
+    """Ferme et écrit la trace du rerun ; retourne le chemin du flamegraph éventuel."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return None
+    _local.stack = _local.trace = None
+    with _open_lock:
+        _open_traces.pop(trace.session, None)
+    return _flush(trace, "ok", time.perf_counter())
+
+
+def _flush(trace, status, end):
+    profile = None
+    if trace.profiler is not None:
+        profile = write_profile(trace.profiler.stop(), trace.page, trace.ts)
+
+    record = {
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(trace.ts)),
+        "page": trace.page,
+        "session": trace.session,
+        "status": status,
+        "ms": round((end - trace.root[1]) * 1000, 3),
+        "spans": [_tree(child, end) for child in trace.root[3]],
+        "profile": profile,
+    }
+    try:
+        line = json.dumps(record, ensure_ascii=False)
+        _trace_handler().handle(logging.makeLogRecord({"msg": line}))
+    except OSError:
+        pass    # journal non inscriptible : la page ne doit pas échouer pour autant
+    return profile
+
+
+_handler = None
+
+
+def _trace_handler():
+    """
+    Fichier JSON lines à rotation (créé au premier rerun tracé). Appelé
+    directement, sans logger : logging.disable() ne coupe pas les traces.
+    """
+    global _handler
+    if _handler is None:
+        os.makedirs(os.path.dirname(PATH_TRACE_LOG) or ".", exist_ok=True)
+        handler = RotatingFileHandler(
+            PATH_TRACE_LOG, maxBytes=TRACE_MAX_BYTES, backupCount=TRACE_BACKUPS, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _handler = handler
+    return _handler
+
+
+# =========================================================
+# PROFILAGE PAR ÉCHANTILLONNAGE
+# =========================================================
+
+class SamplingProfiler:
+    """
+    Relève la pile d'un thread à intervalle fixe, depuis un thread de fond.
+    Arrêt automatique : `page_code` absent de la pile (rerun terminé, même
+    sans end_page) ou `max_seconds` écoulées.
+    """
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL, page_code=None,
+                 max_seconds=PROFILE_MAX_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.page_code = page_code
+        self.deadline = time.monotonic() + max_seconds
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="steam-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or time.monotonic() > self.deadline:
+                return
+            if self.page_code is not None and not _on_stack(frame, self.page_code):
+                return
+            self.stacks[_folded(frame)] += 1
+
+
+def _on_stack(frame, code):
+    while frame is not None:
+        if frame.f_code is code:
+            return True
+        frame = frame.f_back
+    return False
+
+
+def _folded(frame):
+    """Pile « a;b;c » depuis le script de la page (frames Streamlit au-dessus omises)."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        if code.co_name == "<module>" and f"{os.sep}pages{os.sep}" in code.co_filename:
+            break
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def write_profile(stacks, page, ts):
+    """Écrit <page>-<date>.folded et .svg ; retourne le chemin du SVG."""
+    if not stacks:
+        return None
+    os.makedirs(PATH_PROFILES, exist_ok=True)
+    stem = os.path.join(PATH_PROFILES, f"{page}-{time.strftime('%Y%m%d-%H%M%S', time.localtime(ts))}")
+
+    with open(f"{stem}.folded", "w", encoding="utf-8") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    with open(f"{stem}.svg", "w", encoding="utf-8") as f:
+        f.write(flamegraph_svg(stacks, f"{page} — {sum(stacks.values())} échantillons"))
+    _prune_profiles()
+    return f"{stem}.svg"
+
+
+def _prune_profiles(keep=PROFILE_MAX_FILES):
+    """Ne garde que les `keep` profils les plus récents (.svg + .folded)."""
+    svgs = sorted(glob.glob(os.path.join(PATH_PROFILES, "*.svg")), key=os.path.getmtime)
+    for svg in svgs[:max(0, len(svgs) - keep)]:
+        for path in (svg, f"{svg[:-4]}.folded"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+# =========================================================
+# FLAMEGRAPH SVG
+# =========================================================
+
+def flamegraph_svg(stacks, title, width=1200, row=17):
+    """Flamegraph autonome (SVG, infobulles natives) à partir de piles « folded »."""
+    root = {"n": 0, "children": {}}
+    for stack, count in stacks.items():
+        root["n"] += count
+        node = root
+        for name in stack.split(";"):
+            node = node["children"].setdefault(name, {"n": 0, "children": {}})
+            node["n"] += count
+
+    total = root["n"]
+    rects = []
+
+    def walk(node, x, depth):
+        for name, child in sorted(node["children"].items()):
+            w = child["n"] / total * width
+            if w >= 0.5:
+                rects.append((x, depth, w, name, child["n"]))
+                walk(child, x, depth + 1)
+            x += w
+
+    walk(root, 0.0, 0)
+    max_depth = max((r[1] for r in rects), default=0) + 1
+    height = max_depth * row + 40
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="monospace" font-size="11">',
+        f'<rect width="100%" height="100%" fill="#fafafa"/>',
+        f'<text x="6" y="18" font-size="14">{html.escape(title)}</text>',
+    ]
+    for x, depth, w, name, n in rects:
+        y = height - (depth + 1) * row
+        hue = zlib.crc32(name.encode()) % 40
+        label = name if w / 7 >= len(name) else name[:max(0, int(w / 7) - 2)] + ".."
+        parts.append(
+            f'<g><title>{html.escape(name)} — {n} ({n / total:.1%})</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row - 1}" '
+            f'fill="hsl({hue + 5},85%,{60 + depth % 3 * 5}%)"/>'
+            + (f'<text x="{x + 3:.1f}" y="{y + row - 5}">{html.escape(label)}</text>' if w > 21 else "")
+            + "</g>"
+        )
+    parts.append("</svg>")
+    return "\n".join(parts)